@@ -1,10 +1,15 @@
 # Generate short_description_en for affiliate tools via Responses API (same as fill_affiliate_descriptions.py).
 # Used by Flowtaro Monitor when adding a new link (Option A: auto-fill on add).
 
-import json
 import os
-import urllib.error
-import urllib.request
+import sys
+
+from flowtaro_monitor._config import SCRIPTS_DIR
+
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from openai_client import call_responses  # noqa: E402
 
 INSTRUCTIONS = (
     "You are a product classifier. Output only one short sentence in English that factually "
@@ -17,38 +22,8 @@ DEFAULT_MODEL = "gpt-4o-mini"
 
 
 def _call_api(instructions: str, user_message: str, *, model: str, base_url: str, api_key: str) -> str:
-    """POST to {base_url}/v1/responses. Return extracted text or raise."""
-    url = base_url.rstrip("/") + "/v1/responses"
-    payload = {
-        "model": model,
-        "instructions": instructions,
-        "input": user_message,
-    }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
-    )
-    with urllib.request.urlopen(req, timeout=60) as resp:
-        out = json.loads(resp.read().decode("utf-8"))
-    if isinstance(out.get("output_text"), str) and out["output_text"].strip():
-        return out["output_text"].strip()
-    for item in out.get("output") or []:
-        if item.get("type") == "message" and "content" in item:
-            c = item["content"]
-            if isinstance(c, str):
-                return c.strip()
-            if isinstance(c, list):
-                for part in c:
-                    if isinstance(part, dict) and part.get("type") == "output_text":
-                        if part.get("text"):
-                            return part["text"].strip()
-    raise RuntimeError("No output text in API response")
+    """POST to {base_url}/v1/responses over the shared keep-alive pool. Return extracted text or raise."""
+    return call_responses(instructions, user_message, model=model, base_url=base_url, api_key=api_key, timeout=60)
 
 
 def _sanitize_description(s: str) -> str:
@@ -19,12 +19,13 @@ if str(SCRIPTS_DIR) not in sys.path:
 
 from content_index import get_hubs_list, load_config  # noqa: E402
 from generate_queue import load_tools  # noqa: E402
+import api_ledger  # noqa: E402
 from monitor import (  # noqa: E402
-    API_COSTS_PATH,
     ERROR_LOG,
     _load_cost_data,
     collect_article_stats,
     collect_cost_summary,
+    collect_usage_by_model,
     collect_queue_status,
     format_ts,
     get_last_run,
@@ -62,6 +63,7 @@ def get_dashboard_data(cost_days: int = 30) -> dict:
         "cost_avg_per_article": avg_cost,
         "cost_days": cost_days,
         "cost_by_date": cost_data.get("by_date") or {},
+        "cost_by_model": collect_usage_by_model(cost_data),
         "last_runs": last_runs,
         "format_ts": format_ts,
         "recent_errors": recent_errors,
@@ -69,9 +71,8 @@ def get_dashboard_data(cost_days: int = 30) -> dict:
 
 
 def reset_cost_data() -> None:
-    """Zeruje dane kosztów API (zapisuje pusty by_date do logs/api_costs.json)."""
-    LOGS_DIR.mkdir(parents=True, exist_ok=True)
-    API_COSTS_PATH.write_text('{"by_date": {}}\n', encoding="utf-8")
+    """Zeruje dane kosztów API (pusty logs/api_costs.json i dziennik logs/api_ledger.jsonl)."""
+    api_ledger.reset()
 
 
 def validate_project_root() -> tuple[bool, str | None]:
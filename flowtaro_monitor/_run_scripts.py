@@ -70,6 +70,7 @@ SCRIPT_MAP = {
     "generate_hubs": "generate_hubs.py",
     "generate_sitemap": "generate_sitemap.py",
     "render_site": "render_site.py",
+    "publish": "publish.py",
     "refresh_articles": "refresh_articles.py",
 }
 
@@ -109,6 +109,7 @@ STRINGS = {
         "wf.gen_hubs": "Generuj hub",
         "wf.gen_sitemap": "Generuj sitemapę",
         "wf.render_site": "Renderuj stronę",
+        "wf.publish": "Publikuj (hub, sitemapa, RSS, render)",
         "wf.render_site.site": "Strona",
         "wf.render_site.site_desc": "Main: public/. PL: subdomena (np. public/pl).",
         "wf.render_site.site_main": "Main (public/)",
@@ -144,6 +145,8 @@ STRINGS = {
         "wf.fill.qa_off": "Wyłącz",
         "wf.fill.quality": "Bramka jakości",
         "wf.fill.quality_desc": "Dodatkowa kontrola jakości wygenerowanego tekstu.",
+        "wf.fill.stream": "Strumieniowanie",
+        "wf.fill.stream_desc": "Z bramką jakości: odbieraj tekst na bieżąco i przerwij generowanie, gdy błąd jest pewny.",
         "wf.fill.style": "Styl",
         "wf.fill.style_desc": "Jak ma być napisana treść \u2013 dokumentacyjnie, zwi\u0119\u017ale czy bardzo szczeg\u00f3\u0142owo.",
         "wf.fill.style_default": "\u2014 domy\u015blne (docs)",
@@ -194,6 +197,7 @@ STRINGS = {
         "wf.step_progress": "Krok {0}/{1}: {2}",
         "wf.step_progress_fill": "Krok {0}/{1}: {2} — {3} z {4}",
         "wf.progress_of": "{0} z {1}",
+        "wf.stream_progress": "Generowanie: {0} ({1} znaków)",
         "refresh.progress_step": "Odświeżanie artykułów: {0} z {1}",
         "wf.step_done": "Zakończono",
         "wf.sequence_summary": "Klikni\u0119cie \u201eUruchom\u201d wygeneruje pomys\u0142y na artyku\u0142y (use case\u2019y), uzupe\u0142ni kolejk\u0119, wygeneruje szkielety artyku\u0142\u00f3w i wype\u0142ni je tre\u015bci\u0105 (AI) wed\u0142ug wybranych parametr\u00f3w powy\u017cej, a na koniec wygeneruje na nowo hub, sitemap\u0119 i zrenderuje stron\u0119.",
@@ -595,6 +599,7 @@ STRINGS = {
         "wf.gen_hubs": "Generate hub",
         "wf.gen_sitemap": "Generate sitemap",
         "wf.render_site": "Render site",
+        "wf.publish": "Publish (hub, sitemap, RSS, render)",
         "wf.render_site.site": "Site",
         "wf.render_site.site_desc": "Main: public/. PL: subdomain (e.g. public/pl).",
         "wf.render_site.site_main": "Main (public/)",
@@ -629,6 +634,8 @@ STRINGS = {
         "wf.fill.qa_off": "Off",
         "wf.fill.quality": "Quality gate",
         "wf.fill.quality_desc": "Extra quality check on generated text.",
+        "wf.fill.stream": "Streaming",
+        "wf.fill.stream_desc": "With the quality gate: receive text as it is generated and stop early when a failure is certain.",
         "wf.fill.style": "Style",
         "wf.fill.style_desc": "How the text should be written \u2013 documentation, concise, or detailed.",
         "wf.fill.style_default": "\u2014 default (docs)",
@@ -679,6 +686,7 @@ STRINGS = {
         "wf.step_progress": "Step {0}/{1}: {2}",
         "wf.step_progress_fill": "Step {0}/{1}: {2} — {3} of {4}",
         "wf.progress_of": "{0} of {1}",
+        "wf.stream_progress": "Generating: {0} ({1} chars)",
         "refresh.progress_step": "Refreshing articles: {0} of {1}",
         "wf.step_done": "Done",
         "wf.sequence_summary": "Clicking \"Run\" will generate article ideas (use cases), fill the queue, generate article skeletons and fill them with content (AI) according to the parameters above, then regenerate the hub, sitemap, and render the site.",
@@ -335,6 +335,7 @@ WORKFLOW_LABEL_KEYS = {
     "generate_hubs": "wf.gen_hubs",
     "generate_sitemap": "wf.gen_sitemap",
     "render_site": "wf.render_site",
+    "publish": "wf.publish",
     "refresh_articles": "wf.refresh_articles",
 }
 
@@ -368,6 +369,17 @@ def _p_multichoice(label: str, description: str, flag: str, choices: list[tuple[
     return {"label": label, "type": "multichoice", "description": description, "flag": flag, "choices": choices}
 
 
+def _stream_progress_text(line: str) -> str | None:
+    """Tekst etykiety postępu dla linii "FLOWTARO_STREAM: <slug> <znaki>" z fill_articles --stream; None dla innych linii."""
+    s = (line or "").strip()
+    if not s.startswith("FLOWTARO_STREAM:"):
+        return None
+    parts = s.split(":", 1)[1].split()
+    if len(parts) != 2 or not parts[1].isdigit():
+        return ""
+    return t("wf.stream_progress", parts[0], parts[1])
+
+
 # generate_use_cases jest budowany dynamicznie w refresh_params_panel (kategoria z listy, typ treści multichoice; batch size tylko z configu)
 WORKFLOW_PARAM_SCHEMA: dict[str, list[dict]] = {
     "generate_use_cases": None,  # budowane w _build_param_widgets_for_action
@@ -383,6 +395,7 @@ WORKFLOW_PARAM_SCHEMA: dict[str, list[dict]] = {
         _p_choice("wf.fill.limit", "wf.fill.limit_desc", [("wf.fill.limit_none", []), ("wf.fill.limit_1", ["--limit", "1"]), ("wf.fill.limit_5", ["--limit", "5"]), ("wf.fill.limit_10", ["--limit", "10"]), ("wf.fill.limit_20", ["--limit", "20"]), ("wf.fill.limit_50", ["--limit", "50"])]),
         _p_choice("wf.fill.qa", "wf.fill.qa_desc", [("wf.fill.qa_default", []), ("wf.fill.qa_on", ["--qa"]), ("wf.fill.qa_off", ["--no-qa"])]),
         _p_bool("wf.fill.quality", "wf.fill.quality_desc", ["--quality_gate"]),
+        _p_bool("wf.fill.stream", "wf.fill.stream_desc", ["--stream"]),
     ],
     "generate_hubs": [],
     "generate_sitemap": [],
@@ -687,6 +700,11 @@ def build_dashboard_tab(parent):
             lines.append("Ostatnie uruchomienia:")
             for name, ts in data["last_runs"].items():
                 lines.append(f"  {name}: {fmt(ts)}")
+            if data.get("cost_by_model"):
+                lines.append("\nKoszty API wg modelu (z raportowanego zużycia tokenów):")
+                for r in data["cost_by_model"]:
+                    lat = f", opóźnienie p50 {r['p50_s']:.1f}s / p95 {r['p95_s']:.1f}s" if r["p50_s"] is not None else ""
+                    lines.append(f"  {r['model']}: {r['calls']} wywołań, ${r['cost']:.4f}, cache {r['cached_tokens']}/{r['input_tokens']} tokenów wejścia{lat}")
             lines.append("\nNajstarsze 5 todo:")
             for it in data["oldest_todo"][:5]:
                 kw = (it.get("primary_keyword") or it.get("title") or "?")[:50]
@@ -1060,7 +1078,12 @@ def build_workflow_tab(parent, last_output_holder: list):
                 root.after(50, lambda: poll_sequence(remaining, next_accumulated, [], new_q, rbtn, cbtn, next_fill_total, next_fill_done, on_success_callback))
                 return
             line = item[0]
-            if line is not None:
+            stream_text = _stream_progress_text(line) if line is not None else None
+            if stream_text is not None:
+                # Live generation progress: shown in the label, not written to the log
+                if stream_text:
+                    progress_label.config(text=stream_text)
+            elif line is not None:
                 current_action = process_holder[0][0] if process_holder else None
                 if current_action == "fill_articles" and fill_total > 0 and "  Filled:" in line:
                     fill_done[0] += 1
@@ -1942,11 +1965,9 @@ def build_easy_workflow_tab(parent, last_output_holder: list):
         _start_easy_run(steps)
 
     def run_render_articles_easy():
-        """Run generate_hubs → generate_sitemap → render_site (build public/)."""
+        """Run publish.py: generate_hubs → generate_sitemap → generate_feeds → render_site in one process (build public/)."""
         steps = [
-            ("generate_hubs", []),
-            ("generate_sitemap", []),
-            ("render_site", []),
+            ("publish", []),
         ]
         _start_easy_run(steps)
 
@@ -2065,7 +2086,12 @@ def build_easy_workflow_tab(parent, last_output_holder: list):
                 root.after(50, lambda: _poll_easy_sequence(remaining, new_accumulated + next_header, [], new_q, rbtn, cbtn, next_fill_total, next_fill_done, on_success_callback))
                 return
             line = item[0]
-            if line is not None:
+            stream_text = _stream_progress_text(line) if line is not None else None
+            if stream_text is not None:
+                # Live generation progress: shown in the label, not written to the log
+                if stream_text:
+                    progress_label.config(text=stream_text)
+            elif line is not None:
                 current_action = process_holder[0][0] if process_holder else None
                 if current_action == "fill_articles" and fill_total > 0 and "  Filled:" in line:
                     fill_done[0] += 1
@@ -2584,8 +2610,15 @@ def build_refresh_tab(parent, last_output_holder: list):
         log_area.config(state=tk.DISABLED)
 
     def handle_refresh_progress_line(line: str) -> bool:
-        """If line is FLOWTARO_PROGRESS_TOTAL or FLOWTARO_PROGRESS, update progress bar/label and return True (do not log)."""
+        """If line is FLOWTARO_PROGRESS_TOTAL, FLOWTARO_PROGRESS or FLOWTARO_STREAM, update progress bar/label and return True (do not log)."""
         s = (line or "").strip()
+        stream_text = _stream_progress_text(s)
+        if stream_text is not None:
+            if stream_text:
+                total = max(1, int(float(progress_bar["maximum"])))
+                done = int(float(progress_bar["value"]))
+                progress_label.config(text=t("refresh.progress_step", done, total) + " — " + stream_text)
+            return True
         if s.startswith("FLOWTARO_PROGRESS_TOTAL:"):
             try:
                 n = int(s.split(":", 1)[1].strip())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Opt-in, content-addressed on-disk cache for OpenAI responses (logs/api_cache/).
+Key = sha256 of the endpoint path + the request payload (model, instructions, input, ...),
+so a dry-run followed by --write, a re-run after a crash or a repeated Prompt #2 from the
+same Prompt #1 is answered from disk with no API call. Used by openai_client.post_json.
+Eviction is LRU by last use (file mtime, bumped on every hit) once the cache exceeds
+OPENAI_API_CACHE_MAX_MB (default 200), plus anything older than OPENAI_API_CACHE_MAX_DAYS
+(default 30). Stdlib only.
+
+Off by default. Enable with OPENAI_API_CACHE=1 (inherited by subprocesses) or --cache;
+--no-cache disables it, --refresh-cache skips lookups but stores the fresh responses.
+
+  python scripts/api_cache.py            # size and entry count
+  python scripts/api_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_ROOT / "logs" / "api_cache"
+
+
+def _env_float(name: str, default: float) -> float:
+    """Number from the environment; the default when unset or not a number."""
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+MAX_BYTES = int(_env_float("OPENAI_API_CACHE_MAX_MB", 200) * 1024 * 1024)
+MAX_AGE_S = _env_float("OPENAI_API_CACHE_MAX_DAYS", 30) * 86400
+# Evict on the first store of a process and then every EVICT_EVERY stores
+EVICT_EVERY = 100
+MODES = ("off", "on", "refresh")
+
+_env = (os.environ.get("OPENAI_API_CACHE") or "").strip().lower()
+_mode = "refresh" if _env == "refresh" else ("on" if _env in ("1", "on", "true", "yes") else "off")
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {"hits": 0, "misses": 0, "stored": 0}
+_stores_since_evict = EVICT_EVERY
+
+
+def configure(mode: str) -> None:
+    """Set the cache mode for this process: off | on | refresh."""
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"cache mode must be one of {', '.join(MODES)}")
+    _mode = mode
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """--cache / --no-cache / --refresh-cache for scripts that call the API."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--cache", action="store_const", const="on", dest="api_cache", help="Answer repeated API requests from logs/api_cache/ (also: OPENAI_API_CACHE=1)")
+    group.add_argument("--no-cache", action="store_const", const="off", dest="api_cache", help="Do not use the API response cache, even if OPENAI_API_CACHE is set")
+    group.add_argument("--refresh-cache", action="store_const", const="refresh", dest="api_cache", help="Ignore cached API responses but store the new ones")
+
+
+def configure_from_args(args: argparse.Namespace) -> None:
+    mode = getattr(args, "api_cache", None)
+    if mode:
+        configure(mode)
+        # Subprocesses (e.g. refresh_articles -> fill_articles) follow the same switch
+        os.environ["OPENAI_API_CACHE"] = {"on": "1", "off": "0", "refresh": "refresh"}[mode]
+
+
+def enabled() -> bool:
+    return _mode != "off"
+
+
+def cache_key(path: str, payload: dict) -> str:
+    canonical = json.dumps([path, payload], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key: str) -> Path:
+    return CACHE_DIR / key[:2] / f"{key}.json"
+
+
+def _remember(key: str) -> None:
+    """Track keys used by this thread so a caller can discard responses that failed its checks."""
+    keys = getattr(_local, "keys", None)
+    if keys is None:
+        keys = _local.keys = []
+    keys.append(key)
+
+
+def get(key: str) -> dict | None:
+    """Cached response for key (None on miss, in refresh mode, or when expired). A hit bumps its LRU time."""
+    if _mode != "on":
+        return None
+    path = _entry_path(key)
+    try:
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        if time.time() - float(entry.get("created", 0)) > MAX_AGE_S:
+            raise ValueError("expired")
+        os.utime(path)
+    except (OSError, ValueError, AttributeError):
+        with _lock:
+            _stats["misses"] += 1
+        return None
+    with _lock:
+        _stats["hits"] += 1
+    _remember(key)
+    return entry.get("response")
+
+
+def put(key: str, response: dict) -> None:
+    """Store a successful response (atomic write); runs eviction now and then."""
+    global _stores_since_evict
+    if _mode == "off":
+        return
+    path = _entry_path(key)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps({"created": time.time(), "response": response}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return
+    _remember(key)
+    with _lock:
+        _stats["stored"] += 1
+        _stores_since_evict += 1
+        run_evict = _stores_since_evict >= EVICT_EVERY
+        if run_evict:
+            _stores_since_evict = 0
+    if run_evict:
+        evict()
+
+
+def begin() -> None:
+    """Start tracking the keys this thread uses (e.g. at the start of one article)."""
+    _local.keys = []
+
+
+def tracked() -> list[str]:
+    """Keys this thread used since begin() (to hand over from a helper thread)."""
+    return list(getattr(_local, "keys", None) or [])
+
+
+def track(keys: list[str]) -> None:
+    """Add keys another thread used on this thread's behalf, so discard_tracked() drops them too."""
+    for key in keys:
+        _remember(key)
+
+
+def discard_last() -> None:
+    """Drop the most recent response this thread used (it failed a quality check; do not serve it again)."""
+    keys = getattr(_local, "keys", None)
+    if keys:
+        discard(keys.pop())
+
+
+def discard_tracked() -> None:
+    """Drop every response this thread used since begin()."""
+    keys = getattr(_local, "keys", None) or []
+    for key in keys:
+        discard(key)
+    _local.keys = []
+
+
+def discard(key: str) -> None:
+    """Drop one entry (e.g. a response another thread used that failed the caller's checks)."""
+    try:
+        _entry_path(key).unlink()
+    except OSError:
+        pass
+
+
+def _scan() -> list[tuple[float, int, Path]]:
+    """(last use, size, path) for every entry."""
+    entries = []
+    if not CACHE_DIR.exists():
+        return entries
+    for sub in os.scandir(CACHE_DIR):
+        if not sub.is_dir():
+            continue
+        for f in os.scandir(sub.path):
+            if f.name.endswith(".json"):
+                try:
+                    st = f.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, Path(f.path)))
+    return entries
+
+
+def evict(max_bytes: int = MAX_BYTES, max_age_s: float = MAX_AGE_S) -> int:
+    """Remove entries unused for max_age_s, then least recently used ones until under max_bytes. Returns removed count."""
+    now = time.time()
+    entries = sorted(_scan())
+    removed = 0
+    total = sum(size for _, size, _ in entries)
+    for used, size, path in entries:
+        if now - used <= max_age_s and total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def stats() -> dict[str, int]:
+    with _lock:
+        return dict(_stats)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Show or clear the API response cache (logs/api_cache/).")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached response")
+    parser.add_argument("--evict", action="store_true", help="Apply the size/age limits now")
+    args = parser.parse_args()
+    if args.clear:
+        removed = evict(max_bytes=-1, max_age_s=-1)
+        print(f"API cache cleared: {removed} entries removed")
+        return
+    if args.evict:
+        print(f"API cache: {evict()} entries evicted")
+    entries = _scan()
+    size = sum(s for _, s, _ in entries)
+    print(f"API cache ({CACHE_DIR}): {len(entries)} entries, {size / 1024 / 1024:.1f} MB (limit {MAX_BYTES / 1024 / 1024:.0f} MB, {MAX_AGE_S / 86400:.0f} days)")
+
+
+if __name__ == "__main__":
+    main()
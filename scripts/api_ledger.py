@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Append-only ledger of OpenAI calls (logs/api_ledger.jsonl): one JSON line per call with the
+token counts the API reported (input, cached input, output), model, latency, script and the
+article being filled. latency_s is the attempt that succeeded; wall_s adds rate-limit waits,
+failed attempts and retry backoff. Appends are one short write under the shared file lock, so any number
+of threads and processes can record at once. Cache hits (api_cache.py) are not API calls and
+are not recorded. Stdlib only.
+
+compact() folds the ledger into logs/api_costs.json (by_date, as before, plus per model,
+script and article totals and recent latencies) and truncates it; monitor.py and the
+Flowtaro Monitor dashboard call it before reading costs. Prices are USD per 1M tokens from
+PRICES (longest model-name prefix wins; Batch API calls at BATCH_DISCOUNT).
+
+  python scripts/api_ledger.py            # compact, then cost / latency per model and top articles
+  python scripts/api_ledger.py --top 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from api_rate_limit import file_lock
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+LOGS_DIR = PROJECT_ROOT / "logs"
+LEDGER_PATH = LOGS_DIR / "api_ledger.jsonl"
+LOCK_PATH = LOGS_DIR / "api_ledger.lock"
+SUMMARY_PATH = LOGS_DIR / "api_costs.json"
+
+# USD per 1M tokens: (input, cached input, output). Update when OpenAI changes its price list.
+PRICES: dict[str, tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5": (1.25, 0.125, 10.00),
+    "o4-mini": (1.10, 0.275, 4.40),
+}
+# Models not in PRICES are charged like the pipeline's default model
+DEFAULT_MODEL = "gpt-4o-mini"
+BATCH_DISCOUNT = 0.5
+# Latencies kept per model in the summary for percentiles
+RECENT_LATENCIES = 2000
+
+SCRIPT = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "python"
+
+_local = threading.local()
+_session_lock = threading.Lock()
+_session = {"calls": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0, "cost": 0.0}
+
+
+def set_article(slug: str | None) -> None:
+    """Attribute this thread's following calls to an article (None: no article)."""
+    _local.article = slug
+
+
+def price_for(model: str) -> tuple[float, float, float]:
+    name = (model or "").strip().lower()
+    best = ""
+    for key in PRICES:
+        if name.startswith(key) and len(key) > len(best):
+            best = key
+    return PRICES[best or DEFAULT_MODEL]
+
+
+def usage_tokens(usage: dict | None) -> tuple[int, int, int] | None:
+    """(input, cached input, output) from a Responses or Chat Completions usage object; None if absent."""
+    if not isinstance(usage, dict):
+        return None
+    if "input_tokens" in usage or "output_tokens" in usage:
+        details = usage.get("input_tokens_details") or {}
+        return int(usage.get("input_tokens") or 0), int(details.get("cached_tokens") or 0), int(usage.get("output_tokens") or 0)
+    if "prompt_tokens" in usage or "completion_tokens" in usage:
+        details = usage.get("prompt_tokens_details") or {}
+        return int(usage.get("prompt_tokens") or 0), int(details.get("cached_tokens") or 0), int(usage.get("completion_tokens") or 0)
+    return None
+
+
+def cost_usd(model: str, input_tokens: int, cached_tokens: int, output_tokens: int, batch: bool = False) -> float:
+    p_in, p_cached, p_out = price_for(model)
+    cached = min(cached_tokens, input_tokens)
+    cost = ((input_tokens - cached) * p_in + cached * p_cached + output_tokens * p_out) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+def record(
+    *,
+    model: str,
+    usage: dict | None,
+    latency_s: float | None,
+    endpoint: str,
+    wall_s: float | None = None,
+    article: str | None = None,
+    batch: bool = False,
+    estimate: tuple[int, int] | None = None,
+    note: str | None = None,
+) -> None:
+    """
+    Append one call to the ledger. usage: the response's "usage" object; without it, estimate =
+    (input, output) tokens is used and the entry is marked estimated. latency_s: the successful attempt
+    only; wall_s: the whole call including waits and retries. Never raises on I/O errors.
+    """
+    tokens = usage_tokens(usage)
+    entry = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "script": SCRIPT,
+        "endpoint": endpoint,
+        "model": model,
+        "article": article if article is not None else getattr(_local, "article", None),
+    }
+    if tokens is None:
+        if estimate is None:
+            return
+        tokens = (estimate[0], 0, estimate[1])
+        entry["estimated"] = True
+    entry["input_tokens"], entry["cached_tokens"], entry["output_tokens"] = tokens
+    entry["cost_usd"] = round(cost_usd(model, *tokens, batch=batch), 8)
+    if latency_s is not None:
+        entry["latency_s"] = round(latency_s, 3)
+    if wall_s is not None:
+        entry["wall_s"] = round(wall_s, 3)
+    if batch:
+        entry["batch"] = True
+    if note:
+        entry["note"] = note
+    with _session_lock:
+        _session["calls"] += 1
+        _session["input_tokens"] += tokens[0]
+        _session["cached_tokens"] += tokens[1]
+        _session["output_tokens"] += tokens[2]
+        _session["cost"] += entry["cost_usd"]
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    try:
+        with file_lock(LOCK_PATH):
+            with open(LEDGER_PATH, "a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError:
+        pass
+
+
+def session_totals() -> dict:
+    """Calls, tokens and cost recorded by this process so far (for end-of-run summaries)."""
+    with _session_lock:
+        return dict(_session)
+
+
+def _load_summary() -> dict:
+    try:
+        data = json.loads(SUMMARY_PATH.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _fold(summary: dict, entry: dict) -> None:
+    cost = float(entry.get("cost_usd") or 0)
+    day = str(entry.get("ts") or "")[:10]
+    model = entry.get("model") or "?"
+    by_date = summary.setdefault("by_date", {})
+    by_date[day] = by_date.get(day, 0) + cost
+    m = summary.setdefault("by_model", {}).setdefault(model, {})
+    m["calls"] = m.get("calls", 0) + 1
+    for key in ("input_tokens", "cached_tokens", "output_tokens"):
+        m[key] = m.get(key, 0) + int(entry.get(key) or 0)
+    m["cost"] = m.get("cost", 0) + cost
+    sc = summary.setdefault("by_script", {}).setdefault(entry.get("script") or "?", {})
+    sc["calls"] = sc.get("calls", 0) + 1
+    sc["cost"] = sc.get("cost", 0) + cost
+    if entry.get("article"):
+        a = summary.setdefault("by_article", {}).setdefault(entry["article"], {})
+        a["calls"] = a.get("calls", 0) + 1
+        a["cost"] = a.get("cost", 0) + cost
+        a["output_tokens"] = a.get("output_tokens", 0) + int(entry.get("output_tokens") or 0)
+        a["latency_s"] = round(a.get("latency_s", 0) + float(entry.get("latency_s") or 0), 3)
+        a["last"] = entry.get("ts")
+    if entry.get("latency_s") is not None:
+        lat = summary.setdefault("recent_latency_s", {}).setdefault(model, [])
+        lat.append(entry["latency_s"])
+        del lat[:-RECENT_LATENCIES]
+
+
+def compact() -> dict:
+    """Fold the ledger into logs/api_costs.json, truncate the ledger and return the summary."""
+    try:
+        with file_lock(LOCK_PATH):
+            summary = _load_summary()
+            try:
+                raw = LEDGER_PATH.read_text(encoding="utf-8")
+            except OSError:
+                return summary
+            folded = 0
+            for line in raw.splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(entry, dict):
+                    _fold(summary, entry)
+                    folded += 1
+            if folded:
+                summary["updated"] = datetime.now().isoformat(timespec="seconds")
+                tmp = SUMMARY_PATH.with_name(f".{SUMMARY_PATH.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(summary, indent=2, sort_keys=True), encoding="utf-8")
+                os.replace(tmp, SUMMARY_PATH)
+            # Appends happen under the same lock, so nothing is lost between the read and this
+            LEDGER_PATH.write_text("", encoding="utf-8")
+            return summary
+    except OSError:
+        return _load_summary()
+
+
+def summary() -> dict:
+    """The compacted summary plus ledger lines not folded in yet, without writing anything."""
+    try:
+        with file_lock(LOCK_PATH):
+            data = _load_summary()
+            raw = LEDGER_PATH.read_text(encoding="utf-8")
+    except OSError:
+        return _load_summary()
+    for line in raw.splitlines():
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(entry, dict):
+            _fold(data, entry)
+    return data
+
+
+def reset() -> None:
+    """Empty the ledger and the compacted summary."""
+    with file_lock(LOCK_PATH):
+        LEDGER_PATH.write_text("", encoding="utf-8")
+        SUMMARY_PATH.write_text('{"by_date": {}}\n', encoding="utf-8")
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compact the API cost ledger and show cost / latency per model and article.")
+    parser.add_argument("--top", type=int, default=10, metavar="N", help="Most expensive articles to list (default: 10).")
+    args = parser.parse_args()
+    started = time.monotonic()
+    summary = compact()
+    models = summary.get("by_model") or {}
+    if not models:
+        print("No API usage recorded yet.")
+        return
+    total = sum(float(v) for v in (summary.get("by_date") or {}).values())
+    print(f"API cost (all time): ${total:.4f}  (compacted in {time.monotonic() - started:.2f}s)")
+    latencies = summary.get("recent_latency_s") or {}
+    for model, m in sorted(models.items()):
+        lat = latencies.get(model) or []
+        p50, p95 = percentile(lat, 50), percentile(lat, 95)
+        lat_txt = f"  p50 {p50:.1f}s  p95 {p95:.1f}s" if lat else ""
+        print(
+            f"  {model:<20} {m['calls']:>6} calls  in {m['input_tokens']} (cached {m['cached_tokens']})"
+            f"  out {m['output_tokens']}  ${m['cost']:.4f}{lat_txt}"
+        )
+    articles = summary.get("by_article") or {}
+    if articles and args.top > 0:
+        print(f"Most expensive articles (of {len(articles)}):")
+        for slug, a in sorted(articles.items(), key=lambda kv: -kv[1].get("cost", 0))[: args.top]:
+            print(f"  ${a['cost']:.4f}  {a['calls']} calls  {a['latency_s']:.1f}s  {slug}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Token-bucket rate limiter for OpenAI calls, shared by all threads and all processes
+(fill_articles, generate_use_cases, refresh_articles ... running at the same time).
+Two buckets per model: requests per minute and tokens per minute. State lives in
+logs/api_rate_limit.json and every read-modify-write holds an exclusive lock on
+logs/api_rate_limit.lock (fcntl on POSIX, msvcrt on Windows). Stdlib only.
+
+Each call reserves its estimated tokens (prompt chars / 4 + an output allowance) before it
+is sent; when the response reports usage the difference is settled, and a 429 empties the
+buckets so other workers back off instead of joining a 429 storm.
+Limits: OPENAI_RPM_LIMIT (default 500) and OPENAI_TPM_LIMIT (default 200000); 0 disables.
+
+  python scripts/api_rate_limit.py        # current utilisation per model
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+LOGS_DIR = PROJECT_ROOT / "logs"
+STATE_PATH = LOGS_DIR / "api_rate_limit.json"
+LOCK_PATH = LOGS_DIR / "api_rate_limit.lock"
+
+
+def _env_int(name: str, default: int) -> int:
+    """Integer from the environment; the default when unset or not a number."""
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+RPM_LIMIT = _env_int("OPENAI_RPM_LIMIT", 500)
+TPM_LIMIT = _env_int("OPENAI_TPM_LIMIT", 200_000)
+# Output allowance added to the prompt estimate when the request sets no max tokens
+OUTPUT_TOKENS_ESTIMATE = 1500
+# Longest single sleep while waiting, so a freed-up bucket is noticed quickly
+MAX_WAIT_SLICE_S = 5.0
+
+# One threading.Lock per lock file (flock does not exclude threads of the same process)
+_THREAD_LOCKS: dict[str, threading.Lock] = {}
+_THREAD_LOCKS_GUARD = threading.Lock()
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_fd(fd: int) -> None:
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                time.sleep(0.05)
+
+    def _unlock_fd(fd: int) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    def _unlock_fd(fd: int) -> None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Exclusive lock shared by all threads and processes using the same lock file (also used by api_ledger)."""
+    with _THREAD_LOCKS_GUARD:
+        thread_lock = _THREAD_LOCKS.setdefault(str(path), threading.Lock())
+    with thread_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(path), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            _lock_fd(fd)
+            try:
+                yield
+            finally:
+                _unlock_fd(fd)
+        finally:
+            os.close(fd)
+
+
+@contextmanager
+def _locked_state():
+    """Yield the shared state dict under the thread + file lock; it is written back on exit."""
+    with file_lock(LOCK_PATH):
+        try:
+            state = json.loads(STATE_PATH.read_text(encoding="utf-8"))
+            if not isinstance(state, dict):
+                state = {}
+        except (OSError, json.JSONDecodeError):
+            state = {}
+        yield state
+        tmp = STATE_PATH.with_name(f".{STATE_PATH.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, STATE_PATH)
+
+
+def estimate_tokens(*texts: str, output_tokens: int | None = None) -> int:
+    """Request size estimate: 1 token ~ 4 characters of prompt, plus the output allowance."""
+    prompt = sum(len(t or "") for t in texts) // 4
+    return prompt + (OUTPUT_TOKENS_ESTIMATE if output_tokens is None else output_tokens)
+
+
+def _refill(bucket: dict, capacity: float, now: float) -> dict:
+    """Bring a {"level", "at"} bucket up to date: +capacity per 60 s, capped at capacity."""
+    level = bucket.get("level", capacity)
+    at = bucket.get("at", now)
+    level = min(capacity, level + max(0.0, now - at) * capacity / 60.0)
+    return {"level": level, "at": now}
+
+
+def _buckets(state: dict, model: str, now: float) -> dict:
+    entry = state.setdefault(model or "default", {})
+    entry["rpm"] = _refill(entry.get("rpm") or {}, RPM_LIMIT, now)
+    entry["tpm"] = _refill(entry.get("tpm") or {}, TPM_LIMIT, now)
+    return entry
+
+
+def acquire(model: str, tokens: int) -> float:
+    """Block until one request and `tokens` tokens are available for model, then reserve them. Returns seconds waited."""
+    if RPM_LIMIT <= 0 and TPM_LIMIT <= 0:
+        return 0.0
+    tokens = min(tokens, TPM_LIMIT) if TPM_LIMIT > 0 else 0
+    started = time.monotonic()
+    while True:
+        with _locked_state() as state:
+            entry = _buckets(state, model, time.time())
+            need_req = 1 if RPM_LIMIT > 0 else 0
+            wait = 0.0
+            if need_req and entry["rpm"]["level"] < need_req:
+                wait = max(wait, (need_req - entry["rpm"]["level"]) * 60.0 / RPM_LIMIT)
+            if tokens and entry["tpm"]["level"] < tokens:
+                wait = max(wait, (tokens - entry["tpm"]["level"]) * 60.0 / TPM_LIMIT)
+            if wait <= 0:
+                entry["rpm"]["level"] -= need_req
+                entry["tpm"]["level"] -= tokens
+                entry["requests"] = entry.get("requests", 0) + 1
+                return time.monotonic() - started
+        time.sleep(min(wait, MAX_WAIT_SLICE_S))
+
+
+def settle(model: str, reserved: int, actual: int | None) -> None:
+    """Correct a reservation once the response reports usage (refund over-estimates, charge under-estimates)."""
+    if TPM_LIMIT <= 0 or actual is None:
+        return
+    delta = min(reserved, TPM_LIMIT) - actual
+    if delta == 0:
+        return
+    with _locked_state() as state:
+        entry = _buckets(state, model, time.time())
+        entry["tpm"]["level"] = min(TPM_LIMIT, entry["tpm"]["level"] + delta)
+
+
+def penalize(model: str) -> None:
+    """A 429 came back: empty both buckets so every worker in every process waits for a refill."""
+    if RPM_LIMIT <= 0 and TPM_LIMIT <= 0:
+        return
+    with _locked_state() as state:
+        entry = _buckets(state, model, time.time())
+        entry["rpm"]["level"] = min(entry["rpm"]["level"], 0.0)
+        entry["tpm"]["level"] = min(entry["tpm"]["level"], 0.0)
+        entry["throttled"] = entry.get("throttled", 0) + 1
+
+
+def utilisation() -> dict[str, dict]:
+    """{model: {"rpm": used fraction, "tpm": used fraction, "requests": total sent, "throttled": total 429s}}."""
+    out: dict[str, dict] = {}
+    if RPM_LIMIT <= 0 and TPM_LIMIT <= 0:
+        return out
+    with _locked_state() as state:
+        now = time.time()
+        for model in list(state):
+            entry = _buckets(state, model, now)
+            out[model] = {
+                "rpm": round(1.0 - entry["rpm"]["level"] / RPM_LIMIT, 3) if RPM_LIMIT > 0 else 0.0,
+                "tpm": round(1.0 - entry["tpm"]["level"] / TPM_LIMIT, 3) if TPM_LIMIT > 0 else 0.0,
+                "requests": entry.get("requests", 0),
+                "throttled": entry.get("throttled", 0),
+            }
+    return out
+
+
+def main() -> None:
+    usage = utilisation()
+    if not usage:
+        print("No rate-limit state (limits disabled or no API calls yet).")
+        return
+    print(f"API rate limit utilisation (limits: {RPM_LIMIT} RPM, {TPM_LIMIT} TPM)")
+    for model, u in sorted(usage.items()):
+        print(f"  {model:<24} RPM {u['rpm'] * 100:5.1f}%  TPM {u['tpm'] * 100:5.1f}%  requests {u['requests']}  429s {u['throttled']}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,34 @@
 #!/usr/bin/env python3
 """
-One-off audit of internal links in public/. Read-only.
-Checks: <a href>, <link rel="stylesheet" href> in all HTML under public/.
-Resolves paths against public/ as site root. Reports broken links and missing resources.
+Audit of internal links in the built sites (public/ and public_pl/). Read-only on the output.
+Checks: <a href>, <link rel="stylesheet" href> in all HTML under each output dir.
+The output tree is walked once into an in-memory set of paths, so link checks do no
+filesystem calls. Pages are parsed in a process pool; the links of each page are cached by
+content hash (logs/audit_links_cache_<site>.json) so unchanged pages are not re-parsed.
+Also checks that every article and hub in the build's URL map (logs/url_map_<site>.json) was rendered.
+Exit code 1 if any link is broken or a URL-map page is missing (usable as a post-build gate).
+
+  python scripts/audit_links.py                 # both sites
+  python scripts/audit_links.py --site main --workers 4
 """
 
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from html.parser import HTMLParser
 from pathlib import Path
+from urllib.parse import unquote
+
+from url_map import default_out_dir, load_url_map
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 PUBLIC_DIR = PROJECT_ROOT / "public"
+LOGS_DIR = PROJECT_ROOT / "logs"
+CACHE_VERSION = 1
 
 
 class LinkCollector(HTMLParser):
@@ -22,9 +41,9 @@ class LinkCollector(HTMLParser):
     def handle_starttag(self, tag, attrs):
         d = dict(attrs)
         if tag == "a" and "href" in d:
-            self.links.append(("a", d["href"].strip()))
-        if tag == "link" and d.get("rel", "").strip().lower() == "stylesheet" and "href" in d:
-            self.links.append(("link", d["href"].strip()))
+            self.links.append(("a", (d["href"] or "").strip()))
+        if tag == "link" and (d.get("rel") or "").strip().lower() == "stylesheet" and "href" in d:
+            self.links.append(("link", (d["href"] or "").strip()))
 
 
 def is_external(href: str) -> bool:
@@ -35,80 +54,155 @@ def is_external(href: str) -> bool:
 
 
 def path_without_fragment(href: str) -> str:
-    i = href.find("#")
-    return href[:i].strip() if i >= 0 else href.strip()
+    for sep in ("#", "?"):
+        i = href.find(sep)
+        if i >= 0:
+            href = href[:i]
+    return href.strip()
 
 
-def resolve_target(html_path: Path, href: str, public_root: Path) -> Path | None:
-    """Resolve href to a path under public_root. Returns None if external or invalid."""
+def resolve_target(src_rel: str, href: str) -> str | None:
+    """
+    Resolve href found in page src_rel (posix path relative to the site root) to a posix path
+    relative to the site root. None if external, empty or pointing outside the root.
+    """
     if not href or is_external(href):
         return None
-    path_part = path_without_fragment(href).lstrip("/")
-    if not path_part:
+    path_part = unquote(path_without_fragment(href))
+    if not path_part.lstrip("/"):
         return None
-    if href.strip().startswith("/"):
-        target = (public_root / path_part).resolve()
+    if path_part.startswith("/"):
+        joined = path_part.lstrip("/")
     else:
-        target = (html_path.parent / path_part).resolve()
-    try:
-        target.relative_to(public_root.resolve())
-    except ValueError:
+        joined = posixpath.join(posixpath.dirname(src_rel), path_part)
+    target = posixpath.normpath(joined)
+    if target == ".." or target.startswith("../"):
         return None
-    return target
-
-
-def resource_exists(target: Path, public_root: Path) -> bool:
-    """True if the target exists as a file or as a directory with index.html."""
-    if target.exists():
-        if target.is_file():
-            return True
-        if target.is_dir():
-            return (target / "index.html").exists()
-    # URL like /articles/slug/ -> no trailing slash in path_part, so target = public/articles/slug (may not exist as dir name without trailing slash)
-    if (target / "index.html").exists():
+    return "" if target == "." else target
+
+
+def resource_exists(target: str, files: set[str]) -> bool:
+    """True if target is a file in the tree, or a directory (with or without trailing slash) holding index.html."""
+    if target in files:
         return True
-    return False
+    return posixpath.join(target, "index.html") in files if target else "index.html" in files
 
 
-def audit() -> None:
-    public_root = PUBLIC_DIR.resolve()
-    if not public_root.exists():
-        print(f"ERROR: public directory not found: {public_root}")
-        return
+def scan_tree(root: Path) -> tuple[set[str], list[str]]:
+    """Walk root once: (all file paths, HTML file paths), posix and relative to root."""
+    files: set[str] = set()
+    html_files: list[str] = []
+    for dirpath, _dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        rel_dir = "" if rel_dir == "." else rel_dir.replace(os.sep, "/")
+        for name in filenames:
+            rel = f"{rel_dir}/{name}" if rel_dir else name
+            files.add(rel)
+            if name.endswith(".html"):
+                html_files.append(rel)
+    html_files.sort()
+    return files, html_files
+
+
+def extract_links(args: tuple[str, str]) -> tuple[str, list[tuple[str, str]] | None, str]:
+    """Worker: (rel, text) -> (rel, links or None on parse error, error message)."""
+    rel, text = args
+    parser = LinkCollector()
+    try:
+        parser.feed(text)
+        parser.close()
+    except Exception as e:
+        return rel, None, str(e)
+    return rel, parser.links, ""
+
+
+def _cache_path(site: str) -> Path:
+    return LOGS_DIR / f"audit_links_cache_{'pl' if site == 'pl' else 'main'}.json"
+
+
+def _load_cache(site: str) -> dict[str, dict]:
+    try:
+        data = json.loads(_cache_path(site).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION or not isinstance(data.get("pages"), dict):
+        return {}
+    return data["pages"]
+
+
+def _save_cache(site: str, pages: dict[str, dict]) -> None:
+    path = _cache_path(site)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"version": CACHE_VERSION, "pages": pages}, ensure_ascii=False), encoding="utf-8")
+    except OSError:
+        pass
 
-    broken: list[tuple[Path, str, Path]] = []  # (source_file, href, resolved_target)
-    checked_internal = 0
-    skipped_external = 0
 
-    for html_path in sorted(public_root.rglob("*.html")):
+def audit_site(site: str, out_dir: Path, workers: int = 0, use_cache: bool = True) -> int:
+    """Audit one output dir and print the report. Returns the number of problems (broken links + missing pages)."""
+    public_root = out_dir.resolve()
+    if not public_root.exists():
+        print(f"ERROR: output directory not found: {public_root}")
+        return 1
+    try:
+        label = str(public_root.relative_to(PROJECT_ROOT))
+    except ValueError:
+        label = str(public_root)
+
+    files, html_files = scan_tree(public_root)
+    cache = _load_cache(site) if use_cache else {}
+    pages: dict[str, dict] = {}
+    todo: list[tuple[str, str]] = []
+    for rel in html_files:
         try:
-            text = html_path.read_text(encoding="utf-8")
-        except Exception as e:
-            print(f"  (skip read {html_path}: {e})")
+            raw = (public_root / rel).read_bytes()
+        except OSError as e:
+            print(f"  (skip read {rel}: {e})")
             continue
-        parser = LinkCollector()
-        try:
-            parser.feed(text)
-        except Exception as e:
-            print(f"  (skip parse {html_path}: {e})")
+        digest = hashlib.sha256(raw).hexdigest()
+        hit = cache.get(rel)
+        if hit and hit.get("sha256") == digest:
+            pages[rel] = hit
             continue
-        rel_path = html_path.relative_to(public_root)
-        for tag, href in parser.links:
+        pages[rel] = {"sha256": digest, "links": []}
+        todo.append((rel, raw.decode("utf-8", errors="replace")))
+
+    workers = workers or (os.cpu_count() or 1)
+    if workers > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            results = list(pool.map(extract_links, todo, chunksize=max(1, len(todo) // (workers * 4))))
+    else:
+        results = [extract_links(item) for item in todo]
+    for rel, links, err in results:
+        if links is None:
+            print(f"  (skip parse {rel}: {err})")
+            pages.pop(rel, None)
+            continue
+        pages[rel]["links"] = links
+    if use_cache:
+        _save_cache(site, pages)
+
+    broken: list[tuple[str, str, str]] = []  # (source, href, resolved)
+    checked_internal = 0
+    skipped_external = 0
+    for rel in sorted(pages):
+        for _tag, href in pages[rel]["links"]:
             if is_external(href):
                 skipped_external += 1
                 continue
-            target = resolve_target(html_path, href, public_root)
+            target = resolve_target(rel, href)
             if target is None:
                 continue
             checked_internal += 1
-            if not resource_exists(target, public_root):
-                broken.append((html_path, href, target))
+            if not resource_exists(target, files):
+                broken.append((rel, href, target))
 
     # Report
     print("=" * 60)
-    print("INTERNAL LINK AUDIT (public/ as site root)")
+    print(f"INTERNAL LINK AUDIT ({label}/ as site root, site={site})")
     print("=" * 60)
-    print(f"  HTML files scanned: {len(list(public_root.rglob('*.html')))}")
+    print(f"  HTML files scanned: {len(html_files)} ({len(todo)} parsed, {len(html_files) - len(todo)} unchanged from cache)")
     print(f"  Internal links checked: {checked_internal}")
     print(f"  External links skipped: {skipped_external}")
     print()
@@ -117,36 +211,65 @@ def audit() -> None:
         print("BROKEN OR MISSING LINKS")
         print("-" * 60)
         for source, href, resolved in broken:
-            rel_src = source.relative_to(public_root)
-            print(f"  Source: {rel_src}")
+            print(f"  Source: {source}")
             print(f"    href: {href}")
-            try:
-                r = resolved.relative_to(public_root)
-            except ValueError:
-                r = resolved
-            print(f"    resolved: {r}")
+            print(f"    resolved: {resolved}")
             print()
         print(f"  Total broken: {len(broken)}")
     else:
         print("All checked internal links point to existing resources.")
 
+    # Pages the last build promised (URL map) but which are missing from the output dir
+    missing: list[tuple[str, str, str]] = []
+    url_map = load_url_map(site)
+    if url_map is not None and (PROJECT_ROOT / url_map.get("out_dir", "")).resolve() == public_root:
+        expected = [("article", s, e.get("path", "")) for s, e in url_map["articles"].items()]
+        expected += [("hub", s, e.get("path", "")) for s, e in url_map["hubs"].items()]
+        missing = [(kind, slug, rel) for kind, slug, rel in expected if rel and rel not in files]
+        print()
+        print(f"  URL map pages checked: {len(expected)}")
+        for kind, slug, rel in missing:
+            print(f"    MISSING {kind}: {slug} -> {rel}")
+        if not missing:
+            print("  All URL map pages exist.")
+
     # Quick asset check
-    assets_css = public_root / "assets" / "styles.css"
     print()
-    if assets_css.exists():
-        print("  /assets/styles.css: OK")
-    else:
-        print("  /assets/styles.css: MISSING")
-
+    print(f"  /assets/styles.css: {'OK' if 'assets/styles.css' in files else 'MISSING'}")
     # robots/sitemap (linked from index)
     for name in ("robots.txt", "sitemap.xml"):
-        p = public_root / name
-        if p.exists():
-            print(f"  /{name}: OK")
-        else:
-            print(f"  /{name}: MISSING (linked from index)")
+        print(f"  /{name}: {'OK' if name in files else 'MISSING (linked from index)'}")
     print("=" * 60)
+    return len(broken) + len(missing)
+
+
+def audit(sites: tuple[str, ...] = ("main", "pl"), workers: int = 0, use_cache: bool = True) -> int:
+    """Audit each site whose output dir exists (public/ always). Returns the total number of problems."""
+    problems = 0
+    for site in sites:
+        out_dir = default_out_dir(site)
+        if site != "main" and not out_dir.exists():
+            print(f"(skip site={site}: {out_dir.name}/ not built)")
+            continue
+        problems += audit_site(site, out_dir, workers=workers, use_cache=use_cache)
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Audit internal links in public/ and public_pl/ (exit 1 on broken links).")
+    parser.add_argument("--site", choices=("main", "pl", "all"), default="all", help="Site to audit (default: all)")
+    parser.add_argument("--out-dir", default=None, help="Audit this directory instead of the site's default output dir (single site)")
+    parser.add_argument("--workers", type=int, default=0, help="Parser processes (default: CPU count; 1 = no pool)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-parse every page (ignore logs/audit_links_cache_<site>.json)")
+    args = parser.parse_args()
+    if args.out_dir:
+        site = "main" if args.site == "all" else args.site
+        problems = audit_site(site, Path(args.out_dir), workers=args.workers, use_cache=not args.no_cache)
+    else:
+        sites = ("main", "pl") if args.site == "all" else (args.site,)
+        problems = audit(sites, workers=args.workers, use_cache=not args.no_cache)
+    sys.exit(1 if problems else 0)
 
 
 if __name__ == "__main__":
-    audit()
+    main()
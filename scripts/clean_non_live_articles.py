@@ -23,12 +23,14 @@ from content_index import (
     _parse_frontmatter,
     _parse_html_frontmatter_from_comment,
 )
+from url_map import fs_slugs, get_url_map
 
 # Set in main() from --content-root
 CONFIG_PATH = PROJECT_ROOT / "content" / "config.yaml"
 ARTICLES_DIR = PROJECT_ROOT / "content" / "articles"
 PUBLIC_ARTICLES_DIR = PROJECT_ROOT / "public" / "articles"
 ARCHIVE_DIR = PROJECT_ROOT / "content" / "articles_archive"
+SITE = "main"
 
 
 def _collect_content_stems_and_status(articles_dir: Path) -> dict[str, str]:
@@ -78,7 +80,8 @@ def get_content_files_for_stems(articles_dir: Path, stems: list[str]) -> list[Pa
 
 
 def get_stale_public_slugs(public_articles_dir: Path, production_slugs: set[str]) -> list[str]:
-    """Slugs (directory names) in public/articles that are not in production."""
+    """Slugs (directory names) in public/articles that are not in production.
+    production_slugs must contain filesystem slugs (shortened long slugs from the URL map)."""
     if not public_articles_dir.exists():
         return []
     stale: list[str] = []
@@ -115,7 +118,10 @@ def run(
 
     public_slugs: list[str] = []
     if do_public and PUBLIC_ARTICLES_DIR.exists():
-        public_slugs = get_stale_public_slugs(PUBLIC_ARTICLES_DIR, production_slugs)
+        # Output dirs use filesystem slugs (long slugs are shortened); keep both forms live
+        url_map = get_url_map(SITE, sorted(production_slugs), [], PUBLIC_ARTICLES_DIR.parent, save=False)
+        live_dirs = production_slugs | {fs_slugs(url_map).get(s, s) for s in production_slugs}
+        public_slugs = get_stale_public_slugs(PUBLIC_ARTICLES_DIR, live_dirs)
 
     lines: list[str] = []
     lines.append("Clean non-live articles")
@@ -176,7 +182,8 @@ def main() -> None:
 
     content_dir = get_content_root_path(PROJECT_ROOT, args.content_root)
     public_dir = PROJECT_ROOT / "public_pl" if args.content_root.strip().endswith("pl") else PROJECT_ROOT / "public"
-    global CONFIG_PATH, ARTICLES_DIR, PUBLIC_ARTICLES_DIR, ARCHIVE_DIR
+    global CONFIG_PATH, ARTICLES_DIR, PUBLIC_ARTICLES_DIR, ARCHIVE_DIR, SITE
+    SITE = "pl" if args.content_root.strip().endswith("pl") else "main"
     CONFIG_PATH = content_dir / "config.yaml"
     ARTICLES_DIR = content_dir / "articles"
     PUBLIC_ARTICLES_DIR = public_dir / "articles"
@@ -6,14 +6,13 @@ Run from project root. Use --write to apply; default is dry-run.
 """
 
 import argparse
-import json
 import os
 import re
 import sys
-import urllib.error
-import urllib.request
 from pathlib import Path
 
+from openai_client import call_responses
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 AFFILIATE_TOOLS_PATH = PROJECT_ROOT / "content" / "affiliate_tools.yaml"
 
@@ -25,42 +24,8 @@ INSTRUCTIONS = (
 
 
 def _call_api(instructions: str, user_message: str, *, model: str, base_url: str, api_key: str) -> str:
-    """POST to {base_url}/v1/responses. Return extracted text or raise."""
-    url = base_url.rstrip("/") + "/v1/responses"
-    payload = {
-        "model": model,
-        "instructions": instructions,
-        "input": user_message,
-    }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
-    )
-    try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            out = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as e:
-        body = e.read().decode("utf-8") if e.fp else ""
-        raise RuntimeError(f"API error {e.code}: {body}") from e
-    if isinstance(out.get("output_text"), str) and out["output_text"].strip():
-        return out["output_text"].strip()
-    for item in out.get("output") or []:
-        if item.get("type") == "message" and "content" in item:
-            c = item["content"]
-            if isinstance(c, str):
-                return c.strip()
-            if isinstance(c, list):
-                for part in c:
-                    if isinstance(part, dict) and part.get("type") == "output_text":
-                        if part.get("text"):
-                            return part["text"].strip()
-    raise RuntimeError("No output text in API response")
+    """POST to {base_url}/v1/responses over the shared keep-alive pool. Return extracted text or raise."""
+    return call_responses(instructions, user_message, model=model, base_url=base_url, api_key=api_key, timeout=60)
 
 
 def _yaml_quote(s: str) -> str:
@@ -1,20 +1,24 @@
 #!/usr/bin/env python3
 """
 Fill article skeletons: replace bracket placeholders [...] with AI-generated prose.
-Uses OpenAI Responses API (stdlib urllib only). Leaves {{...}} and structure intact.
+Uses OpenAI Responses API (stdlib only, shared keep-alive client in openai_client.py). Leaves {{...}} and structure intact.
 Default: dry-run. Use --write to modify files (with .bak backup).
+--workers N fills N articles concurrently (thread pool); file writes are atomic (temp + rename).
 """
 
 import argparse
 import hashlib
 import html
+import io
 import json
+import math
 import os
 import random
 import re
 import sys
-import urllib.error
-import urllib.request
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse, urlunparse
 from datetime import datetime
 from pathlib import Path
@@ -25,26 +29,53 @@ _SCRIPTS_DIR = Path(__file__).resolve().parent
 if str(_SCRIPTS_DIR) not in sys.path:
     sys.path.insert(0, str(_SCRIPTS_DIR))
 from content_root import get_content_root_path, get_affiliate_tools_path  # noqa: E402
+import api_cache  # noqa: E402
+import api_ledger  # noqa: E402
+from api_rate_limit import file_lock, utilisation  # noqa: E402
+from run_journal import RunJournal  # noqa: E402
+from openai_client import (  # noqa: E402
+    call_responses,
+    configure_retries,
+    create_batch,
+    extract_output_text,
+    file_content,
+    responses_cache_key,
+    retrieve_batch,
+    StreamAbort,
+    stream_responses,
+    upload_file,
+)
 
 ARTICLES_DIR = PROJECT_ROOT / "content" / "articles"
 RUN_TOOLS_PATH = PROJECT_ROOT / "content" / "run_tools.yaml"
 LOGS_DIR = PROJECT_ROOT / "logs"
 ERROR_LOG = LOGS_DIR / "errors.log"
-API_COSTS_PATH = LOGS_DIR / "api_costs.json"
 
 # Content types that use product/sales templates (no Template 1/2, no Try it yourself)
 PRODUCT_CONTENT_TYPES = ("sales", "product-comparison", "best-in-category", "category-products")
 
-# Blended rate $0.30 per 1M tokens (placeholder; no input/output split)
-COST_PER_MILLION_TOKENS = 0.30
+REFRESH_FAILURE_REASONS_FILE = LOGS_DIR / "refresh_failure_reasons.txt"
+# First-draft quality gate outcomes per (content_type, audience_type), for --speculative
+QUALITY_HISTORY_PATH = LOGS_DIR / "quality_history.json"
+QUALITY_HISTORY_LOCK = LOGS_DIR / "quality_history.lock"
 
 
-def _estimate_tokens(text: str) -> int:
-    """Rough heuristic: 1 token ~ 4 characters for English."""
-    return len(text) // 4
+# Serializes appends / read-modify-write of the shared files in logs/ when --workers > 1
+_LOG_LOCK = threading.Lock()
 
 
-REFRESH_FAILURE_REASONS_FILE = LOGS_DIR / "refresh_failure_reasons.txt"
+def _atomic_write_text(path: Path, text: str) -> None:
+    """Write text via a temp file in the same directory + os.replace, so readers never see a partial file."""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
 
 
 def _append_error_log(slug: str, level: str, message: str) -> None:
@@ -52,7 +83,7 @@ def _append_error_log(slug: str, level: str, message: str) -> None:
     try:
         LOGS_DIR.mkdir(parents=True, exist_ok=True)
         ts = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-        with open(ERROR_LOG, "a", encoding="utf-8") as f:
+        with _LOG_LOCK, open(ERROR_LOG, "a", encoding="utf-8") as f:
             f.write(f"{ts} [{level}] {slug}: {message}\n")
     except OSError:
         pass
@@ -64,32 +95,12 @@ def _append_refresh_failure_reason(slug: str, reasons: list[str]) -> None:
         return
     try:
         LOGS_DIR.mkdir(parents=True, exist_ok=True)
-        with open(REFRESH_FAILURE_REASONS_FILE, "a", encoding="utf-8") as f:
+        with _LOG_LOCK, open(REFRESH_FAILURE_REASONS_FILE, "a", encoding="utf-8") as f:
             f.write(f"{slug}\t{'; '.join(reasons)}\n")
     except OSError:
         pass
 
 
-def _record_fill_cost(slug: str, content: str) -> None:
-    """Append estimated cost for this fill to logs/api_costs.json (by date)."""
-    try:
-        LOGS_DIR.mkdir(parents=True, exist_ok=True)
-        tokens = _estimate_tokens(content)
-        cost = (tokens / 1_000_000) * COST_PER_MILLION_TOKENS
-        data = {}
-        if API_COSTS_PATH.exists():
-            try:
-                data = json.loads(API_COSTS_PATH.read_text(encoding="utf-8"))
-            except (json.JSONDecodeError, OSError):
-                data = {}
-        by_date = data.get("by_date") or {}
-        today = datetime.now().strftime("%Y-%m-%d")
-        by_date[today] = by_date.get(today, 0) + cost
-        data["by_date"] = by_date
-        API_COSTS_PATH.write_text(json.dumps(data, indent=2), encoding="utf-8")
-    except OSError:
-        pass
-
 # Bracket placeholder: [...] that is NOT a markdown link [...](url)
 BRACKET_PLACEHOLDER = re.compile(r"\[[^\]]+\](?!\s*\()")
 
@@ -784,7 +795,7 @@ def _split_tools_by_affiliate(
     Returns 3-tuples (name, url, short_desc) for compatibility with prompt builders."""
     affiliate: list[tuple[str, str, str]] = []
     other: list[tuple[str, str, str]] = []
-    for name, url, short_desc, _ in tools:
+    for name, url, short_desc, *_ in tools:
         if not url:
             continue
         if _is_affiliate_url(url):
@@ -794,6 +805,103 @@ def _split_tools_by_affiliate(
     return (affiliate, other)
 
 
+# Without run_tools.yaml, fill prompts carry only the catalog tools most relevant to the article
+CATALOG_TOP_K = 12
+# At most this many picks from one catalog category (tools named in the frontmatter excepted), so one
+# family of near-identical tools (e.g. the affiliate networks) cannot fill the list
+CATALOG_PER_CATEGORY = 3
+# Used to pad the selection when fewer tools match the article: general-purpose tools that fit any workflow
+CATALOG_FALLBACK_CATEGORIES = ("ai-chat", "automation")
+_CATALOG_STOP_TERMS = frozenset(
+    "and are based can for from how into its that the this tool tools use used user users using what when with you your".split()
+)
+_catalog_index_cache: dict = {}
+
+
+def _catalog_terms(text: str) -> list[str]:
+    """Lowercase word terms (3+ chars, no stop words, trailing plural 's' dropped) for tool ranking."""
+    terms = []
+    for word in re.findall(r"[a-z0-9]+", (text or "").lower()):
+        if len(word) < 3 or word in _CATALOG_STOP_TERMS:
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def _catalog_index() -> tuple[list[tuple[str, str, str, str, str]], dict[str, dict[int, float]]]:
+    """
+    (catalog tools, term -> {tool index: weight}), built once per version of affiliate_tools.yaml.
+    Weight = fields the term appears in (name counts double; category, description) times the term's idf.
+    """
+    path = get_affiliate_tools_path(PROJECT_ROOT)
+    try:
+        stamp = (str(path), path.stat().st_mtime_ns)
+    except OSError:
+        stamp = (str(path), None)
+    cached = _catalog_index_cache.get("index")
+    if cached and cached[0] == stamp:
+        return cached[1], cached[2]
+    tools = _load_affiliate_tools()
+    counts: list[dict[str, int]] = []
+    for name, _url, short_desc, category, _label in tools:
+        tf: dict[str, int] = {}
+        for field_terms, weight in ((_catalog_terms(name), 2), (_catalog_terms(category), 1), (_catalog_terms(short_desc), 1)):
+            for term in set(field_terms):
+                tf[term] = tf.get(term, 0) + weight
+        counts.append(tf)
+    df: dict[str, int] = {}
+    for tf in counts:
+        for term in tf:
+            df[term] = df.get(term, 0) + 1
+    postings: dict[str, dict[int, float]] = {}
+    for i, tf in enumerate(counts):
+        for term, n in tf.items():
+            postings.setdefault(term, {})[i] = n * math.log((1 + len(tools)) / df[term])
+    _catalog_index_cache["index"] = (stamp, tools, postings)
+    return tools, postings
+
+
+def _rank_catalog_tools(meta: dict, k: int = CATALOG_TOP_K) -> list[tuple[str, str, str, str, str]]:
+    """
+    The k catalog tools that best match the article's title, primary keyword, category and frontmatter
+    tools (named tools always make the cut), in catalog order. At most CATALOG_PER_CATEGORY per category;
+    padded from CATALOG_FALLBACK_CATEGORIES.
+    """
+    tools, postings = _catalog_index()
+    scores: dict[int, float] = {}
+    fields = (
+        (meta.get("title"), 1.0),
+        (meta.get("primary_keyword"), 2.0),
+        (meta.get("category") or meta.get("category_slug"), 1.5),
+    )
+    for text, weight in fields:
+        for term in set(_catalog_terms(str(text or ""))):
+            for i, w in postings.get(term, {}).items():
+                scores[i] = scores.get(i, 0.0) + weight * w
+    named = {n.strip().lower() for n in str(meta.get("tools") or "").split(",") if n.strip()}
+    for i, tool in enumerate(tools):
+        if tool[0].strip().lower() in named:
+            scores[i] = scores.get(i, 0.0) + 1000.0
+    picked: list[int] = []
+    per_category: dict[str, int] = {}
+    for i in sorted((i for i, v in scores.items() if v > 0), key=lambda i: (-scores[i], i)):
+        category = tools[i][3]
+        if len(picked) >= k:
+            break
+        if tools[i][0].strip().lower() not in named and per_category.get(category, 0) >= CATALOG_PER_CATEGORY:
+            continue
+        per_category[category] = per_category.get(category, 0) + 1
+        picked.append(i)
+    for i, tool in enumerate(tools):
+        if len(picked) >= k:
+            break
+        if i not in picked and tool[3] in CATALOG_FALLBACK_CATEGORIES:
+            picked.append(i)
+    return [tools[i] for i in sorted(picked)]
+
+
 def _audience_type_from_stem(stem: str) -> str | None:
     """If stem ends with .audience_<type> and type is beginner/intermediate/professional, return it; else None."""
     if not stem or ".audience_" not in stem:
@@ -952,11 +1060,24 @@ def _article_lang_instructions(meta: dict) -> tuple[str, str, str]:
     )
 
 
+# Heading of the per-article tail of every fill prompt. Everything before it is the same for all articles
+# of a run (same language and tool list), so the provider's prompt cache can reuse that prefix.
+_ARTICLE_RULES_HEADING = "ARTICLE-SPECIFIC RULES (this article only; they complete the rules above):"
+
+
+def _with_article_rules(static: str, rules: list[str]) -> str:
+    """Static instructions first, then the non-empty per-article rules under _ARTICLE_RULES_HEADING."""
+    rules = [r.strip() for r in rules if r and r.strip()]
+    if not rules:
+        return static
+    return static + "\n\n" + _ARTICLE_RULES_HEADING + "\n\n" + "\n\n".join(rules)
+
+
 def _build_product_html_prompt(meta, affiliate_tools, other_tools):
     """(instructions, user_message) for product/sales content types. No Template 1/2, no Try it yourself.
     Article language: English or Polish (from meta.lang). Conversational, natural tone; contextual section titles; comparison table where applicable;
     CTA with two elements (engaging question + link to platform). Reader = person looking for products/solutions."""
-    lang_line, section_lang, in_lang = _article_lang_instructions(meta)
+    lang_line, _, in_lang = _article_lang_instructions(meta)
     tools_section_heading = _tools_section_strings((meta.get("lang") or "").strip().lower() or "en")[0]
     ct = (meta.get("content_type") or "").strip().lower()
     title = (meta.get("title") or "").strip()
@@ -968,21 +1089,22 @@ def _build_product_html_prompt(meta, affiliate_tools, other_tools):
         name, url, short = t[0], t[1], t[2]
         return f"{name}={url}|{short}" if short else f"{name}={url}"
 
+    # Linking rules are the same for every article; the ranked tool lists and CTA labels go in the article tail
     tools_blob = ""
+    tool_lists: list[str] = []
     if affiliate_tools or other_tools:
-        parts = []
-        if affiliate_tools:
-            parts.append("Affiliate tools: " + ", ".join(_fmt(t) for t in affiliate_tools if t[1]))
-        if other_tools:
-            parts.append("Other tools: " + ", ".join(_fmt(t) for t in other_tools if t[1]))
         tools_blob = (
-            " ".join(parts)
-            + "\n\nLINKING: First occurrence <a href=\"URL\">Name</a> (description). Later: link name only. "
-            "In the Comparison table, use affiliate links from the list above in the 'Where to buy' column. Do not invent tools.\n"
+            "LINKING: The Affiliate and Other tool lists are given at the end. First occurrence <a href=\"URL\">Name</a> (description). Later: link name only. "
+            "In the Comparison table, use affiliate links from those lists in the 'Where to buy' column. Do not invent tools.\n"
         )
-    cta_map_product = {(name or "").strip(): (label or "").strip() for name, _u, _s, _c, label in _load_affiliate_tools() if (name or "").strip() and (label or "").strip()}
+        if affiliate_tools:
+            tool_lists.append("Affiliate tools: " + ", ".join(_fmt(t) for t in affiliate_tools if t[1]))
+        if other_tools:
+            tool_lists.append("Other tools: " + ", ".join(_fmt(t) for t in other_tools if t[1]))
+    listed = {t[0] for t in affiliate_tools + other_tools}
+    cta_map_product = {(name or "").strip(): (label or "").strip() for name, _u, _s, _c, label in _load_affiliate_tools() if (name or "").strip() in listed and (label or "").strip()}
     if cta_map_product:
-        tools_blob += "\n\nCTA / action button text (use as link text in the CTA section when linking to the tool; if not listed, use default e.g. 'Check it out'): " + ", ".join(f"{n}: '{l}'" for n, l in cta_map_product.items())
+        tool_lists.append("CTA / action button text (use as link text in the CTA section when linking to the tool; if not listed, use default e.g. 'Check it out'): " + ", ".join(f"{n}: '{l}'" for n, l in cta_map_product.items()))
 
     # Section list per type; model must use concrete reader-friendly H2 titles (see instructions below)
     if ct == "sales":
@@ -1015,27 +1137,25 @@ def _build_product_html_prompt(meta, affiliate_tools, other_tools):
     comparison_table_instruction = ""
     if ct in ("product-comparison", "best-in-category"):
         comparison_table_instruction = """
-COMPARISON TABLE (required for this content type): Include one section with an H2 like "Comparison table" or "At a glance: comparison". The table must be HTML: <table class="min-w-full border border-gray-200"> with <thead> and <tbody>. Columns: (1) Product name, (2) Price (approximate range, e.g. \"10–30 EUR\" or \"from X\"; no unverified exact prices), (3) Features (e.g. GPS, QR, reflective; short list or keywords), (4) Where to buy (use <a href=\"URL\">link text</a> from the Affiliate/Other tool list above). Include at least 3–5 rows. Readers love comparison tables; place affiliate links in the Where to buy column.
+COMPARISON TABLE (required for this content type): Include one section with an H2 like "Comparison table" or "At a glance: comparison". The table must be HTML: <table class="min-w-full border border-gray-200"> with <thead> and <tbody>. Columns: (1) Product name, (2) Price (approximate range, e.g. \"10–30 EUR\" or \"from X\"; no unverified exact prices), (3) Features (e.g. GPS, QR, reflective; short list or keywords), (4) Where to buy (use <a href=\"URL\">link text</a> from the Affiliate/Other tool lists). Include at least 3–5 rows. Readers love comparison tables; place affiliate links in the Where to buy column.
 """
 
     instructions = f"""You are a documentation writer. Generate the BODY of an article as HTML only. Output goes inside <article>; no <html>/<body>/H1. Do NOT include a "Disclosure" section (site adds it automatically).
 
-{lang_line}
-
 AUDIENCE: The reader is someone looking for products or solutions (e.g. bicycle accessories, tools to buy), not someone implementing business processes. Write for a buyer/consumer perspective.
 
 LANGUAGE AND TONE: Use a conversational, natural tone. Address the reader as "you". Use short, practical sentences. Avoid corporate or B2B playbook style. FORBIDDEN phrases: "Before diving into the details…", "It is crucial to understand…", "Implement automation when…". PREFERRED equivalents: "What to look for when choosing…", "If you're looking for…", "It's worth comparing…", "It's worth a look."
 
-SECTION TITLES: Each H2 must be a concrete, reader-friendly title {section_lang} that describes what the section covers. Do NOT use generic labels like "Key benefits" or "Comparison criteria" as the exact H2 text. Use descriptive titles adapted to the article topic, e.g. "What to look for when choosing bicycle accessories", "Examples of products available on marketplaces", "Cost comparison", "Which option fits your budget?". Use the article title and category to choose appropriate section titles.
+SECTION TITLES: Each H2 must be a concrete, reader-friendly title in the article language (see LANGUAGE at the end) that describes what the section covers. Do NOT use generic labels like "Key benefits" or "Comparison criteria" as the exact H2 text. Use descriptive titles adapted to the article topic, e.g. "What to look for when choosing bicycle accessories", "Examples of products available on marketplaces", "Cost comparison", "Which option fits your budget?". Use the article title and category to choose appropriate section titles.
 
-REQUIRED SECTIONS (H2/H3): {sections}
+REQUIRED SECTIONS (H2/H3): listed at the end, for this content type.
 You MUST include an H2 section titled "FAQ" or "Frequently Asked Questions" (or very similar, e.g. "Common questions"). You MUST include a section that explains what this product category is (e.g. "What this category is", "About this category", "What is [category]").
-{comparison_table_instruction}
+
 COST COMPARISON: Include a "Cost comparison" (or similar) section with approximate price ranges typical for the category and practical tips (e.g. loyalty programs, seasonal promotions, "it's worth searching"). You may use ranges like "10–30 EUR" or "from around X"; do not state unverified exact prices for specific products. Do not claim "best price" or "#1".
 
 CTA (end of article, mandatory): The closing must include exactly two elements: (1) One engaging sentence that invites the reader to respond, e.g. "Do you use any extra security for your bike? Let us know in the comments!" (2) One sentence with a clear call to action and a link to a marketplace or product (use an affiliate link from the tool list when it fits), e.g. "If you're looking for the right fit, check out offers on [platform name] — they often run promotions." Both sentences must be present.
 
-{tools_section_heading}: near the end, <ul> with <a href> and one-sentence description per tool used. If no tools, omit.
+TOOLS SECTION: near the end, <ul> with <a href> and one-sentence description per tool used. If no tools, omit. Its H2 title is given at the end.
 
 RULES: No [bracket] placeholders; use (variable) for slots. FORBIDDEN: "the best", "unlimited", "limit to", "limited to", "up to [number]", "#1". Avoid corporate-documentation phrases such as "Before diving into the details", "It is crucial to understand", "Implement automation when" — use a natural, conversational tone instead. You MAY use approximate price ranges (e.g. "10–30 EUR") and the words "cost", "price", "price range"; avoid unverified exact prices for specific products. Include realistic product/brand names where they help (e.g. BikeRegister, Immobilise, or category-typical names). Do not claim "best price" or "#1".
 
@@ -1043,11 +1163,17 @@ STYLE: <h2 class="text-3xl font-bold mt-8 mb-4">, <h3 class="text-xl font-semibo
 
 {tools_blob}
 
-Output ONLY the HTML fragment. At the end add one line: TOOLS_SELECTED: ToolName1, ToolName2, ... (1-5 tools, names from lists above)."""
+Output ONLY the HTML fragment. At the end add one line: TOOLS_SELECTED: ToolName1, ToolName2, ... (1-5 tools, names from the tool lists)."""
     al = _audience_instruction(audience_type)
-    if al:
-        instructions += "\n\nAudience level: " + al
-    instructions += "\n\nLength: " + _audience_length_guidance(audience_type)
+    instructions = _with_article_rules(instructions, [
+        *tool_lists,
+        lang_line,
+        f"REQUIRED SECTIONS (H2/H3): {sections}",
+        comparison_table_instruction,
+        f"TOOLS SECTION title: {tools_section_heading}",
+        "Audience level: " + al if al else "",
+        "Length: " + _audience_length_guidance(audience_type),
+    ])
 
     user = f"Article title: {title}\nPrimary keyword: {keyword}\nCategory: {category}\nContent type: {ct}\nTarget audience: {audience_type}\n\nGenerate the full article body in HTML, {in_lang}. Use concrete section titles adapted to this topic. Conversational tone; cost comparison and CTA (two sentences) required. " + _audience_length_guidance(audience_type) + " No [bracket] placeholders."
     return instructions, user
@@ -1076,30 +1202,31 @@ def _build_html_prompt(
             return f"{name}={url}|{short}"
         return f"{name}={url}"
 
+    # Linking rules are the same for every article; the ranked tool lists and CTA labels go in the article tail
     tools_blob = ""
+    tool_lists: list[str] = []
     if affiliate_tools or other_tools:
-        parts = []
         if affiliate_tools:
-            parts.append(
+            tool_lists.append(
                 "Affiliate tools (prefer when the tool truly fits the sentence/paragraph context; use exact URL): "
                 + ", ".join(_fmt(t) for t in affiliate_tools if t[1])
             )
         if other_tools:
-            parts.append(
+            tool_lists.append(
                 "Other tools (use when no affiliate tool fits the context; choose the best match for the task): "
                 + ", ".join(_fmt(t) for t in other_tools if t[1])
             )
-        tools_blob = " ".join(parts) + "\n\n"
-        tools_blob += (
-            "LINKING RULES:\n"
+        tools_blob = (
+            "LINKING RULES (the Affiliate and Other tool lists are given at the end):\n"
             "- Prefer tools from the Affiliate list when they are a good fit for the context. Use the Other list only when no affiliate tool fits.\n"
             "- Use the tool descriptions (after | in the list) to choose tools that match the article topic for the article body and \"List of platforms and tools\" (e.g. video tools for video articles, automation tools for workflow articles). The tool shown in the \"Try it yourself\" descriptor line is chosen by the system and need not match the article's primary tool.\n"
             "- At the first occurrence of each tool in the article body, use this format: <a href=\"URL\">Name</a> (short description in English, one sentence). At later occurrences of the same tool, link only the name: <a href=\"URL\">Name</a>, without repeating the description.\n"
-            "- If a tool has a description after | in the list above (e.g. Name=URL|description), use that description in the parentheses and in \"List of platforms and tools\"; do not invent a different description. Only when no description is given after |, write a factual one-sentence description; if unsure, use a generic form like \"AI tool for [category or use case]\"."
+            "- If a tool has a description after | in its list (e.g. Name=URL|description), use that description in the parentheses and in \"List of platforms and tools\"; do not invent a different description. Only when no description is given after |, write a factual one-sentence description; if unsure, use a generic form like \"AI tool for [category or use case]\"."
         )
-    cta_map = {(name or "").strip(): (label or "").strip() for name, _u, _s, _c, label in _load_affiliate_tools() if (name or "").strip() and (label or "").strip()}
+    listed = {t[0] for t in affiliate_tools + other_tools}
+    cta_map = {(name or "").strip(): (label or "").strip() for name, _u, _s, _c, label in _load_affiliate_tools() if (name or "").strip() in listed and (label or "").strip()}
     if cta_map:
-        tools_blob += "\n\nCTA / action button text (use this as the link text when linking to the tool in the CTA section; if not listed, use a default like 'Check it out' or 'Read more'): " + ", ".join(f"{n}: '{l}'" for n, l in cta_map.items())
+        tool_lists.append("CTA / action button text (use this as the link text when linking to the tool in the CTA section; if not listed, use a default like 'Check it out' or 'Read more'): " + ", ".join(f"{n}: '{l}'" for n, l in cta_map.items()))
 
     instructions = f"""You are a documentation writer. Generate the BODY of an article as HTML only. The output will be inserted inside an <article> tag; the page already has header, footer, and the article title (H1). Do NOT output <html>, <head>, <body>, or an H1 — start with the first section (e.g. Introduction or first H2). Do not generate any part of the page layout (header, footer, navigation); only the article content.
 IMPORTANT: Do NOT include a "Disclosure" section. The site template adds a disclosure box automatically at the end of every article.
@@ -1120,13 +1247,11 @@ REQUIRED SECTIONS (include every one, in this order; use H2 for main sections, H
 - {tools_section_heading} (place near the end, e.g. after FAQ or after Internal links; see "SECTION: List of platforms and tools" below)
 - Optionally: Case study (a few paragraphs illustrating a real-world scenario: specific data, challenges, and outcomes; see example below)
 
-{_try_it_yourself_instruction(content_type, audience_type, html=True)}
-
 SECTION: "{tools_section_heading}"
 Include a section titled "{tools_section_heading}" near the end of the article (e.g. after FAQ or after Internal links; choose a consistent, logical position). This section gives readers a quick reference and supports affiliate links.
 - Placement: Near the end, after FAQ or after Internal links. Do not place after the disclosure (the template adds disclosure automatically).
-- Content: A bulleted list. For each tool that is both (a) in the Affiliate or Other tool list above and (b) actually linked or clearly mentioned in the article body, add one bullet containing: the tool name as a link using the exact URL from the list above, then a short one-sentence description in English. Do not list tools that you did not use or link in the article.
-- Description rules: When a description was provided after | in the tool list above, use that exact description here and in the article body; do not invent a different one. Only when no description is given after |, write a factual one-sentence description in English. Avoid vague phrases like "powerful tool". Do not invent tools.
+- Content: A bulleted list. For each tool that is both (a) in the Affiliate or Other tool list and (b) actually linked or clearly mentioned in the article body, add one bullet containing: the tool name as a link using the exact URL from that list, then a short one-sentence description in English. Do not list tools that you did not use or link in the article.
+- Description rules: When a description was provided after | in the tool list, use that exact description here and in the article body; do not invent a different one. Only when no description is given after |, write a factual one-sentence description in English. Avoid vague phrases like "powerful tool". Do not invent tools.
 - Format: Use H2 for the section title. Use <ul class="list-disc list-inside space-y-2 text-gray-700"> for the list. Each item: <a href="URL">Tool Name</a> — description sentence. Include only tools that appear in the article body; do not invent tools. If both lists are empty, omit this section.
 
 IMPORTANT — LENGTH: Follow the audience-based length rule (see Audience and Length below). To achieve the required word count, consider adding a "Case study" section: a concrete example of someone using the described AI tools, with specific data, challenges, and outcomes (a few paragraphs long). Example tone: "A small e-commerce company, ShopSmart, used Descript to analyze competitor social media videos. They discovered that competitors were heavily using influencer marketing, which led them to pivot their strategy. Within three months, their engagement increased by 40%."
@@ -1156,11 +1281,14 @@ At the very end of your response (after the HTML), add exactly two plain-text li
 HEADLINE: Your reader-friendly article headline (one line; not the raw use-case title from the input)
 TOOLS_SELECTED: ToolName1, ToolName2, ...
 - HEADLINE: one line, sentence case; the pipeline uses it as the article title (H1).
-- TOOLS_SELECTED: minimum 1, maximum 5 tools; names must match exactly one of the tools from the lists above; do not invent tool names."""
+- TOOLS_SELECTED: minimum 1, maximum 5 tools; names must match exactly one of the tools from the tool lists; do not invent tool names."""
     audience_line = _audience_instruction(audience_type)
-    if audience_line:
-        instructions += "\n\nAudience (MUST follow): " + audience_line
-    instructions += "\n\nLength (MUST follow): " + _audience_length_guidance(audience_type)
+    instructions = _with_article_rules(instructions, [
+        *tool_lists,
+        _try_it_yourself_instruction(content_type, audience_type, html=True),
+        "Audience (MUST follow): " + audience_line if audience_line else "",
+        "Length (MUST follow): " + _audience_length_guidance(audience_type),
+    ])
 
     user = f"Article title: {title}\n"
     if keyword:
@@ -1471,43 +1599,8 @@ def call_responses_api(
     base_url: str,
     api_key: str,
 ) -> str:
-    """POST to {base_url}/v1/responses. Return extracted text or raise."""
-    url = base_url.rstrip("/") + "/v1/responses"
-    payload = {
-        "model": model,
-        "instructions": instructions,
-        "input": user_message,
-    }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
-    )
-    try:
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            out = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as e:
-        body = e.read().decode("utf-8") if e.fp else ""
-        raise RuntimeError(f"API error {e.code}: {body}") from e
-    # Prefer output_text; else scan output items for message content
-    if isinstance(out.get("output_text"), str) and out["output_text"].strip():
-        return out["output_text"].strip()
-    for item in out.get("output") or []:
-        if item.get("type") == "message" and "content" in item:
-            c = item["content"]
-            if isinstance(c, str):
-                return c.strip()
-            if isinstance(c, list):
-                for part in c:
-                    if isinstance(part, dict) and part.get("type") == "output_text":
-                        if part.get("text"):
-                            return part["text"].strip()
-    raise RuntimeError("No output text in API response")
+    """POST to {base_url}/v1/responses over the shared keep-alive pool. Return extracted text or raise."""
+    return call_responses(instructions, user_message, model=model, base_url=base_url, api_key=api_key, timeout=120)
 
 
 _PROMPT1_HTML_RE = re.compile(
@@ -2574,35 +2667,35 @@ def _build_product_md_prompt(meta: dict, body: str) -> tuple[str, str]:
     """(instructions, user_message) for product/sales content types when filling markdown (no HTML).
     Article language from meta.lang (English or Polish). Conversational tone; no Decision rules, Tradeoffs, Try it yourself, Template 1/2.
     Required: contextual H2s, cost comparison, table (where applicable), CTA with two elements."""
-    lang_line, section_lang, _ = _article_lang_instructions(meta)
+    lang_line, _, _ = _article_lang_instructions(meta)
     ct = (meta.get("content_type") or "").strip().lower()
     title = (meta.get("title") or "").strip()
     keyword = (meta.get("primary_keyword") or "").strip()
     category = (meta.get("category") or meta.get("category_slug") or "").strip()
     audience_type = (meta.get("audience_type") or "").strip()
     tools_note = ""
+    tools_rule = ""
     if _has_assigned_tools(meta):
         tool_names = [t.strip() for t in (meta.get("tools") or "").split(",") if t.strip()]
-        tools_note = f" You may mention only these tools: {', '.join(tool_names)}."
+        tools_note = " The tools for this article are given at the end."
+        tools_rule = f"Tools: You may mention only these tools: {', '.join(tool_names)}."
     else:
-        all_tools = _load_affiliate_tools()
-        tools_for_prompt = [f"{n} ({s})" if s else n for n, _u, s, _ in all_tools if (n or "").strip()]
+        tools_for_prompt = [f"{n} ({s})" if s else n for n, _u, s, *_ in _rank_catalog_tools(meta) if (n or "").strip()]
         if tools_for_prompt:
-            tools_note = (
-                " From the list below choose 1–5 tools that fit the article topic. "
+            tools_note = " The tools for this article are given at the end."
+            tools_rule = (
+                "Tools: From the list below choose 1–5 tools that fit the article topic. "
                 f"Available tools: {', '.join(tools_for_prompt)}. "
                 "At the end of your response, on the last line, write: TOOLS_SELECTED: ToolName1, ToolName2, ..."
             )
 
-    instructions = f"""You are a writer. Replace ONLY bracket placeholders [like this] in the given markdown skeleton with real prose. Return the full markdown body (no frontmatter). Do not change any {{{{MUSTACHE}}}} placeholders (e.g. {{{{TOOLS_MENTIONED}}}}, {{{{CTA_BLOCK}}}}, {{{{INTERNAL_LINKS}}}}). Leave them exactly as-is.
-
-{lang_line}
+    instructions = """You are a writer. Replace ONLY bracket placeholders [like this] in the given markdown skeleton with real prose. Return the full markdown body (no frontmatter). Do not change any {{MUSTACHE}} placeholders (e.g. {{TOOLS_MENTIONED}}, {{CTA_BLOCK}}, {{INTERNAL_LINKS}}). Leave them exactly as-is.
 
 AUDIENCE: The reader is someone looking for products or solutions (e.g. bicycle accessories, tools to buy), not someone implementing business processes. Write for a buyer/consumer perspective.
 
 TONE: Conversational, natural. Address the reader as "you". Use short, practical sentences. Do NOT use corporate or B2B playbook style. FORBIDDEN: "Before diving into the details…", "It is crucial to understand…", "Implement automation when…". PREFERRED: "What to look for when choosing…", "If you're looking for…", "It's worth comparing…", "It's worth a look."
 
-SECTION TITLES (H2): Each H2 must be a concrete, reader-friendly title {section_lang} that describes the section. Do NOT use generic labels like "Key benefits" or "Comparison criteria" as the exact H2. Use descriptive titles adapted to the topic (e.g. "What to look for when choosing bicycle accessories", "Cost comparison", "Which option fits your budget?").
+SECTION TITLES (H2): Each H2 must be a concrete, reader-friendly title in the article language (see LANGUAGE at the end) that describes the section. Do NOT use generic labels like "Key benefits" or "Comparison criteria" as the exact H2. Use descriptive titles adapted to the topic (e.g. "What to look for when choosing bicycle accessories", "Cost comparison", "Which option fits your budget?").
 
 FORBIDDEN SECTIONS: Do NOT add: Decision rules, Tradeoffs, Failure modes, SOP checklist, Template 1, Template 2, Try it yourself. This pipeline uses only product/shopping sections.
 
@@ -2614,19 +2707,25 @@ REQUIRED CONTENT:
 - FAQ.
 - CTA at the end with exactly two elements: (1) One engaging sentence inviting the reader to respond (e.g. "Do you use any extra security for your bike? Let us know in the comments!"). (2) One sentence with call to action and link to platform (use affiliate/tool list when it fits).
 """
+    comparison_table = ""
     if ct in ("product-comparison", "best-in-category"):
-        instructions += """
-- Comparison table: Include a section with an H2 like "Comparison table" or "At a glance". The table must be HTML: <table> with columns: Product name, Price (approximate range), Features, Where to buy (link from tool list). Include 3–5 rows.
-"""
+        comparison_table = (
+            "REQUIRED CONTENT (also, for this content type): Comparison table: Include a section with an H2 like \"Comparison table\" or \"At a glance\". "
+            "The table must be HTML: <table> with columns: Product name, Price (approximate range), Features, Where to buy (link from tool list). Include 3–5 rows."
+        )
     instructions += f"""
 RULES: No [bracket] tokens in output; use (variable) for slots. FORBIDDEN: "the best", "#1", unverified exact prices. You MAY use approximate price ranges ("10–30 EUR", "from around X") and the words "cost", "price". Include realistic product/brand names where they help.{tools_note}
 
 Heading freeze: Do not add, remove, or rename headings. Only replace bracket placeholders and fill under existing headings.
 """
     audience_line = _audience_instruction(audience_type)
-    if audience_line:
-        instructions += "\n\nAudience: " + audience_line
-    instructions += "\n\nLength: " + _audience_length_guidance(audience_type)
+    instructions = _with_article_rules(instructions, [
+        lang_line,
+        comparison_table,
+        tools_rule,
+        "Audience: " + audience_line if audience_line else "",
+        "Length: " + _audience_length_guidance(audience_type),
+    ])
 
     user = f"Article title: {title}\nPrimary keyword: {keyword}\nCategory: {category}\nContent type: {ct}\n"
     if audience_type:
@@ -2644,14 +2743,15 @@ def build_prompt(meta: dict, body: str, style: str = "docs") -> tuple[str, str]:
     content_type = (meta.get("content_type") or "").strip()
     audience_type = (meta.get("audience_type") or "").strip()
     tools_note = ""
+    tools_rule = ""
     if _has_assigned_tools(meta):
         tool_names = [t.strip() for t in (meta.get("tools") or "").split(",") if t.strip()]
         unique = list(dict.fromkeys(tool_names))
-        tools_note = f" You may mention only these tools (do not invent others): {', '.join(unique)}."
+        tools_note = " The tools for this article are given at the end."
+        tools_rule = f"Tools: You may mention only these tools (do not invent others): {', '.join(unique)}."
     else:
-        all_tools = _load_affiliate_tools()
         tools_for_prompt: list[str] = []
-        for name, _url, short_desc, _ in all_tools:
+        for name, _url, short_desc, *_ in _rank_catalog_tools(meta):
             name = name.strip()
             if not name:
                 continue
@@ -2660,8 +2760,9 @@ def build_prompt(meta: dict, body: str, style: str = "docs") -> tuple[str, str]:
             else:
                 tools_for_prompt.append(name)
         if tools_for_prompt:
-            tools_note = (
-                " No tools are pre-assigned. From the list below, choose 1 to 5 tools "
+            tools_note = " The tools for this article are given at the end."
+            tools_rule = (
+                "Tools: No tools are pre-assigned. From the list below, choose 1 to 5 tools "
                 "that are MOST USEFUL for solving the problem described in this article. "
                 "Use the tool descriptions in parentheses to pick tools that match the article topic. "
                 "Selection criteria: direct relevance to the article's task and goals, not general popularity. Prefer tools from the 'referral' category when they fit.\n"
@@ -2735,8 +2836,6 @@ No invention policy:
 - Do not add external links.
 - {style_phrase}
 
-{_try_it_yourself_instruction(content_type, audience_type, html=False)}
-
 OUTPUT CONTRACT (MUST FOLLOW EXACTLY):
 
 A) You MUST include these exact marker labels somewhere under existing sections (H3/H4 allowed, no new H2):
@@ -2759,9 +2858,12 @@ SELF-CHECK (before finishing): Verify that your response includes: Decision rule
 
 Output must feel like an internal playbook: decisions + steps."""
     audience_line = _audience_instruction(audience_type)
-    if audience_line:
-        instructions += "\n\nAudience (MUST follow): " + audience_line
-    instructions += "\n\nLength (MUST follow): " + _audience_length_guidance(audience_type)
+    instructions = _with_article_rules(instructions, [
+        tools_rule,
+        _try_it_yourself_instruction(content_type, audience_type, html=False),
+        "Audience (MUST follow): " + audience_line if audience_line else "",
+        "Length (MUST follow): " + _audience_length_guidance(audience_type),
+    ])
 
     user = f"Article title: {title}\n"
     if keyword:
@@ -2777,6 +2879,473 @@ Output must feel like an internal playbook: decisions + steps."""
     return instructions, user
 
 
+def _quality_feedback(reasons: list[str], use_html: bool) -> str:
+    """Instruction suffix for a retry after the output failed the quality gate / QA."""
+    suffix = "Return the full HTML body." if use_html else "Return the full markdown body."
+    return "\n\nQUALITY FEEDBACK:\nYour previous output FAILED the Output Contract for these reasons:\n" + "\n".join("- " + r for r in reasons) + "\n\nFix ALL issues. Keep headings unchanged. " + suffix
+
+
+# Section retry: regenerate only the failing H2 sections while they are at most this share of the body
+SECTION_RETRY_MAX_SHARE = 0.6
+# Characters of the neighbouring sections sent as read-only context with a section retry
+SECTION_CONTEXT_CHARS = 600
+_SECTION_TRAILER_RE = re.compile(r"(?:\n[ \t]*(?:HEADLINE|TOOLS_SELECTED):[^\n]*)+\s*\Z")
+_CODE_FENCE_RE = re.compile(r"^\s*```[a-zA-Z]*\n|\n```\s*$")
+
+
+def _split_h2_sections(body: str, use_html: bool) -> tuple[str, list[str], str]:
+    """(preamble, sections, trailer): body cut before each H2; trailer = closing HEADLINE/TOOLS_SELECTED lines."""
+    m = _SECTION_TRAILER_RE.search(body)
+    main, trailer = (body[: m.start()], body[m.start() :]) if m else (body, "")
+    pattern = r"<h2[\s>]" if use_html else r"(?m)^##\s"
+    starts = [s.start() for s in re.finditer(pattern, main, flags=re.IGNORECASE)]
+    if not starts:
+        return main, [], trailer
+    sections = [main[a:b] for a, b in zip(starts, starts[1:] + [len(main)])]
+    return main[: starts[0]], sections, trailer
+
+
+def _section_heading(section: str) -> str:
+    first = section.split("</h2>", 1)[0] if section.lower().startswith("<h2") else section.split("\n", 1)[0]
+    return re.sub(r"\s+", " ", _strip_html_tags(first)).strip().lstrip("#").strip()
+
+
+def _failing_sections(reasons: list[str], sections: list[str]) -> set[int] | None:
+    """
+    Indexes of the H2 sections responsible for the quality gate reasons, or None when any reason
+    is not tied to a section (missing H2, placement, product sections...) and the whole body must be redone.
+    """
+    plain = [_strip_html_tags(s).lower() for s in sections]
+    try_idx = [i for i, p in enumerate(plain) if "try it yourself" in p or "build your own ai prompt" in p]
+    workflow_idx = [i for i, s in enumerate(sections) if "step" in _section_heading(s).lower() and "workflow" in _section_heading(s).lower()]
+    wanted: set[int] = set()
+    for reason in reasons:
+        r = reason.lower()
+        if r.startswith("invalid html: <pre>") or "raw html tag detected inside <pre>" in r:
+            hits = [i for i, s in enumerate(sections) if _validate_html_pre_blocks(s)]
+        elif "orphan </" in r:
+            hits = [i for i, s in enumerate(sections) if _validate_html_orphan_list_tags(s)]
+        elif r.startswith("try-it-yourself section must contain") or "'try it yourself' section missing prompt" in r:
+            hits = try_idx[:1]
+        elif r.startswith("missing required section: 'try it yourself"):
+            hits = workflow_idx[:1]
+        else:
+            return None
+        if not hits:
+            return None
+        wanted.update(hits)
+    return wanted
+
+
+def _plan_section_retry(body: str, reasons: list[str], use_html: bool) -> dict | None:
+    """Split body and pick the failing sections; None when a full retry is needed or cheaper."""
+    preamble, sections, trailer = _split_h2_sections(body, use_html)
+    if len(sections) < 2:
+        return None
+    indexes = _failing_sections(reasons, sections)
+    if not indexes:
+        return None
+    if sum(len(sections[i]) for i in indexes) > SECTION_RETRY_MAX_SHARE * len(body):
+        return None
+    return {"preamble": preamble, "sections": sections, "trailer": trailer, "indexes": sorted(indexes), "reasons": list(reasons)}
+
+
+def _build_section_retry_prompt(plan: dict, base_instructions: str, user_message: str, use_html: bool) -> tuple[str, str]:
+    """(instructions, user message) asking for the failing sections only, with their neighbours as context."""
+    sections, indexes = plan["sections"], plan["indexes"]
+    fmt = "HTML" if use_html else "markdown"
+    instructions = (
+        base_instructions
+        + "\n\nSECTION REPAIR:\nThe rest of the article is final. The section(s) given below FAILED the Output Contract for these reasons:\n"
+        + "\n".join("- " + r for r in plan["reasons"])
+        + f"\n\nRewrite ONLY these section(s) and fix ALL issues. Return each one in full as {fmt}, starting with its unchanged "
+        "H2 heading, in the order given. Output nothing else: no other sections, no HEADLINE or TOOLS_SELECTED lines."
+    )
+    # Article facts (title, keyword, type, audience) are the first paragraph of every fill prompt
+    user = user_message.split("\n\n", 1)[0] + "\n\nArticle outline (H2 sections, in order):\n"
+    user += "\n".join(("* " if i in indexes else "- ") + _section_heading(s) for i, s in enumerate(sections))
+    user += "\n(* = rewrite)\n"
+    for i in indexes:
+        if i > 0 and i - 1 not in indexes:
+            user += f"\nContext before (do not rewrite):\n...{sections[i - 1][-SECTION_CONTEXT_CHARS:]}\n"
+        user += f"\nSection to rewrite:\n{sections[i]}\n"
+        if i + 1 < len(sections) and i + 1 not in indexes:
+            user += f"\nContext after (do not rewrite):\n{sections[i + 1][:SECTION_CONTEXT_CHARS]}...\n"
+    return instructions, user
+
+
+def _splice_sections(plan: dict, response: str, use_html: bool) -> str | None:
+    """Body with the failing sections replaced by the rewritten ones; None if the response does not match the request."""
+    _, rewritten, _ = _split_h2_sections(_CODE_FENCE_RE.sub("", response.strip()), use_html)
+    if len(rewritten) != len(plan["indexes"]):
+        return None
+    sections = list(plan["sections"])
+    for i, new in zip(plan["indexes"], rewritten):
+        # Keep the original spacing before the next heading
+        sections[i] = new.rstrip() + sections[i][len(sections[i].rstrip()) :]
+    return plan["preamble"] + "".join(sections) + plan["trailer"]
+
+
+# --stream: progress line for the monitor every STREAM_PROGRESS_CHARS characters of generated text
+STREAM_PROGRESS_CHARS = 2000
+# Forbidden patterns that sanitize_filled_body does not rewrite: seeing one while streaming means QA will fail
+_STREAM_HARD_PATTERNS = [(pat, label) for pat, label in FORBIDDEN_PATTERNS if label in ("#1", "number one", "USD")]
+
+
+class _StreamChecker:
+    """
+    on_text callback for stream_responses (--stream with --quality_gate): checks each completed line
+    as it arrives and raises StreamAbort when the output is certain to fail, so the rest of the
+    generation is not paid for. Also prints FLOWTARO_STREAM progress lines for the monitor.
+    """
+
+    def __init__(self, stem: str, *, check_forbidden: bool, require_headline: bool):
+        self.stem = stem
+        self.check_forbidden = check_forbidden
+        self.require_headline = require_headline
+        self.checked = 0
+        self.reported = 0
+        self.seen_headline = False
+        self.reasons: list[str] = []
+
+    def __call__(self, text: str, delta: str) -> None:
+        if len(text) - self.reported >= STREAM_PROGRESS_CHARS:
+            self.reported = len(text)
+            # Straight to the real stdout: with --workers the article's own output is buffered until it ends
+            print(f"FLOWTARO_STREAM: {self.stem} {len(text)}", file=sys.__stdout__, flush=True)
+        end = text.rfind("\n")
+        if end < self.checked:
+            return
+        lines, self.checked = text[self.checked : end], end + 1
+        for line in lines.split("\n"):
+            self._check_line(line)
+            if self.reasons:
+                raise StreamAbort("; ".join(self.reasons))
+
+    def _check_line(self, line: str) -> None:
+        if self.require_headline:
+            if _HEADLINE_RE.match(line):
+                self.seen_headline = True
+            elif _TOOLS_SELECTED_RE.match(line.strip()) and not self.seen_headline:
+                self.reasons.append("HEADLINE missing (TOOLS_SELECTED came first)")
+                return
+        if self.check_forbidden and not line.lstrip().startswith(("HEADLINE:", "TOOLS_SELECTED:")):
+            plain = _strip_html_tags(line) if "<" in line else line
+            for pat, label in _STREAM_HARD_PATTERNS:
+                if pat.search(plain):
+                    self.reasons.append(f"forbidden pattern: {label}")
+                    return
+
+
+# Real Prompt #2 calls run on this pool so they overlap with the rest of the article's generation and post-processing
+PROMPT2_WORKERS = 4
+_prompt2_pool: ThreadPoolExecutor | None = None
+_prompt2_pool_lock = threading.Lock()
+
+
+def _prompt2_executor() -> ThreadPoolExecutor:
+    global _prompt2_pool
+    with _prompt2_pool_lock:
+        if _prompt2_pool is None:
+            _prompt2_pool = ThreadPoolExecutor(max_workers=PROMPT2_WORKERS, thread_name_prefix="prompt2")
+        return _prompt2_pool
+
+
+class _Prompt2Prefetch:
+    """
+    Starts _generate_real_prompt2 in the background as soon as a Prompt #1 is known: with --stream,
+    when its block is complete in the streamed text (watch), otherwise right after the quality gate.
+    get() returns the result for the article's final Prompt #1; a call started for a different
+    Prompt #1 (the gate retried and the model wrote a new one) is not used. The background call's
+    output and response cache keys are handed back to the article thread in get(), so its log
+    stays in the article's block and a QA fail still discards its cached response.
+    """
+
+    def __init__(self, path: Path, *, use_html: bool, model: str, base_url: str, api_key: str):
+        self.path = path
+        self.use_html = use_html
+        self.model = model
+        self.base_url = base_url
+        self.api_key = api_key
+        self.futures: dict[str, Future] = {}
+        self.scanned = 0
+        self.close_marker = "</pre>" if use_html else "```"
+
+    def start(self, prompt1: str) -> None:
+        if prompt1 in self.futures:
+            return
+        stem = self.path.stem
+
+        output = _article_output()
+
+        def run() -> tuple[str | None, str, list[str]]:
+            api_ledger.set_article(stem)
+            api_cache.begin()
+            output.begin()
+            try:
+                result = _generate_real_prompt2(prompt1, model=self.model, base_url=self.base_url, api_key=self.api_key)
+            finally:
+                log = output.end()
+            return result, log, api_cache.tracked()
+
+        self.futures[prompt1] = _prompt2_executor().submit(run)
+
+    def watch(self, text: str) -> None:
+        """stream_responses on_text hook: start once the streamed Prompt #1 block has been closed."""
+        if self.scanned < 0:
+            return
+        found = text.find(self.close_marker, max(0, self.scanned - len(self.close_marker)))
+        self.scanned = len(text)
+        if found == -1:
+            return
+        # Same cleaning as the finished output gets, so the Prompt #1 matches the one extracted later
+        prompt1 = _extract_prompt1(_clean_gate_candidate(text, self.path, use_html=self.use_html, log=False), is_html=self.use_html)
+        if prompt1:
+            self.scanned = -1
+            print(f"  Prompt #1 complete in the stream; generating real Prompt #2 for {self.path.name} in the background")
+            self.start(prompt1)
+
+    def get(self, prompt1: str) -> str | None:
+        future = self.futures.pop(prompt1, None)
+        if self.futures:
+            print(f"  Prompt #2 started for an earlier draft not used ({len(self.futures)}): Prompt #1 changed on retry")
+            self.futures.clear()
+        if future is None:
+            return _generate_real_prompt2(prompt1, model=self.model, base_url=self.base_url, api_key=self.api_key)
+        result, log, keys = future.result()
+        sys.stdout.write(log)
+        api_cache.track(keys)
+        return result
+
+
+def _prepare_fill_meta(path: Path, meta: dict, remap: bool) -> None:
+    """Frontmatter adjustments made before the prompt is built."""
+    # When article is under content/pl (PL content root), force lang=pl so prompts generate Polish
+    is_pl_content = "pl" in path.parts
+    if is_pl_content and (meta.get("lang") or "").strip().lower() != "pl":
+        meta["lang"] = "pl"
+    if remap:
+        meta["tools"] = ""
+
+
+def _build_fill_prompt(meta: dict, body: str, *, style: str, use_html: bool) -> tuple[str, str]:
+    """(instructions, user message) for the main fill call of one article; shared by fill_one and --batch submit."""
+    if use_html:
+        run_data = load_run_tools()
+        if run_data:
+            affiliate_tools, other_tools = _run_tools_to_lists(run_data)
+            base_instructions, user_message = _build_html_prompt(meta, affiliate_tools, other_tools)
+            base_instructions = (
+                "Use ONLY the tools/links listed below for this run. Do not add tools from the full catalog.\n\n"
+                + base_instructions
+            )
+            if run_data.get("article_built_around_links"):
+                base_instructions += "\n\nThis article MUST be built around the provided links: structure the content so these tools/links are the main focus."
+        else:
+            ranked = _rank_catalog_tools(meta)
+            affiliate_tools, other_tools = _split_tools_by_affiliate(ranked)
+            base_instructions, user_message = _build_html_prompt(meta, affiliate_tools, other_tools)
+            print(f"  Nie wybrano zestawu linków; używane jest {len(ranked)} najtrafniejszych narzędzi z affiliate_tools.yaml.")
+    else:
+        content_type_meta = (meta.get("content_type") or "").strip().lower()
+        if content_type_meta in PRODUCT_CONTENT_TYPES:
+            base_instructions, user_message = _build_product_md_prompt(meta, body)
+        else:
+            base_instructions, user_message = build_prompt(meta, body, style=style)
+    return base_instructions, user_message
+
+
+# --speculative: only combinations with at least this many recorded first drafts, failing at least this often
+SPECULATIVE_MIN_SAMPLES = 5
+SPECULATIVE_MIN_FAIL_RATE = 0.3
+# Candidates are added until all k failing together is at most this likely
+SPECULATIVE_TARGET_MISS = 0.1
+
+
+def _quality_key(meta: dict) -> str:
+    ct = (meta.get("content_type") or "").strip().lower() or "?"
+    at = (meta.get("audience_type") or "").strip().lower() or "?"
+    return f"{ct}|{at}"
+
+
+def _record_first_drafts(meta: dict, passed: int, failed: int) -> None:
+    """Add first-draft (no QUALITY FEEDBACK) gate outcomes for the article's combination to logs/quality_history.json."""
+    if not passed and not failed:
+        return
+    try:
+        with file_lock(QUALITY_HISTORY_LOCK):
+            history = _load_json_file(QUALITY_HISTORY_PATH, {})
+            entry = history.setdefault(_quality_key(meta), {"drafts": 0, "passed": 0})
+            entry["drafts"] += passed + failed
+            entry["passed"] += passed
+            _atomic_write_text(QUALITY_HISTORY_PATH, json.dumps(history, indent=2, sort_keys=True))
+    except OSError:
+        pass
+
+
+def _speculative_k(meta: dict, max_k: int, budget: float | None, call_cost: float | None) -> tuple[int, str]:
+    """
+    Candidates to generate in parallel for this article (1 = no speculation) and why.
+    From the combination's first-draft failure rate p: smallest k with p**k <= SPECULATIVE_TARGET_MISS,
+    capped by max_k and, with a budget, by budget / call_cost (the model's average cost per call, from
+    the cost ledger; None when it has no calls yet).
+    """
+    if max_k < 2:
+        return 1, ""
+    stats = _load_json_file(QUALITY_HISTORY_PATH, {}).get(_quality_key(meta)) or {}
+    drafts = int(stats.get("drafts") or 0)
+    if drafts < SPECULATIVE_MIN_SAMPLES:
+        return 1, ""
+    fail_rate = 1 - int(stats.get("passed") or 0) / drafts
+    if fail_rate < SPECULATIVE_MIN_FAIL_RATE:
+        return 1, ""
+    k = max_k if fail_rate >= 1 else math.ceil(math.log(SPECULATIVE_TARGET_MISS) / math.log(fail_rate))
+    k = max(2, min(max_k, k))
+    why = f"{fail_rate:.0%} of {drafts} first drafts for {_quality_key(meta).replace('|', '/')} failed the gate"
+    if budget and call_cost:
+        k = min(k, int(budget // call_cost))
+        why += f"; ~${call_cost:.4f}/call, budget ${budget:.4f}"
+    return (k if k >= 2 else 1), why
+
+
+def _speculative_candidates(
+    k: int,
+    path: Path,
+    meta: dict,
+    instructions: str,
+    user_message: str,
+    *,
+    model: str,
+    base_url: str,
+    api_key: str,
+    use_html: bool,
+    quality_strict: bool,
+    checker_factory=None,
+) -> tuple[str, list[str], int, int, str | None]:
+    """
+    Generate k candidates in parallel (streamed) and return the first that passes the quality gate;
+    the others are cancelled by dropping their streams. If none passes, returns the one with the fewest
+    reasons. Returns (body, reasons, candidates passed, candidates failed, winner's api_cache key or None);
+    the caller tracks the key on its own thread, since the candidates ran on pool threads. The cached
+    responses of every other candidate are discarded, including ones that finish after the winner.
+    Raises if every call failed.
+    """
+    cancel = threading.Event()
+    winner: Future | None = None
+
+    def drop_cached(future: Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        instr, _raw = future.result()
+        api_cache.discard(responses_cache_key(instr, user_message, model=model))
+
+    def run(i: int) -> tuple[str, str]:
+        api_ledger.set_article(path.stem)
+        instr = instructions if i == 0 else instructions + f"\n\n(Draft {i + 1} of {k}: write it independently; vary wording and examples.)"
+        checker = checker_factory() if checker_factory else None
+
+        def on_text(text: str, delta: str) -> None:
+            if cancel.is_set():
+                raise StreamAbort("cancelled: another candidate passed")
+            if checker:
+                checker(text, delta)
+
+        return instr, stream_responses(instr, user_message, model=model, base_url=base_url, api_key=api_key, timeout=120, on_text=on_text)
+
+    best: tuple[str, list[str]] | None = None
+    passed = failed = 0
+    errors: list[Exception] = []
+    aborted: list[str] = []
+    pool = ThreadPoolExecutor(max_workers=k)
+    futures: list[Future] = []
+    try:
+        futures = [pool.submit(run, i) for i in range(k)]
+        for done in as_completed(futures):
+            try:
+                instr, raw = done.result()
+            except StreamAbort as e:
+                if not cancel.is_set():
+                    print(f"  Candidate aborted: {path.name} — {e}")
+                    aborted.append(str(e))
+                    failed += 1
+                continue
+            except Exception as e:
+                errors.append(e)
+                continue
+            body, reasons = _process_gate_candidate(raw, path, meta, use_html=use_html, quality_strict=quality_strict)
+            if not reasons:
+                passed += 1
+                cancel.set()
+                winner = done
+                return body, reasons, passed, failed, responses_cache_key(instr, user_message, model=model)
+            failed += 1
+            print(f"  Candidate failed: {path.name} — {'; '.join(reasons)}")
+            if best is None or len(reasons) < len(best[1]):
+                best = (body, reasons)
+    finally:
+        cancel.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        # Runs now for finished candidates, or on the pool thread when a still-running one completes
+        for future in futures:
+            if future is not winner:
+                future.add_done_callback(drop_cached)
+    if best is None:
+        if errors:
+            raise errors[0]
+        raise StreamAbort(aborted[-1] if aborted else "every candidate was aborted")
+    return best[0], best[1], passed, failed, None
+
+
+def _clean_gate_candidate(new_body: str, path: Path, *, use_html: bool, log: bool = True) -> str:
+    """Sanitizing steps applied to a model output on the quality gate path (log: print what was changed)."""
+    show = print if log else (lambda *_a, **_k: None)
+    if new_body.startswith("---"):
+        idx = new_body.find("\n---", 3)
+        if idx != -1:
+            new_body = new_body[idx + 4 :].lstrip("\n")
+    new_body, sanitize_notes = sanitize_filled_body(new_body)
+    if sanitize_notes:
+        show(f"  Sanitized: {path.name} — {'; '.join(sanitize_notes)}")
+    new_body, strip_notes = strip_editor_notes(new_body)
+    if strip_notes:
+        show(f"  Stripped editor notes: {path.name} — {'; '.join(strip_notes)}")
+    new_body, bracket_notes = replace_known_bracket_placeholders(new_body)
+    if bracket_notes:
+        show(f"  Replaced known placeholders: {path.name} — {'; '.join(bracket_notes)}")
+    new_body, remaining_notes = replace_remaining_bracket_placeholders_with_quoted(new_body)
+    if remaining_notes:
+        show(f"  Replaced remaining placeholders: {path.name} — {'; '.join(remaining_notes)}")
+    # Safety layer for HTML: fix Try it yourself <pre> closing, remove orphan list tags, then sanitize.
+    if use_html:
+        new_body, template2_fixed = _fix_template2_pre_closing(new_body)
+        if template2_fixed:
+            show(f"  Fixed Try it yourself <pre> closing: {path.name}")
+        new_body, orphan_fixed = _remove_orphan_list_tags(new_body)
+        if orphan_fixed:
+            show(f"  Removed orphan list tags: {path.name}")
+        new_body, pre_notes = _sanitize_pre_blocks_html(new_body)
+        if pre_notes:
+            show(f"  HTML <pre> sanitized: {path.name} — {'; '.join(pre_notes)}")
+    return new_body
+
+
+def _process_gate_candidate(new_body: str, path: Path, meta: dict, *, use_html: bool, quality_strict: bool) -> tuple[str, list[str]]:
+    """Post-process one model output (quality gate path) and run the contract checks. Returns (body, reasons)."""
+    # TYMCZASOWE: logowanie surowej odpowiedzi
+    print("\n--- SUROWA ODPOWIEDŹ API ---")
+    print(new_body)
+    print("--- KONIEC ODPOWIEDZI ---\n")
+    new_body = _clean_gate_candidate(new_body, path, use_html=use_html)
+    last_reasons = check_output_contract(new_body, meta.get("content_type", ""), quality_strict)
+    if use_html:
+        last_reasons += _validate_html_pre_blocks(new_body)
+        last_reasons += _validate_html_orphan_list_tags(new_body)
+    try_it_warning = _get_try_it_yourself_placement_warning(new_body, meta.get("content_type", ""))
+    if try_it_warning:
+        last_reasons.append(try_it_warning)
+    return new_body, last_reasons
+
+
 def fill_one(
     path: Path,
     *,
@@ -2796,131 +3365,183 @@ def fill_one(
     remap: bool = False,
     generate_prompt2: bool = True,
     min_words_override: int | None = None,
+    response_text: str | None = None,
+    report: dict | None = None,
+    stream: bool = False,
+    section_retry: bool = True,
+    speculative: int = 0,
+    speculative_budget: float | None = None,
+    speculative_call_cost: float | None = None,
+    prompt2_early: bool = True,
+    journal: RunJournal | None = None,
 ) -> str:
-    """Process one file. Returns: 'wrote' | 'would_fill' | 'blocked' | 'qa_fail' | 'quality_fail' | 'api_fail' | 'skip'."""
+    """Process one file. Returns: 'wrote' | 'would_fill' | 'blocked' | 'qa_fail' | 'quality_fail' | 'api_fail' | 'skip'.
+
+    response_text: model output obtained elsewhere (--batch apply); used instead of the first API call.
+    report: if given, receives "reasons" (quality gate / QA failure reasons) for the caller.
+    stream: with quality_gate, stream the response and abort/retry as soon as a hard failure shows up.
+    section_retry: with quality_gate, when the failures are confined to some H2 sections, retry only those.
+    speculative: with quality_gate, up to this many parallel first drafts for failure-prone content/audience types.
+    speculative_call_cost: the model's average cost per call (from the cost ledger, read once per run) for speculative_budget.
+    prompt2_early: start the real Prompt #2 call as soon as Prompt #1 is known (mid-stream with stream) instead of after post-processing.
+    journal: run journal receiving this article's requested / response / qa events (the caller records done).
+    """
+    api_cache.begin()
+    api_ledger.set_article(path.stem)
     try:
         content = path.read_text(encoding="utf-8")
     except OSError as e:
         print(f"  Skip {path.name}: read error — {e}")
         return "skip"
     meta, order, body, body_start = _parse_frontmatter(content)
-    # When article is under content/pl (PL content root), force lang=pl so prompts generate Polish
-    is_pl_content = "pl" in path.parts
-    if is_pl_content and (meta.get("lang") or "").strip().lower() != "pl":
-        meta["lang"] = "pl"
-    if remap:
-        meta["tools"] = ""
+    _prepare_fill_meta(path, meta, remap)
     if not use_html and not body.strip():
         print(f"  Skip {path.name}: empty body")
         return "skip"
-    if use_html:
-        run_data = load_run_tools()
-        if run_data:
-            affiliate_tools, other_tools = _run_tools_to_lists(run_data)
-            base_instructions, user_message = _build_html_prompt(meta, affiliate_tools, other_tools)
-            base_instructions = (
-                "Use ONLY the tools/links listed below for this run. Do not add tools from the full catalog.\n\n"
-                + base_instructions
-            )
-            if run_data.get("article_built_around_links"):
-                base_instructions += "\n\nThis article MUST be built around the provided links: structure the content so these tools/links are the main focus."
-        else:
-            all_tools = _load_affiliate_tools()
-            affiliate_tools, other_tools = _split_tools_by_affiliate(all_tools)
-            base_instructions, user_message = _build_html_prompt(meta, affiliate_tools, other_tools)
-            print("  Nie wybrano zestawu linków; używana jest pełna lista z affiliate_tools.yaml.")
-    else:
-        content_type_meta = (meta.get("content_type") or "").strip().lower()
-        if content_type_meta in PRODUCT_CONTENT_TYPES:
-            base_instructions, user_message = _build_product_md_prompt(meta, body)
-        else:
-            base_instructions, user_message = build_prompt(meta, body, style=style)
+    base_instructions, user_message = _build_fill_prompt(meta, body, style=style, use_html=use_html)
     new_body = ""
     quality_failed_after_retries = False
+    prompt2 = _Prompt2Prefetch(path, use_html=use_html, model=model, base_url=base_url, api_key=api_key)
+    watch_prompt1 = generate_prompt2 and prompt2_early
+
+    def note(state: str, **fields) -> None:
+        if journal is not None:
+            journal.event(path.stem, state, **fields)
     if quality_gate:
         attempt = 0
+        section_plan = None
+
+        def make_checker() -> _StreamChecker:
+            return _StreamChecker(
+                path.stem,
+                check_forbidden=qa_enabled,
+                require_headline=use_html and (meta.get("content_type") or "").strip().lower() not in PRODUCT_CONTENT_TYPES,
+            )
+
+        spec_k, spec_why = _speculative_k(meta, speculative, speculative_budget, speculative_call_cost) if response_text is None else (1, "")
+        if spec_k > 1:
+            print(f"  Speculative: {spec_k} candidates in parallel ({spec_why})")
         while True:
             current_instructions = base_instructions
             if attempt > 0:
-                suffix = "Return the full HTML body." if use_html else "Return the full markdown body."
-                current_instructions = base_instructions + "\n\nQUALITY FEEDBACK:\nYour previous output FAILED the Output Contract for these reasons:\n" + "\n".join("- " + r for r in last_reasons) + "\n\nFix ALL issues. Keep headings unchanged. " + suffix
+                current_instructions = base_instructions + _quality_feedback(last_reasons, use_html)
+            processed = False
+            fresh = not (attempt == 0 and response_text is not None)
+            if fresh:
+                note("requested", attempt=attempt, section_retry=section_plan is not None or None, candidates=spec_k if attempt == 0 and spec_k > 1 else None)
             try:
-                new_body = call_responses_api(
-                    current_instructions, user_message, model=model, base_url=base_url, api_key=api_key
-                )
+                if not fresh:
+                    new_body = response_text
+                elif attempt == 0 and spec_k > 1:
+                    new_body, last_reasons, spec_passed, spec_failed, spec_key = _speculative_candidates(
+                        spec_k, path, meta, current_instructions, user_message,
+                        model=model, base_url=base_url, api_key=api_key,
+                        use_html=use_html, quality_strict=quality_strict,
+                        checker_factory=make_checker if stream else None,
+                    )
+                    processed = True
+                    if spec_key:
+                        # So discard_tracked() drops it too if the article fails preflight QA later
+                        api_cache.track([spec_key])
+                    _record_first_drafts(meta, spec_passed, spec_failed)
+                elif section_plan is not None:
+                    sec_instructions, sec_message = _build_section_retry_prompt(section_plan, base_instructions, user_message, use_html)
+                    repaired = call_responses_api(sec_instructions, sec_message, model=model, base_url=base_url, api_key=api_key)
+                    spliced = _splice_sections(section_plan, repaired, use_html)
+                    if spliced is None:
+                        print(f"  Section retry: response did not match the requested sections; full retry for {path.name}")
+                        api_cache.discard_last()
+                        new_body = call_responses_api(
+                            current_instructions, user_message, model=model, base_url=base_url, api_key=api_key
+                        )
+                    else:
+                        new_body = spliced
+                elif stream:
+                    checker = make_checker()
+
+                    def on_text(text: str, delta: str) -> None:
+                        checker(text, delta)
+                        if watch_prompt1:
+                            prompt2.watch(text)
+
+                    new_body = stream_responses(
+                        current_instructions, user_message, model=model, base_url=base_url, api_key=api_key,
+                        timeout=120, on_text=on_text,
+                    )
+                else:
+                    new_body = call_responses_api(
+                        current_instructions, user_message, model=model, base_url=base_url, api_key=api_key
+                    )
+            except StreamAbort as e:
+                # Hard failure seen mid-generation: treat like a quality gate fail, without waiting for the rest
+                last_reasons = [str(e)]
+                section_plan = None
+                note("qa", stage="stream", passed=False, reasons=last_reasons, attempt=attempt)
+                if attempt == 0 and response_text is None:
+                    _record_first_drafts(meta, 0, spec_k)
+                if attempt >= quality_retries:
+                    print(f"  Stream aborted: {path.name} — {e} (after {quality_retries} retries)")
+                    quality_failed_after_retries = True
+                    break
+                print(f"  Stream aborted: {path.name} — {e}; retry {attempt + 1}/{quality_retries}")
+                attempt += 1
+                continue
             except Exception as e:
                 print(f"  Skip {path.name}: API error — {e}")
                 _append_error_log(path.stem, "ERROR", f"API error: {e}")
                 return "api_fail"
-            # TYMCZASOWE: logowanie surowej odpowiedzi
-            print("\n--- SUROWA ODPOWIEDŹ API ---")
-            print(new_body)
-            print("--- KONIEC ODPOWIEDZI ---\n")
-            if new_body.startswith("---"):
-                idx = new_body.find("\n---", 3)
-                if idx != -1:
-                    new_body = new_body[idx + 4 :].lstrip("\n")
-            new_body, sanitize_notes = sanitize_filled_body(new_body)
-            if sanitize_notes:
-                print(f"  Sanitized: {path.name} — {'; '.join(sanitize_notes)}")
-            new_body, strip_notes = strip_editor_notes(new_body)
-            if strip_notes:
-                print(f"  Stripped editor notes: {path.name} — {'; '.join(strip_notes)}")
-            new_body, bracket_notes = replace_known_bracket_placeholders(new_body)
-            if bracket_notes:
-                print(f"  Replaced known placeholders: {path.name} — {'; '.join(bracket_notes)}")
-            new_body, remaining_notes = replace_remaining_bracket_placeholders_with_quoted(new_body)
-            if remaining_notes:
-                print(f"  Replaced remaining placeholders: {path.name} — {'; '.join(remaining_notes)}")
-            # Safety layer for HTML: fix Try it yourself <pre> closing, remove orphan list tags, then sanitize and validate.
-            if use_html:
-                new_body, template2_fixed = _fix_template2_pre_closing(new_body)
-                if template2_fixed:
-                    print(f"  Fixed Try it yourself <pre> closing: {path.name}")
-                new_body, orphan_fixed = _remove_orphan_list_tags(new_body)
-                if orphan_fixed:
-                    print(f"  Removed orphan list tags: {path.name}")
-                new_body, pre_notes = _sanitize_pre_blocks_html(new_body)
-                if pre_notes:
-                    print(f"  HTML <pre> sanitized: {path.name} — {'; '.join(pre_notes)}")
-            last_reasons = check_output_contract(new_body, meta.get("content_type", ""), quality_strict)
-            if use_html:
-                last_reasons += _validate_html_pre_blocks(new_body)
-                last_reasons += _validate_html_orphan_list_tags(new_body)
-            try_it_warning = _get_try_it_yourself_placement_warning(new_body, meta.get("content_type", ""))
-            if try_it_warning:
-                last_reasons.append(try_it_warning)
+            if fresh and journal is not None:
+                journal.save_response(path.stem, new_body, attempt=attempt)
+            if not processed:
+                new_body, last_reasons = _process_gate_candidate(new_body, path, meta, use_html=use_html, quality_strict=quality_strict)
+                if attempt == 0 and response_text is None:
+                    _record_first_drafts(meta, 0 if last_reasons else 1, 1 if last_reasons else 0)
+            note("qa", stage="quality_gate", passed=not last_reasons, reasons=last_reasons or None, attempt=attempt)
             if not last_reasons:
                 if attempt > 0:
                     print(f"  Quality Gate PASS: {path.name}")
                 break
+            # Never serve a response that failed the contract from the API cache again
+            api_cache.discard_last()
             if attempt >= quality_retries:
                 print(f"  Quality Gate FAIL: {path.name} — {'; '.join(last_reasons)} (after {quality_retries} retries)")
                 quality_failed_after_retries = True
                 break
             print(f"  Quality Gate FAIL: {path.name} — {'; '.join(last_reasons)}; retry {attempt + 1}/{quality_retries}")
+            section_plan = _plan_section_retry(new_body, last_reasons, use_html) if section_retry else None
+            if section_plan is not None:
+                names = ", ".join(_section_heading(section_plan["sections"][i])[:40] for i in section_plan["indexes"])
+                print(f"  Section retry: regenerating {len(section_plan['indexes'])} of {len(section_plan['sections'])} section(s): {names}")
             attempt += 1
         if quality_failed_after_retries:
             _append_refresh_failure_reason(path.stem, last_reasons)
+            if report is not None:
+                report["reasons"] = list(last_reasons)
             if write and block_on_fail:
                 # Preserve original frontmatter (including last_updated) so refresh can retry by date range
                 blocked_content = _serialize_frontmatter(meta, order, "blocked") + "\n" + body
                 backup = path.with_suffix(path.suffix + ".bak")
                 try:
-                    backup.write_text(content, encoding="utf-8")
+                    _atomic_write_text(backup, content)
                 except OSError as e:
                     print(f"  Skip {path.name}: backup failed (blocked) — {e}")
                     return "quality_fail"
-                path.write_text(blocked_content, encoding="utf-8")
+                _atomic_write_text(path, blocked_content)
                 print(f"  Blocked (quality gate): {path.name}")
                 return "blocked"
             _append_error_log(path.stem, "ERROR", f"Quality gate fail: {'; '.join(last_reasons)}")
             return "quality_fail"
     else:
         try:
-            new_body = call_responses_api(
-                base_instructions, user_message, model=model, base_url=base_url, api_key=api_key
-            )
+            if response_text is not None:
+                new_body = response_text
+            else:
+                note("requested", attempt=0)
+                new_body = call_responses_api(
+                    base_instructions, user_message, model=model, base_url=base_url, api_key=api_key
+                )
+                if journal is not None:
+                    journal.save_response(path.stem, new_body, attempt=0)
         except Exception as e:
             print(f"  Skip {path.name}: API error — {e}")
             _append_error_log(path.stem, "ERROR", f"API error: {e}")
@@ -2959,10 +3580,21 @@ def fill_one(
                 print(f"  HTML <pre> sanitized: {path.name} — {'; '.join(pre_notes)}")
             html_reasons = _validate_html_pre_blocks(new_body) + _validate_html_orphan_list_tags(new_body)
             if html_reasons:
+                note("qa", stage="html", passed=False, reasons=html_reasons)
                 print(f"  HTML validation FAIL: {path.name} — {'; '.join(html_reasons)}")
+                api_cache.discard_tracked()
+                if report is not None:
+                    report["reasons"] = list(html_reasons)
                 _append_error_log(path.stem, "ERROR", f"HTML validation fail: {'; '.join(html_reasons)}")
                 return "quality_fail"
 
+    # --- Start real Prompt #2 now, so the call overlaps with the post-processing below ---
+    prompt1_text = None
+    if generate_prompt2 and _has_prompt2_placeholder(new_body):
+        prompt1_text = _extract_prompt1(new_body, is_html=use_html)
+        if prompt1_text and prompt2_early:
+            prompt2.start(prompt1_text)
+
     # --- Restore static editorial sections stripped by AI ---
     if not use_html:
         _SECTIONS_TO_RESTORE = ["## Verification policy (editors only)"]
@@ -3032,14 +3664,11 @@ def fill_one(
 
     # --- Generate real Prompt #2 via separate API call ---
     if generate_prompt2 and _has_prompt2_placeholder(new_body):
-        prompt1_text = _extract_prompt1(new_body, is_html=use_html)
         fallback_html = '<em>Prompt #2 could not be generated automatically &mdash; please run Prompt&nbsp;#1 above to get your result.</em>'
         fallback_md = "*(Prompt #2 could not be generated automatically — please run Prompt #1 above to get your result.)*"
         if prompt1_text:
-            print(f"  Generating real Prompt #2 for {path.name} …")
-            p2 = _generate_real_prompt2(
-                prompt1_text, model=model, base_url=base_url, api_key=api_key
-            )
+            print(f"  Generating real Prompt #2 for {path.name} …" if not prompt2_early else f"  Waiting for real Prompt #2 for {path.name} …")
+            p2 = prompt2.get(prompt1_text)
             if p2:
                 new_body = _insert_prompt2(new_body, p2, is_html=use_html)
                 print(f"  Prompt #2 inserted ({len(p2)} chars)")
@@ -3072,19 +3701,23 @@ def fill_one(
             min_words_override=min_words_override,
             content_type=(meta.get("content_type") or "").strip() or None,
         )
+        note("qa", stage="preflight", passed=ok, reasons=reasons or None)
         if not ok:
             print(f"  QA FAIL: {path.name} — {'; '.join(reasons)}")
+            api_cache.discard_tracked()
+            if report is not None:
+                report["reasons"] = list(reasons)
             _append_refresh_failure_reason(path.stem, reasons)
             if write and block_on_fail:
                 # Preserve original frontmatter (including last_updated) so refresh_articles can retry by date range
                 blocked_content = _serialize_frontmatter(meta, order, "blocked") + "\n" + body
                 backup = path.with_suffix(path.suffix + ".bak")
                 try:
-                    backup.write_text(content, encoding="utf-8")
+                    _atomic_write_text(backup, content)
                 except OSError as e:
                     print(f"  Skip {path.name}: backup failed (blocked) — {e}")
                     return "qa_fail"
-                path.write_text(blocked_content, encoding="utf-8")
+                _atomic_write_text(path, blocked_content)
                 print(f"  Blocked: {path.name} (reason: QA fail)")
                 return "blocked"
             _append_error_log(path.stem, "ERROR", f"QA fail: {'; '.join(reasons)}")
@@ -3110,33 +3743,31 @@ def fill_one(
         if had_existing:
             backup = out_path.with_suffix(".html.bak")
             try:
-                backup.write_text(out_path.read_text(encoding="utf-8"), encoding="utf-8")
+                _atomic_write_text(backup, out_path.read_text(encoding="utf-8"))
             except OSError as e:
                 print(f"  Skip {path.name}: backup of existing .html failed — {e}")
                 return "skip"
         try:
-            out_path.write_text(new_content, encoding="utf-8")
+            _atomic_write_text(out_path, new_content)
         except OSError as e:
             print(f"  Skip {path.name}: write failed — {e}")
             return "skip"
         # Update .md frontmatter only: set status to "filled" (body unchanged)
         md_content = _serialize_frontmatter(meta, order, "filled") + "\n" + body
         try:
-            path.write_text(md_content, encoding="utf-8")
+            _atomic_write_text(path, md_content)
         except OSError:
             pass  # .html already written; .md status update is best-effort
-        _record_fill_cost(path.stem, new_content)
         print(f"  Filled: {out_path.name}" + (f" (backup: {backup.name})" if had_existing else ""))
         return "wrote"
     new_content = _serialize_frontmatter(meta, order) + "\n" + new_body
     backup = path.with_suffix(path.suffix + ".bak")
     try:
-        backup.write_text(content, encoding="utf-8")
+        _atomic_write_text(backup, content)
     except OSError as e:
         print(f"  Skip {path.name}: backup failed — {e}")
         return "skip"
-    path.write_text(new_content, encoding="utf-8")
-    _record_fill_cost(path.stem, new_content)
+    _atomic_write_text(path, new_content)
     print(f"  Filled: {path.name} (backup: {backup.name})")
     return "wrote"
 
@@ -3153,6 +3784,7 @@ def fill_prompt2_one(
 
     Returns: 'wrote' | 'would_fill' | 'skip' | 'api_fail' | 'no_placeholder'
     """
+    api_ledger.set_article(path.stem)
     # Operate on the .html file (source of truth for filled content)
     html_path = path.with_suffix(".html")
     if not html_path.exists():
@@ -3190,12 +3822,12 @@ def fill_prompt2_one(
     # Backup and write .html
     backup = html_path.with_suffix(".html.bak")
     try:
-        backup.write_text(html_content, encoding="utf-8")
+        _atomic_write_text(backup, html_content)
     except OSError as e:
         print(f"  Skip {path.name}: backup failed — {e}")
         return "skip"
     try:
-        html_path.write_text(new_html, encoding="utf-8")
+        _atomic_write_text(html_path, new_html)
     except OSError as e:
         print(f"  Skip {path.name}: write failed — {e}")
         return "skip"
@@ -3205,6 +3837,398 @@ def fill_prompt2_one(
     return "wrote" if p2 else "api_fail"
 
 
+def _select_candidates(args: argparse.Namespace) -> list[Path]:
+    """Articles matching --since / --slug_contains that should_process() accepts (before --limit)."""
+    candidates: list[Path] = []
+    for path in sorted(ARTICLES_DIR.glob("*.md")):
+        stem = path.stem
+        if args.since and len(stem) >= 10 and stem[:10] < args.since:
+            continue
+        if args.slug_contains and args.slug_contains not in stem:
+            continue
+        try:
+            content = path.read_text(encoding="utf-8")
+        except OSError:
+            continue
+        meta, _, body, _ = _parse_frontmatter(content)
+        if should_process(meta, body, args.force, use_html=args.html):
+            candidates.append(path)
+    return candidates
+
+
+# --- Batch API mode (--batch submit|status|apply) ---
+# State per submitted batch in logs/fill_batches/<local id>.json (+ the .jsonl that was uploaded);
+# articles whose batched output fails QA / quality gate wait in logs/fill_batch_requeue.json
+# and go into the next submit, with the failure reasons as QUALITY FEEDBACK.
+BATCH_DIR = LOGS_DIR / "fill_batches"
+BATCH_REQUEUE_PATH = LOGS_DIR / "fill_batch_requeue.json"
+BATCH_TERMINAL = ("completed", "failed", "expired", "cancelled")
+BATCH_REQUEUE_RESULTS = ("qa_fail", "quality_fail", "api_fail")
+
+
+def _load_json_file(path: Path, default):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return default
+
+
+def _save_json_file(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write_text(path, json.dumps(data, indent=2, ensure_ascii=False))
+
+
+def _batch_states(batch_id: str | None = None, include_applied: bool = False) -> list[dict]:
+    """Local batch states, oldest first; only the given one (local id or API batch id) if batch_id is set."""
+    states = []
+    for path in sorted(BATCH_DIR.glob("*.json")) if BATCH_DIR.exists() else []:
+        state = _load_json_file(path, None)
+        if not isinstance(state, dict):
+            continue
+        if batch_id and batch_id not in (state.get("id"), state.get("batch_id")):
+            continue
+        if state.get("applied") and not (include_applied or batch_id):
+            continue
+        states.append(state)
+    return states
+
+
+def _save_batch_state(state: dict) -> None:
+    _save_json_file(BATCH_DIR / f"{state['id']}.json", state)
+
+
+def _batch_submit(args: argparse.Namespace, *, api_key: str, base_url: str) -> None:
+    """Assemble one /v1/responses request per article into a JSONL file, upload it and create the batch."""
+    requeue = _load_json_file(BATCH_REQUEUE_PATH, {})
+    in_flight = {cid for st in _batch_states() for cid in st.get("items", {})}
+    paths: list[Path] = []
+    for cid, entry in requeue.items():
+        path = PROJECT_ROOT / entry.get("path", "")
+        if cid not in in_flight and path.parent == ARTICLES_DIR and path.exists():
+            paths.append(path)
+    seen = {p.stem for p in paths}
+    paths += [p for p in _select_candidates(args) if p.stem not in seen and p.stem not in in_flight]
+    if args.limit > 0:
+        paths = paths[: args.limit]
+    if not paths:
+        print("No matching draft articles (or re-queued failures) to submit.")
+        return
+
+    lines: list[str] = []
+    items: dict[str, dict] = {}
+    for path in paths:
+        try:
+            content = path.read_text(encoding="utf-8")
+        except OSError as e:
+            print(f"  Skip {path.name}: read error — {e}")
+            continue
+        meta, _, body, _ = _parse_frontmatter(content)
+        _prepare_fill_meta(path, meta, args.remap)
+        if not args.html and not body.strip():
+            print(f"  Skip {path.name}: empty body")
+            continue
+        instructions, user_message = _build_fill_prompt(meta, body, style=_style_for(path, args.style), use_html=args.html)
+        reasons = (requeue.get(path.stem) or {}).get("reasons") or []
+        if reasons:
+            instructions += _quality_feedback(reasons, args.html)
+        lines.append(json.dumps({
+            "custom_id": path.stem,
+            "method": "POST",
+            "url": "/v1/responses",
+            "body": {"model": args.model, "instructions": instructions, "input": user_message},
+        }, ensure_ascii=False))
+        items[path.stem] = {"path": path.relative_to(PROJECT_ROOT).as_posix(), "requeued": path.stem in requeue}
+    if not lines:
+        print("Nothing to submit.")
+        return
+
+    local_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+    n = 1
+    while (BATCH_DIR / f"{local_id}.json").exists():
+        n += 1
+        local_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{n}"
+    jsonl_path = BATCH_DIR / f"{local_id}.jsonl"
+    BATCH_DIR.mkdir(parents=True, exist_ok=True)
+    jsonl_bytes = ("\n".join(lines) + "\n").encode("utf-8")
+    jsonl_path.write_bytes(jsonl_bytes)
+    file_obj = upload_file(jsonl_path.name, jsonl_bytes, purpose="batch", api_key=api_key, base_url=base_url)
+    batch = create_batch(
+        file_obj["id"], endpoint="/v1/responses", api_key=api_key, base_url=base_url,
+        metadata={"source": "fill_articles", "local_id": local_id},
+    )
+    state = {
+        "id": local_id,
+        "batch_id": batch["id"],
+        "input_file_id": file_obj["id"],
+        "status": batch.get("status", "validating"),
+        "submitted_at": datetime.now().isoformat(timespec="seconds"),
+        "model": args.model,
+        "settings": {"html": args.html, "remap": args.remap, "content_root": args.content_root},
+        "items": items,
+        "applied": False,
+    }
+    _save_batch_state(state)
+    for cid in items:
+        requeue.pop(cid, None)
+    _save_json_file(BATCH_REQUEUE_PATH, requeue)
+    n_requeued = sum(1 for it in items.values() if it["requeued"])
+    print(f"Submitted batch {batch['id']} (local id {local_id}): {len(items)} article(s), {n_requeued} re-queued; requests in {jsonl_path}")
+    print("Check with --batch status [--wait], then --batch apply --write.")
+
+
+def _batch_refresh(state: dict, *, api_key: str, base_url: str) -> dict:
+    batch = retrieve_batch(state["batch_id"], api_key=api_key, base_url=base_url)
+    state["status"] = batch.get("status", state.get("status"))
+    state["output_file_id"] = batch.get("output_file_id")
+    state["error_file_id"] = batch.get("error_file_id")
+    state["request_counts"] = batch.get("request_counts") or {}
+    _save_batch_state(state)
+    return state
+
+
+def _batch_needs_refresh(state: dict) -> bool:
+    """Still running, or finished but its output/error file ids were never fetched."""
+    return state.get("status") not in BATCH_TERMINAL or "output_file_id" not in state
+
+
+def _batch_status(args: argparse.Namespace, *, api_key: str, base_url: str) -> list[dict]:
+    """Refresh and print the status of pending batches; with --wait, poll until all are finished."""
+    states = _batch_states(args.batch_id)
+    if not states:
+        print("No pending batches." if not args.batch_id else f"Batch not found: {args.batch_id}")
+        return []
+    while True:
+        for state in states:
+            if _batch_needs_refresh(state):
+                _batch_refresh(state, api_key=api_key, base_url=base_url)
+            rc = state.get("request_counts") or {}
+            print(
+                f"  {state['id']}  {state['batch_id']}  {state['status']:<11} "
+                f"{rc.get('completed', 0)}/{rc.get('total', len(state['items']))} done, {rc.get('failed', 0)} failed"
+            )
+        if not args.wait or all(st.get("status") in BATCH_TERMINAL for st in states):
+            return states
+        print(f"Waiting {args.poll_interval}s ...")
+        time.sleep(args.poll_interval)
+
+
+def _parse_batch_output(raw: bytes, usage_out: dict | None = None) -> dict[str, tuple[str | None, str]]:
+    """
+    {custom_id: (output text or None, error message)} from a batch output or error JSONL file.
+    usage_out: if given, receives {custom_id: (model, usage)} for the cost ledger.
+    """
+    results: dict[str, tuple[str | None, str]] = {}
+    for line in raw.decode("utf-8", errors="replace").splitlines():
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        cid = obj.get("custom_id")
+        if not cid:
+            continue
+        resp = obj.get("response") or {}
+        if obj.get("error") or resp.get("status_code") != 200:
+            err = obj.get("error") or resp.get("body") or {}
+            results[cid] = (None, f"batch error {resp.get('status_code')}: {json.dumps(err, ensure_ascii=False)[:300]}")
+            continue
+        if usage_out is not None and (resp.get("body") or {}).get("usage"):
+            usage_out[cid] = (resp["body"].get("model") or "", resp["body"]["usage"])
+        try:
+            results[cid] = (extract_output_text(resp.get("body") or {}), "")
+        except RuntimeError as e:
+            results[cid] = (None, str(e))
+    return results
+
+
+def _batch_apply(args: argparse.Namespace, *, api_key: str, base_url: str, dry_run: bool) -> None:
+    """Run each finished batch's outputs through fill_one (same post-processing and QA); re-queue failures."""
+    qa_enabled = (args.write and not args.no_qa) or (dry_run and args.qa)
+    states = [
+        _batch_refresh(st, api_key=api_key, base_url=base_url) if _batch_needs_refresh(st) else st
+        for st in _batch_states(args.batch_id)
+        if not st.get("applied")
+    ]
+    ready = [st for st in states if st.get("status") in BATCH_TERMINAL]
+    if not ready:
+        print("No finished batches to apply." + (f" {len(states)} still running (see --batch status)." if states else ""))
+        return
+    requeue = _load_json_file(BATCH_REQUEUE_PATH, {})
+    totals: dict[str, int] = {}
+    for state in ready:
+        results: dict[str, tuple[str | None, str]] = {}
+        usage: dict[str, tuple[str, dict]] = {}
+        for file_key in ("error_file_id", "output_file_id"):
+            if state.get(file_key):
+                results.update(_parse_batch_output(file_content(state[file_key], api_key=api_key, base_url=base_url), usage))
+        settings = state.get("settings") or {}
+        print(f"Applying batch {state['batch_id']} ({state['status']}): {len(results)}/{len(state['items'])} result(s)")
+        reasons_by_stem: dict[str, list[str]] = {}
+        paths = []
+        for cid, item in state["items"].items():
+            path = PROJECT_ROOT / item["path"]
+            text, err = results.get(cid, (None, f"no result (batch {state['status']})"))
+            if text is None:
+                print(f"  API failed: {path.name} — {err}")
+                _append_error_log(cid, "ERROR", f"Batch: {err}")
+                totals["api_fail"] = totals.get("api_fail", 0) + 1
+                reasons_by_stem[cid] = []
+                continue
+            paths.append(path)
+
+        def apply_fn(path: Path) -> str:
+            report: dict = {}
+            result = fill_one(
+                path,
+                model=state.get("model") or args.model,
+                base_url=base_url,
+                api_key=api_key,
+                dry_run=dry_run,
+                write=args.write,
+                qa_enabled=qa_enabled,
+                qa_strict=args.qa_strict,
+                style=_style_for(path, args.style),
+                block_on_fail=args.block_on_fail,
+                quality_gate=args.quality_gate,
+                quality_retries=0,
+                quality_strict=args.quality_strict,
+                use_html=bool(settings.get("html", args.html)),
+                remap=bool(settings.get("remap", args.remap)),
+                generate_prompt2=not args.skip_prompt2,
+                min_words_override=args.min_words_override,
+                response_text=results[path.stem][0],
+                report=report,
+            )
+            reasons_by_stem[path.stem] = report.get("reasons") or []
+            return result
+
+        for path, result in _run_pool(paths, apply_fn, max(1, args.workers)):
+            totals[result] = totals.get(result, 0) + 1
+            if result not in BATCH_REQUEUE_RESULTS:
+                reasons_by_stem.pop(path.stem, None)
+        if dry_run:
+            continue
+        for cid, reasons in reasons_by_stem.items():
+            requeue[cid] = {"path": state["items"][cid]["path"], "reasons": reasons, "batch_id": state["batch_id"]}
+        # Batch usage is booked once, when the batch is marked applied
+        for cid, (model_used, u) in usage.items():
+            api_ledger.record(
+                model=model_used or state.get("model") or args.model, usage=u, latency_s=None,
+                endpoint="/v1/batches", article=cid, batch=True,
+            )
+        state["applied"] = True
+        state["applied_at"] = datetime.now().isoformat(timespec="seconds")
+        _save_batch_state(state)
+    if not dry_run:
+        _save_json_file(BATCH_REQUEUE_PATH, requeue)
+
+    print("\nSummary (--batch apply):")
+    for key in ("wrote", "would_fill", "blocked", "qa_fail", "quality_fail", "api_fail", "skip"):
+        print(f"  {key + ':':<14}{totals.get(key, 0)}")
+    if dry_run:
+        print("  (dry-run: batches not marked applied; re-run with --write)")
+    else:
+        print(f"  re-queued for next submit: {len(requeue)} ({BATCH_REQUEUE_PATH.name})")
+
+
+def _run_batch_mode(args: argparse.Namespace, *, api_key: str, base_url: str, dry_run: bool) -> None:
+    if args.batch == "submit":
+        _batch_submit(args, api_key=api_key, base_url=base_url)
+    elif args.batch == "status":
+        _batch_status(args, api_key=api_key, base_url=base_url)
+    else:
+        _batch_apply(args, api_key=api_key, base_url=base_url, dry_run=dry_run)
+
+
+class _ArticleOutput:
+    """
+    sys.stdout proxy for --workers: inside a worker thread print() goes to that article's buffer,
+    elsewhere to the real stream. Each article's log is then emitted as one uninterrupted block.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def begin(self) -> None:
+        self._local.buf = io.StringIO()
+
+    def end(self) -> str:
+        buf = getattr(self._local, "buf", None)
+        self._local.buf = None
+        return buf.getvalue() if buf is not None else ""
+
+    def write(self, text: str) -> int:
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            return self._stream.write(text)
+        return buf.write(text)
+
+    def flush(self) -> None:
+        if getattr(self._local, "buf", None) is None:
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _article_output() -> _ArticleOutput:
+    """The sys.stdout proxy that buffers per thread (installed on first use; a no-op for unbuffered threads)."""
+    if not isinstance(sys.stdout, _ArticleOutput):
+        sys.stdout = _ArticleOutput(sys.stdout)
+    return sys.stdout
+
+
+def _run_pool(paths: list[Path], fn, workers: int):
+    """
+    Yield (path, result) for fn(path) over paths. workers <= 1: sequential, output printed live.
+    Otherwise a thread pool (the work is almost all waiting on the API); each article's output is
+    buffered and printed as one block when it finishes, and results come back in completion order.
+    """
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield path, fn(path)
+        return
+    real_stdout = sys.stdout
+    out = _ArticleOutput(real_stdout)
+
+    def run(path: Path) -> tuple[str, str]:
+        out.begin()
+        try:
+            result = fn(path)
+        except Exception as e:
+            print(f"  Skip {path.name}: unexpected error — {e}")
+            _append_error_log(path.stem, "ERROR", f"Unexpected error: {e}")
+            result = "skip"
+        return result, out.end()
+
+    sys.stdout = out
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            futures = {pool.submit(run, path): path for path in paths}
+            for done, future in enumerate(as_completed(futures), start=1):
+                path = futures[future]
+                result, text = future.result()
+                real_stdout.write(f"[{done}/{len(paths)}] {path.name} -> {result}\n{text}")
+                real_stdout.flush()
+                yield path, result
+    finally:
+        sys.stdout = real_stdout
+
+
+def _style_for(path: Path, style_override: str | None) -> str:
+    """--style if given, else the style for the article's audience_type."""
+    if style_override:
+        return style_override
+    try:
+        meta, _, _, _ = _parse_frontmatter(path.read_text(encoding="utf-8"))
+        at = (meta.get("audience_type") or "").strip().lower()
+    except OSError:
+        at = ""
+    return STYLE_FOR_AUDIENCE.get(at, STYLE_DEFAULT)
+
+
 def main() -> None:
     # Ensure stdout handles Unicode (e.g. emoji in API response) on Windows
     if hasattr(sys.stdout, "reconfigure"):
@@ -3324,8 +4348,100 @@ def main() -> None:
         dest="skip_prompt2",
         help="Skip Prompt #2 generation during the main fill pass (useful for two-step workflow).",
     )
+    parser.add_argument(
+        "--api-retries",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Retries per API call on 429/5xx/timeouts, with backoff (default: OPENAI_MAX_RETRIES or 4; 0 = none).",
+    )
+    parser.add_argument(
+        "--batch",
+        choices=("submit", "status", "apply"),
+        default=None,
+        help=(
+            "Batch API workflow: submit = write the selected articles' requests to a JSONL batch and submit it; "
+            "status = show (with --wait: poll until done); apply = run finished results through the normal "
+            "post-processing and QA (use --write), re-queueing failures into the next submit."
+        ),
+    )
+    parser.add_argument("--batch-id", default=None, metavar="ID", help="Limit --batch status/apply to this batch (local or API id).")
+    parser.add_argument("--wait", action="store_true", help="With --batch status: poll until every pending batch has finished.")
+    parser.add_argument("--poll-interval", type=int, default=60, metavar="S", help="Seconds between polls for --batch status --wait (default: 60).")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "With --quality_gate: stream responses and abort + retry a generation as soon as a hard failure "
+            "(forbidden phrase QA would reject, missing HEADLINE) appears; prints live progress for the monitor."
+        ),
+    )
+    parser.add_argument(
+        "--no-section-retry",
+        action="store_true",
+        dest="no_section_retry",
+        help="With --quality_gate: always retry the whole article, even when only some sections failed.",
+    )
+    parser.add_argument(
+        "--speculative",
+        type=int,
+        default=0,
+        metavar="K",
+        help=(
+            "With --quality_gate: for content/audience types whose first drafts often fail (logs/quality_history.json), "
+            "generate up to K drafts in parallel and keep the first that passes (default: 0 = off)."
+        ),
+    )
+    parser.add_argument(
+        "--speculative-budget",
+        type=float,
+        default=None,
+        metavar="USD",
+        dest="speculative_budget",
+        help="Cap --speculative so K x average cost per call (from the API cost ledger) stays within USD per article.",
+    )
+    parser.add_argument(
+        "--no-prompt2-overlap",
+        action="store_true",
+        dest="no_prompt2_overlap",
+        help="Generate the real Prompt #2 only after the article's post-processing (default: start it as soon as Prompt #1 is known).",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        default=None,
+        help=(
+            "Resume an interrupted run from its journal (logs/runs/RUN_ID.jsonl) with the same arguments: "
+            "finished articles are skipped, articles whose response had already arrived reuse it."
+        ),
+    )
+    parser.add_argument(
+        "--journal",
+        metavar="RUN_ID",
+        default=None,
+        help="Write the run journal under this run id (default: a new id; refresh_articles.py passes its own).",
+    )
+    api_cache.add_cache_arguments(parser)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Fill up to N articles concurrently (thread pool; default: 1 = sequential). Output is printed per article.",
+    )
     parser.add_argument("--content-root", default=os.environ.get("CONTENT_ROOT", "content"), help="Content root (content or content/pl)")
     args = parser.parse_args()
+    if args.resume:
+        # Repeat the interrupted run's arguments; flags given now come after them and take precedence
+        saved_argv = RunJournal(args.resume).run_argv("fill_articles")
+        if saved_argv is None:
+            print(f"Error: no fill_articles run {args.resume!r} in logs/runs.")
+            sys.exit(1)
+        args = parser.parse_args(saved_argv + sys.argv[1:])
+
+    if args.api_retries is not None:
+        configure_retries(args.api_retries)
+    api_cache.configure_from_args(args)
 
     content_dir = get_content_root_path(PROJECT_ROOT, args.content_root)
     global ARTICLES_DIR, RUN_TOOLS_PATH
@@ -3371,10 +4487,11 @@ def main() -> None:
             return
         print(f"Prompt-2-only mode: {len(candidates_p2)} article(s) with placeholder.\n")
         wrote = would_fill = api_failed = skipped = 0
-        for path in candidates_p2:
-            result = fill_prompt2_one(
-                path, model=args.model, base_url=base_url, api_key=api_key, dry_run=dry_run
-            )
+
+        def prompt2_fn(path: Path) -> str:
+            return fill_prompt2_one(path, model=args.model, base_url=base_url, api_key=api_key, dry_run=dry_run)
+
+        for path, result in _run_pool(candidates_p2, prompt2_fn, args.workers):
             if result == "wrote":
                 wrote += 1
             elif result == "would_fill":
@@ -3392,34 +4509,48 @@ def main() -> None:
             sys.exit(2)
         return
 
-    candidates: list[Path] = []
-    for path in sorted(ARTICLES_DIR.glob("*.md")):
-        stem = path.stem
-        if args.since and len(stem) >= 10 and stem[:10] < args.since:
-            continue
-        if args.slug_contains and args.slug_contains not in stem:
-            continue
-        try:
-            content = path.read_text(encoding="utf-8")
-        except OSError:
-            continue
-        meta, _, body, _ = _parse_frontmatter(content)
-        if should_process(meta, body, args.force, use_html=args.html):
-            candidates.append(path)
+    if args.batch:
+        _run_batch_mode(args, api_key=api_key, base_url=base_url, dry_run=dry_run)
+        return
 
-    if args.limit > 0:
+    journal = RunJournal(args.resume or args.journal)
+    candidates = _select_candidates(args)
+    if args.resume:
+        # The articles the interrupted run queued (written ones no longer count as drafts)
+        queued = {e["slug"] for e in journal.events if e.get("state") == "queued" and e.get("script") == "fill_articles"}
+        candidates = [p for p in candidates if p.stem in queued]
+        finished = [p for p in candidates if journal.finished(p.stem, "fill_articles")]
+        if finished:
+            print(f"Resume: {len(finished)} article(s) already finished in run {journal.run_id}; skipping them.")
+            candidates = [p for p in candidates if p not in finished]
+    elif args.limit > 0:
+        # With --journal the caller (refresh_articles.py) decides what is left to do
         candidates = candidates[: args.limit]
     if not candidates:
         print("No matching draft articles to process.")
         return
+    journal.start(sys.argv[1:])
+    for path in candidates:
+        journal.event(path.stem, "queued")
+    print(f"Run journal: {journal.path.relative_to(PROJECT_ROOT)} (if interrupted: --resume {journal.run_id})")
 
     qa_enabled = (args.write and not args.no_qa) or (dry_run and args.qa)
     if args.write and args.no_qa:
         print("Preflight QA disabled (--no-qa).\n")
     elif qa_enabled:
         print("Preflight QA enabled.\n")
-
-    print(f"Processing {len(candidates)} file(s)...\n")
+    if args.stream and not args.quality_gate:
+        print("Note: --stream only applies with --quality_gate (it needs the retry loop); ignoring it.\n")
+
+    # Average cost per call of the model, for --speculative-budget (read once; the ledger is not compacted here)
+    speculative_call_cost = None
+    if args.speculative >= 2 and args.speculative_budget:
+        m = (api_ledger.summary().get("by_model") or {}).get(args.model) or {}
+        if m.get("calls") and m.get("cost"):
+            speculative_call_cost = m["cost"] / m["calls"]
+
+    workers = max(1, args.workers)
+    print(f"Processing {len(candidates)} file(s)" + (f" with {workers} workers" if workers > 1 else "") + "...\n")
     wrote = 0
     would_fill = 0
     qa_failed = 0
@@ -3427,18 +4558,12 @@ def main() -> None:
     api_failed = 0
     skipped = 0
     blocked = 0
-    for path in candidates:
-        if args.style:
-            effective_style = args.style
-        else:
-            try:
-                _tmp = path.read_text(encoding="utf-8")
-                _m, _, _, _ = _parse_frontmatter(_tmp)
-                at = (_m.get("audience_type") or "").strip().lower()
-            except OSError:
-                at = ""
-            effective_style = STYLE_FOR_AUDIENCE.get(at, STYLE_DEFAULT)
-        result = fill_one(
+
+    def fill_fn(path: Path) -> str:
+        saved = journal.saved_response(path.stem)
+        if saved is not None:
+            print(f"  Resume: reusing the response saved for {path.name} in run {journal.run_id}")
+        status = fill_one(
             path,
             model=args.model,
             base_url=base_url,
@@ -3447,7 +4572,7 @@ def main() -> None:
             write=args.write,
             qa_enabled=qa_enabled,
             qa_strict=args.qa_strict,
-            style=effective_style,
+            style=_style_for(path, args.style),
             block_on_fail=args.block_on_fail,
             quality_gate=args.quality_gate,
             quality_retries=args.quality_retries,
@@ -3456,7 +4581,20 @@ def main() -> None:
             remap=args.remap,
             generate_prompt2=not args.skip_prompt2,
             min_words_override=args.min_words_override,
+            stream=args.stream,
+            section_retry=not args.no_section_retry,
+            speculative=args.speculative,
+            speculative_budget=args.speculative_budget,
+            speculative_call_cost=speculative_call_cost,
+            prompt2_early=not args.no_prompt2_overlap,
+            response_text=saved,
+            journal=journal,
         )
+        journal.event(path.stem, "done", status=status)
+        return status
+
+    # Counters are only touched here, on the main thread, as results come back from the pool
+    for path, result in _run_pool(candidates, fill_fn, workers):
         if result == "wrote":
             wrote += 1
         elif result == "would_fill":
@@ -3480,6 +4618,20 @@ def main() -> None:
     print(f"  API failed:          {api_failed}")
     print(f"  skipped:             {skipped}")
     print(f"  blocked:             {blocked}")
+    if api_cache.enabled():
+        cs = api_cache.stats()
+        print(f"  API cache:           {cs['hits']} hits, {cs['misses']} misses, {cs['stored']} stored")
+    spent = api_ledger.session_totals()
+    if spent["calls"]:
+        # Prompt cache hit rate: share of input tokens the API served from its cache of prompt prefixes
+        cached_share = spent["cached_tokens"] / spent["input_tokens"] if spent["input_tokens"] else 0
+        print(
+            f"  API usage:           {spent['calls']} calls, {spent['input_tokens']} in ({spent['cached_tokens']} cached, {cached_share:.0%}), "
+            f"{spent['output_tokens']} out, ${spent['cost']:.4f}"
+        )
+    limits = utilisation().get(args.model)
+    if limits:
+        print(f"  API rate limit:      RPM {limits['rpm'] * 100:.0f}%, TPM {limits['tpm'] * 100:.0f}% used ({limits['throttled']} x 429 so far)")
 
     try:
         LOGS_DIR.mkdir(parents=True, exist_ok=True)
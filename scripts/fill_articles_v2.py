@@ -6,40 +6,21 @@ generując treść dla każdej sekcji.
 """
 
 import argparse
-import json
 import os
 import re
 import sys
-import urllib.error
-import urllib.request
 from datetime import datetime
 from pathlib import Path
 
+from openai_client import call_chat_completions
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 
 def make_openai_request(messages: list, model: str = "gpt-4o-mini", max_tokens: int = 4000) -> str:
     api_key = os.environ.get("OPENAI_API_KEY", "").strip()
     if not api_key:
         raise ValueError("OPENAI_API_KEY nie jest ustawiony")
-    base_url = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com").rstrip("/")
-    url = f"{base_url}/v1/chat/completions"
-    data = json.dumps({
-        "model": model,
-        "messages": messages,
-        "max_tokens": max_tokens,
-        "temperature": 0.7,
-    }).encode("utf-8")
-    req = urllib.request.Request(url, data=data, method="POST")
-    req.add_header("Content-Type", "application/json")
-    req.add_header("Authorization", f"Bearer {api_key}")
-    try:
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            body = resp.read().decode("utf-8")
-            result = json.loads(body)
-            return result["choices"][0]["message"]["content"]
-    except urllib.error.HTTPError as e:
-        err_body = e.read().decode("utf-8")
-        raise RuntimeError(f"API error {e.code}: {err_body}")
+    return call_chat_completions(messages, model=model, api_key=api_key, max_tokens=max_tokens, temperature=0.7, timeout=120)
 
 def parse_frontmatter(content: str):
     if not content.startswith("---"):
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+RSS 2.0 feeds for production articles: public/feed.xml (whole site) and
+public/hubs/<slug>/feed.xml (one per hub). Items are the newest N articles, picked with
+a top-k heap over metadata index dates (no full sort, no re-reading article files);
+titles and leads come from the cached index. Output is deterministic (lastBuildDate =
+newest item date), so a feed file is rewritten only when its items change. Stdlib only.
+Supports --site (main|pl), --out-dir, --base-url like generate_sitemap.py.
+"""
+
+import argparse
+import heapq
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from content_index import (
+    get_hubs_list_for_site,
+    get_category_slugs_for_site,
+    load_config,
+)
+from content_root import get_content_root_path
+from metadata_index import filter_categories, get_indexed_articles
+from url_map import fs_slugs, get_url_map
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+PUBLIC_DIR = PROJECT_ROOT / "public"
+FEED_ITEMS_DEFAULT = 20
+FEED_NAME = "feed.xml"
+SITE_TITLE = "Flowtaro"
+
+
+def _rfc822(day: str | None) -> str | None:
+    """YYYY-MM-DD -> RFC 822 date (midnight UTC) for pubDate/lastBuildDate."""
+    if not day:
+        return None
+    try:
+        return format_datetime(datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc))
+    except ValueError:
+        return None
+
+
+def newest_articles(articles: list[dict], limit: int) -> list[dict]:
+    """Top `limit` articles by (lastmod, slug), newest first; O(n log k) instead of sorting everything."""
+    return heapq.nlargest(limit, articles, key=lambda a: (a.get("lastmod") or "", a["slug"]))
+
+
+def build_feed_xml(
+    title: str,
+    link: str,
+    description: str,
+    items: list[dict],
+    feed_url: str,
+    slug_to_fs: dict[str, str],
+    base_url: str,
+    lang: str = "en",
+) -> str:
+    """RSS 2.0 document for items (newest first, as returned by newest_articles)."""
+    newest = _rfc822(items[0].get("lastmod")) if items else None
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n',
+        "  <channel>\n",
+        f"    <title>{escape(title)}</title>\n",
+        f"    <link>{escape(link)}</link>\n",
+        f"    <description>{escape(description)}</description>\n",
+        f"    <language>{lang}</language>\n",
+        f'    <atom:link href="{escape(feed_url)}" rel="self" type="application/rss+xml"/>\n',
+    ]
+    if newest:
+        parts.append(f"    <lastBuildDate>{newest}</lastBuildDate>\n")
+    for a in items:
+        meta = a["meta"]
+        url = f"{base_url}/articles/{slug_to_fs.get(a['slug'], a['slug'])}/"
+        parts.append("    <item>\n")
+        parts.append(f"      <title>{escape((meta.get('title') or a['slug']).strip())}</title>\n")
+        parts.append(f"      <link>{escape(url)}</link>\n")
+        parts.append(f'      <guid isPermaLink="true">{escape(url)}</guid>\n')
+        pub = _rfc822(a.get("lastmod"))
+        if pub:
+            parts.append(f"      <pubDate>{pub}</pubDate>\n")
+        category = (meta.get("category") or "").strip()
+        if category:
+            parts.append(f"      <category>{escape(category)}</category>\n")
+        if a.get("lead"):
+            parts.append(f"      <description>{escape(a['lead'])}</description>\n")
+        parts.append("    </item>\n")
+    parts.append("  </channel>\n</rss>\n")
+    return "".join(parts)
+
+
+def _write_if_changed(path: Path, text: str) -> bool:
+    """Write text to path unless it already has exactly that content. Returns True if written."""
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def _hub_members(articles: list[dict], hubs: list[dict]) -> dict[str, list[dict]]:
+    """{hub slug: articles} in one pass; same rule as generate_hubs (no category -> hubs of the first hub's category)."""
+    by_category: dict[str, list[str]] = {}
+    for h in hubs:
+        by_category.setdefault((h.get("category") or h.get("slug") or "").strip().lower(), []).append(h["slug"])
+    first_category = (hubs[0].get("category") or hubs[0].get("slug") or "").strip().lower() if hubs else None
+    out: dict[str, list[dict]] = {h["slug"]: [] for h in hubs}
+    for a in articles:
+        cat = (a["meta"].get("category") or "").strip().lower() or first_category
+        for slug in by_category.get(cat, []):
+            out[slug].append(a)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate RSS feeds (site + one per hub) for main or pl site.")
+    parser.add_argument("--content-root", default=os.environ.get("CONTENT_ROOT", "content"), help="Content root (content or content/pl)")
+    parser.add_argument("--site", default=os.environ.get("SITE", "main"), choices=("main", "pl"), help="Site variant")
+    parser.add_argument("--out-dir", default=os.environ.get("OUT_DIR", str(PUBLIC_DIR)), help="Output directory (feed.xml and hubs/<slug>/feed.xml)")
+    parser.add_argument("--base-url", default=os.environ.get("BASE_URL"), help="Base URL for links (default: pl.flowtaro.com for pl, flowtaro.com for main)")
+    parser.add_argument("--limit", type=int, default=FEED_ITEMS_DEFAULT, help=f"Items per feed (default: {FEED_ITEMS_DEFAULT})")
+    args = parser.parse_args()
+    site = args.site
+    content_dir = get_content_root_path(PROJECT_ROOT, args.content_root)
+    base_url = (args.base_url or ("https://pl.flowtaro.com" if site == "pl" else "https://flowtaro.com")).strip().rstrip("/")
+    generate_feeds(site, content_dir, Path(args.out_dir), base_url, limit=args.limit)
+
+
+def generate_feeds(
+    site: str,
+    content_dir: Path,
+    out_dir: Path,
+    base_url: str,
+    limit: int = FEED_ITEMS_DEFAULT,
+    config: dict | None = None,
+    indexed: list[dict] | None = None,
+) -> int:
+    """
+    Write the site feed and one feed per hub. config and indexed (get_indexed_articles() for the
+    whole articles dir) may be passed in by publish.py to reuse one scan. Returns files written.
+    """
+    config_path = content_dir / "config.yaml"
+    articles_dir = content_dir / "articles"
+    lang = "pl" if site == "pl" else "en"
+    limit = max(1, limit)
+    if config is None:
+        config = load_config(config_path)
+    hubs = get_hubs_list_for_site(config, site)
+    category_slugs = get_category_slugs_for_site(config, site)
+    if indexed is None:
+        indexed = get_indexed_articles(articles_dir)
+    articles = filter_categories(indexed, category_slugs)
+    url_map = get_url_map(site, [a["slug"] for a in articles], [h["slug"] for h in hubs], out_dir, base_url)
+    slug_to_fs = fs_slugs(url_map)
+
+    feeds: list[tuple[Path, str]] = [(
+        out_dir / FEED_NAME,
+        build_feed_xml(
+            SITE_TITLE, f"{base_url}/", f"{SITE_TITLE} — newest articles",
+            newest_articles(articles, limit), f"{base_url}/{FEED_NAME}", slug_to_fs, base_url, lang,
+        ),
+    )]
+    members = _hub_members(articles, hubs)
+    for hub in hubs:
+        slug = hub["slug"]
+        hub_url = f"{base_url}/hubs/{slug}/"
+        feeds.append((
+            out_dir / "hubs" / slug / FEED_NAME,
+            build_feed_xml(
+                hub.get("title") or slug, hub_url, hub.get("description") or hub.get("title") or slug,
+                newest_articles(members.get(slug, []), limit), hub_url + FEED_NAME, slug_to_fs, base_url, lang,
+            ),
+        ))
+    written = sum(1 for path, xml in feeds if _write_if_changed(path, xml))
+    print(f"Feeds: {len(feeds)} ({written} written, {len(feeds) - written} unchanged) in {out_dir}")
+    return written
+
+
+if __name__ == "__main__":
+    main()
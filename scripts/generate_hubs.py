@@ -4,24 +4,33 @@ Category hub generator: reads content/config.yaml and content/articles/,
 generates hub pages for each hub in config (get_hubs_list). If config has multiple hubs,
 articles are assigned by meta.category; otherwise all production articles go to the single hub.
 Stdlib only. Outputs HTML with card grids (same structure as homepage).
+Incremental: membership comes from the metadata index and each hub's card data (type, slug,
+title, date) is compared with logs/hub_membership_<site>.json from the previous run; only hubs
+whose cards, title or intro changed are rewritten, and those are built in a thread pool.
 """
 
 import argparse
+import hashlib
 import html as html_module
+import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from pathlib import Path
 
 from content_index import (
-    get_production_articles,
     get_hubs_list_for_site,
     get_category_slugs_for_site,
     load_config,
 )
 from content_root import get_content_root_path
+from metadata_index import get_indexed_articles
+from url_map import fs_slugs, get_url_map
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+LOGS_DIR = PROJECT_ROOT / "logs"
+HUB_STATE_VERSION = 1
 
 ARTICLES_URL_PREFIX = "/articles/"
 ARTICLES_URL_SUFFIX = "/"
@@ -112,21 +121,31 @@ def _card_html(title: str, slug: str, date_iso: str) -> str:
     )
 
 
-def _section_html(section_title: str, articles: list[tuple[dict, Path]]) -> str:
-    """One section: h2 + grid of cards. Returns empty string if no articles."""
+def _section_html(
+    section_title: str,
+    articles: list[tuple[dict, Path]],
+    slug_to_fs: dict[str, str] | None = None,
+) -> str:
+    """One section: h2 + grid of cards. Returns empty string if no articles. Links use filesystem slugs from slug_to_fs."""
     if not articles:
         return ""
+    slug_to_fs = slug_to_fs or {}
     parts = [f'<h2 {H2_CLASS}>{html_module.escape(section_title)}</h2>\n', f'<div {GRID_CLASS}>\n']
     for meta, path in articles:
         title = (meta.get("title") or meta.get("slug") or path.stem).strip() or path.stem
         slug = meta.get("slug") or path.stem
         date_iso = updated_iso(meta, path)
-        parts.append(_card_html(title, slug, date_iso))
+        parts.append(_card_html(title, slug_to_fs.get(slug, slug), date_iso))
     parts.append("</div>\n")
     return "".join(parts)
 
 
-def build_hub_content(hub_title: str, hub_intro: str, articles: list[tuple[dict, Path]]) -> str:
+def build_hub_content(
+    hub_title: str,
+    hub_intro: str,
+    articles: list[tuple[dict, Path]],
+    slug_to_fs: dict[str, str] | None = None,
+) -> str:
     """Build hub page as HTML: H1, intro, then sections by content_type (cards)."""
     parts: list[str] = []
     intro = hub_intro.strip() or (
@@ -145,7 +164,7 @@ def build_hub_content(hub_title: str, hub_intro: str, articles: list[tuple[dict,
         by_type.setdefault(ct, []).append((meta, path))
     for content_type, section_title in CONTENT_TYPE_SECTIONS:
         group = by_type.get(content_type, [])
-        section_html = _section_html(section_title, sorted(group, key=lambda x: (x[0].get("slug", x[1].stem),)))
+        section_html = _section_html(section_title, sorted(group, key=lambda x: (x[0].get("slug", x[1].stem),)), slug_to_fs)
         if section_html:
             parts.append(section_html)
     return "".join(parts)
@@ -169,6 +188,60 @@ def _articles_for_hub(
     return out
 
 
+def _hub_state_path(site: str) -> Path:
+    return LOGS_DIR / f"hub_membership_{'pl' if site == 'pl' else 'main'}.json"
+
+
+def _load_hub_state(site: str, hubs_dir: Path) -> dict[str, dict]:
+    """{hub slug: {"digest", "cards"}} from the previous run for the same hubs_dir; {} otherwise."""
+    try:
+        data = json.loads(_hub_state_path(site).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != HUB_STATE_VERSION or data.get("hubs_dir") != str(hubs_dir.resolve()):
+        return {}
+    hubs = data.get("hubs")
+    return hubs if isinstance(hubs, dict) else {}
+
+
+def _save_hub_state(site: str, hubs_dir: Path, hubs: dict[str, dict]) -> None:
+    path = _hub_state_path(site)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({"version": HUB_STATE_VERSION, "hubs_dir": str(hubs_dir.resolve()), "hubs": hubs}, ensure_ascii=False, indent=1),
+            encoding="utf-8",
+        )
+    except OSError:
+        pass
+
+
+def _card_rows(articles: list[tuple[dict, Path]], slug_to_fs: dict[str, str]) -> list[list[str]]:
+    """Card data that determines the hub page: [content_type, slug, fs slug, title, date] sorted."""
+    rows = []
+    for meta, path in articles:
+        slug = meta.get("slug") or path.stem
+        title = (meta.get("title") or slug).strip() or path.stem
+        ct = (meta.get("content_type") or "guide").strip().lower()
+        rows.append([ct, slug, slug_to_fs.get(slug, slug), title, updated_iso(meta, path)])
+    rows.sort()
+    return rows
+
+
+def _hub_digest(title: str, intro: str, rows: list[list[str]]) -> str:
+    return hashlib.sha256(json.dumps([title, intro, rows], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _membership_diff(old_rows: list[list[str]], new_rows: list[list[str]]) -> str:
+    """Short 'added/removed/updated' summary between two card lists (by slug)."""
+    old = {r[1]: r for r in old_rows}
+    new = {r[1]: r for r in new_rows}
+    added = len(new.keys() - old.keys())
+    removed = len(old.keys() - new.keys())
+    updated = sum(1 for k in new.keys() & old.keys() if new[k] != old[k])
+    return f"+{added} -{removed} ~{updated}"
+
+
 def get_hub_intro(hub: dict, hubs_dir: Path) -> str:
     """
     Return intro text for a hub. Precedence:
@@ -193,34 +266,79 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Generate hub markdown files from config and articles.")
     parser.add_argument("--content-root", default=os.environ.get("CONTENT_ROOT", "content"), help="Content root (content or content/pl)")
     parser.add_argument("--site", default=os.environ.get("SITE", "main"), choices=("main", "pl"), help="Site variant (main or pl)")
+    parser.add_argument("--force", action="store_true", help="Rewrite every hub even if its membership and cards are unchanged")
+    parser.add_argument("--workers", type=int, default=4, help="Threads for building changed hubs (default: 4)")
     args = parser.parse_args()
     site = args.site
     content_dir = get_content_root_path(PROJECT_ROOT, args.content_root)
+    generate_hubs(site, content_dir, force=args.force, workers=args.workers)
+
+
+def generate_hubs(
+    site: str,
+    content_dir: Path,
+    config: dict | None = None,
+    all_articles: list[tuple[dict, Path]] | None = None,
+    force: bool = False,
+    workers: int = 4,
+) -> list[str]:
+    """
+    Write content/hubs/<slug>.md for every hub of the site whose membership or card data changed
+    since the last run (all hubs with force=True). config and all_articles (every production
+    article, unfiltered) may be passed in by publish.py to reuse one scan. Returns written hub slugs.
+    """
     config_path = content_dir / "config.yaml"
     articles_dir = content_dir / "articles"
     hubs_dir = content_dir / "hubs"
 
-    config = load_config(config_path)
+    if config is None:
+        config = load_config(config_path)
     hubs = get_hubs_list_for_site(config, site)
-    all_articles = get_production_articles(articles_dir, config_path)
+    if all_articles is None:
+        all_articles = [(a["meta"], a["path"]) for a in get_indexed_articles(articles_dir)]
     category_slugs = get_category_slugs_for_site(config, site)
     if category_slugs is not None:
         all_articles = [a for a in all_articles if (a[0].get("category") or "").strip() in category_slugs]
     first_hub_category = hubs[0]["category"] if hubs else None
     hubs_dir.mkdir(parents=True, exist_ok=True)
+    url_map = get_url_map(site, [meta.get("slug") or path.stem for meta, path in all_articles], [h["slug"] for h in hubs])
+    slug_to_fs = fs_slugs(url_map)
+
+    previous = {} if force else _load_hub_state(site, hubs_dir)
+    state: dict[str, dict] = {}
+    todo: list[tuple[dict, str, str, list[tuple[dict, Path]], str]] = []
     for hub in hubs:
         slug = hub["slug"]
-        category = hub["category"]
         title = hub["title"] or slug
-        articles = _articles_for_hub(all_articles, category, first_hub_category)
+        articles = _articles_for_hub(all_articles, hub["category"], first_hub_category)
         intro = get_hub_intro(hub, hubs_dir)
-        html_body = build_hub_content(title, intro, articles)
+        rows = _card_rows(articles, slug_to_fs)
+        digest = _hub_digest(title, intro, rows)
+        state[slug] = {"digest": digest, "cards": rows}
+        prev = previous.get(slug)
+        if prev and prev.get("digest") == digest and (hubs_dir / f"{slug}.md").is_file():
+            print(f"Hub unchanged: {hubs_dir / f'{slug}.md'} ({len(articles)} articles)")
+            continue
+        change = _membership_diff(prev.get("cards") or [], rows) if prev else "new"
+        todo.append((hub, title, intro, articles, change))
+
+    def write_hub(item: tuple) -> str:
+        hub, title, intro, articles, change = item
+        html_body = build_hub_content(title, intro, articles, slug_to_fs)
         frontmatter = f'---\ntitle: "{title}"\n---\n\n'
-        content = frontmatter + html_body
-        out_path = hubs_dir / f"{slug}.md"
-        out_path.write_text(content, encoding="utf-8")
-        print(f"Hub written: {out_path} ({len(articles)} articles)")
+        out_path = hubs_dir / f"{hub['slug']}.md"
+        out_path.write_text(frontmatter + html_body, encoding="utf-8")
+        return f"Hub written: {out_path} ({len(articles)} articles; {change})"
 
+    if len(todo) > 1 and workers > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            messages = list(pool.map(write_hub, todo))
+    else:
+        messages = [write_hub(item) for item in todo]
+    for msg in messages:
+        print(msg)
+    _save_hub_state(site, hubs_dir, state)
+    return [item[0]["slug"] for item in todo]
 
 if __name__ == "__main__":
     main()
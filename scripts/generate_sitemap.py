@@ -1,106 +1,241 @@
 #!/usr/bin/env python3
 """
-Production-only sitemap generator. Uses content_index for production articles;
-outputs public/sitemap.xml with hub + articles. Stdlib only.
-Supports --site (main|pl), --out-dir, --base-url for subdomain builds.
+Production-only sitemap generator. Uses the metadata index for production articles and
+their lastmod; streams <url> entries into gzip shards public/sitemap-N.xml.gz (at most
+50,000 URLs / 50 MB uncompressed each) plus public/sitemap_index.xml. public/sitemap.xml
+gets the same index so existing /sitemap.xml links keep working. A shard is rewritten
+only when its URLs or lastmods changed (digests kept in logs/sitemap_manifest_<site>.json).
+Stdlib only. Supports --site (main|pl), --out-dir, --base-url for subdomain builds.
 """
 
 import argparse
+import gzip
+import hashlib
+import json
 import os
-import xml.etree.ElementTree as ET
+import re
 from pathlib import Path
+from xml.sax.saxutils import escape
 
 from content_index import (
-    get_production_articles,
     get_hubs_list_for_site,
     get_category_slugs_for_site,
     load_config,
 )
 from content_root import get_content_root_path
-from render_site import _slug_for_path
+from metadata_index import filter_categories, get_indexed_articles
+from url_map import fs_slugs, get_url_map
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 PUBLIC_DIR = PROJECT_ROOT / "public"
+LOGS_DIR = PROJECT_ROOT / "logs"
 SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
 
+# Sitemap protocol limits per file
+SHARD_MAX_URLS = 50_000
+SHARD_MAX_BYTES = 50 * 1024 * 1024
+SHARD_NAME = "sitemap-{n}.xml.gz"
+_SHARD_RE = re.compile(r"^sitemap-(\d+)\.xml\.gz$")
 
-def _date_from_string(s: str) -> str | None:
-    """Return YYYY-MM-DD if s is valid, else None."""
-    if not s or len(s) < 10:
-        return None
-    s = s.strip()[:10]
-    if len(s) != 10 or s[4] != "-" or s[7] != "-":
-        return None
+_XML_DECL = '<?xml version="1.0" encoding="UTF-8"?>\n'
+_URLSET_OPEN = f'{_XML_DECL}<urlset xmlns="{SITEMAP_NS}">\n'
+_URLSET_CLOSE = "</urlset>\n"
+
+
+def _url_entry(loc: str, lastmod: str | None) -> str:
+    """One <url> element as text (loc is XML-escaped)."""
+    if lastmod:
+        return f"  <url>\n    <loc>{escape(loc)}</loc>\n    <lastmod>{lastmod}</lastmod>\n  </url>\n"
+    return f"  <url>\n    <loc>{escape(loc)}</loc>\n  </url>\n"
+
+
+def _plan_shards(
+    urls: list[tuple[str, str | None]],
+    max_urls: int = SHARD_MAX_URLS,
+    max_bytes: int = SHARD_MAX_BYTES,
+) -> list[dict]:
+    """
+    Split urls into consecutive shards within the URL and byte limits.
+    Returns [{"start", "end", "digest", "lastmod"}, ...]; digest covers every loc + lastmod of the shard.
+    """
+    frame = len(_URLSET_OPEN.encode("utf-8")) + len(_URLSET_CLOSE.encode("utf-8"))
+    shards: list[dict] = []
+    start, size, newest = 0, frame, ""
+    h = hashlib.sha256()
+    for i, (loc, lastmod) in enumerate(urls):
+        n = len(_url_entry(loc, lastmod).encode("utf-8"))
+        if i > start and (i - start >= max_urls or size + n > max_bytes):
+            shards.append({"start": start, "end": i, "digest": h.hexdigest(), "lastmod": newest or None})
+            start, size, newest = i, frame, ""
+            h = hashlib.sha256()
+        h.update(f"{loc}\t{lastmod or ''}\n".encode("utf-8"))
+        size += n
+        newest = max(newest, lastmod or "")
+    if urls:
+        shards.append({"start": start, "end": len(urls), "digest": h.hexdigest(), "lastmod": newest or None})
+    return shards
+
+
+def _write_shard(path: Path, urls: list[tuple[str, str | None]]) -> None:
+    """Stream one urlset into a gzip file (mtime 0 so identical content gives identical bytes)."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gz:
+        gz.write(_URLSET_OPEN.encode("utf-8"))
+        for loc, lastmod in urls:
+            gz.write(_url_entry(loc, lastmod).encode("utf-8"))
+        gz.write(_URLSET_CLOSE.encode("utf-8"))
+    os.replace(tmp, path)
+
+
+def _sitemap_index_xml(entries: list[tuple[str, str | None]]) -> str:
+    """sitemapindex XML for [(shard loc, lastmod or None), ...]."""
+    parts = [f'{_XML_DECL}<sitemapindex xmlns="{SITEMAP_NS}">\n']
+    for loc, lastmod in entries:
+        parts.append(f"  <sitemap>\n    <loc>{escape(loc)}</loc>\n")
+        if lastmod:
+            parts.append(f"    <lastmod>{lastmod}</lastmod>\n")
+        parts.append("  </sitemap>\n")
+    parts.append("</sitemapindex>\n")
+    return "".join(parts)
+
+
+def _write_if_changed(path: Path, text: str) -> bool:
+    """Write text to path unless it already has exactly that content. Returns True if written."""
     try:
-        y, m, d = int(s[:4]), int(s[5:7]), int(s[8:10])
-        if 1 <= m <= 12 and 1 <= d <= 31:
-            return f"{y:04d}-{m:02d}-{d:02d}"
-    except (ValueError, IndexError):
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except OSError:
         pass
-    return None
+    path.write_text(text, encoding="utf-8")
+    return True
 
 
-def _lastmod_for_article(meta: dict, path: Path) -> str | None:
-    """lastmod from frontmatter last_updated or filename date prefix."""
-    lastmod = _date_from_string(meta.get("last_updated") or "")
-    if lastmod:
-        return lastmod
-    stem = path.stem
-    return _date_from_string(stem)
+def _manifest_path(site: str) -> Path:
+    return LOGS_DIR / f"sitemap_manifest_{'pl' if site == 'pl' else 'main'}.json"
+
 
+def _load_manifest(site: str, out_dir: Path, base_url: str) -> dict[str, str]:
+    """{shard file name: digest} from the last run for the same out_dir and base_url; {} otherwise."""
+    try:
+        data = json.loads(_manifest_path(site).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get("out_dir") != str(out_dir.resolve()) or data.get("base_url") != base_url:
+        return {}
+    shards = data.get("shards")
+    return shards if isinstance(shards, dict) else {}
 
-def _write_sitemap_xml(urls: list[tuple[str, str | None]], base_url: str) -> str:
-    """Build sitemap XML string. urls = [(path, lastmod or None), ...]. loc = base_url + path."""
-    root = ET.Element("urlset", xmlns=SITEMAP_NS)
+
+def _save_manifest(site: str, out_dir: Path, base_url: str, shards: dict[str, str]) -> None:
+    path = _manifest_path(site)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({"out_dir": str(out_dir.resolve()), "base_url": base_url, "shards": shards}, indent=2),
+            encoding="utf-8",
+        )
+    except OSError:
+        pass
+
+
+def write_sitemaps(
+    urls: list[tuple[str, str | None]],
+    out_dir: Path,
+    base_url: str,
+    site: str = "main",
+    max_urls: int = SHARD_MAX_URLS,
+) -> dict:
+    """
+    Write sitemap-N.xml.gz shards, sitemap_index.xml and sitemap.xml (same index) to out_dir.
+    urls = [(absolute loc, lastmod or None), ...] in a stable order (new URLs appended at the end
+    keep earlier shards unchanged). Returns {"shards", "written", "unchanged", "removed"}.
+    """
     base = base_url.rstrip("/")
-    for loc_path, lastmod in urls:
-        url_el = ET.SubElement(root, "url")
-        path = loc_path if loc_path.startswith("/") else "/" + loc_path
-        ET.SubElement(url_el, "loc").text = base + path
-        if lastmod:
-            ET.SubElement(url_el, "lastmod").text = lastmod
-    ET.indent(root, space="  ")
-    return ET.tostring(root, encoding="unicode", default_namespace="", method="xml")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    previous = _load_manifest(site, out_dir, base)
+    plan = _plan_shards(urls, max_urls=max_urls)
+    manifest: dict[str, str] = {}
+    index_entries: list[tuple[str, str | None]] = []
+    written = unchanged = 0
+    for n, shard in enumerate(plan, start=1):
+        name = SHARD_NAME.format(n=n)
+        path = out_dir / name
+        if previous.get(name) == shard["digest"] and path.is_file():
+            unchanged += 1
+        else:
+            _write_shard(path, urls[shard["start"]:shard["end"]])
+            written += 1
+        manifest[name] = shard["digest"]
+        index_entries.append((f"{base}/{name}", shard["lastmod"]))
+    removed = 0
+    for path in out_dir.glob("sitemap-*.xml.gz"):
+        m = _SHARD_RE.match(path.name)
+        if m and int(m.group(1)) > len(plan):
+            path.unlink()
+            removed += 1
+    index_xml = _sitemap_index_xml(index_entries)
+    _write_if_changed(out_dir / "sitemap_index.xml", index_xml)
+    _write_if_changed(out_dir / "sitemap.xml", index_xml)
+    _save_manifest(site, out_dir, base, manifest)
+    return {"shards": len(plan), "written": written, "unchanged": unchanged, "removed": removed}
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Generate sitemap.xml for main or pl site.")
+    parser = argparse.ArgumentParser(description="Generate sharded sitemaps + sitemap_index.xml for main or pl site.")
     parser.add_argument("--content-root", default=os.environ.get("CONTENT_ROOT", "content"), help="Content root (content or content/pl)")
     parser.add_argument("--site", default=os.environ.get("SITE", "main"), choices=("main", "pl"), help="Site variant")
-    parser.add_argument("--out-dir", default=os.environ.get("OUT_DIR", str(PUBLIC_DIR)), help="Output directory (sitemap.xml written here)")
+    parser.add_argument("--out-dir", default=os.environ.get("OUT_DIR", str(PUBLIC_DIR)), help="Output directory (sitemaps written here)")
     parser.add_argument("--base-url", default=os.environ.get("BASE_URL"), help="Base URL for loc (default: pl.flowtaro.com for pl, flowtaro.com for main)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_MAX_URLS, help=f"Max URLs per shard (default and protocol limit: {SHARD_MAX_URLS})")
     args = parser.parse_args()
     site = args.site
     content_dir = get_content_root_path(PROJECT_ROOT, args.content_root)
+    base_url = (args.base_url or ("https://pl.flowtaro.com" if site == "pl" else "https://flowtaro.com")).strip().rstrip("/")
+    generate_sitemap(site, content_dir, Path(args.out_dir), base_url, shard_size=args.shard_size)
+
+
+def generate_sitemap(
+    site: str,
+    content_dir: Path,
+    out_dir: Path,
+    base_url: str,
+    shard_size: int = SHARD_MAX_URLS,
+    config: dict | None = None,
+    indexed: list[dict] | None = None,
+) -> dict:
+    """
+    Write the sitemaps for one site. config and indexed (get_indexed_articles() for the whole
+    articles dir) may be passed in by publish.py to reuse one scan. Returns write_sitemaps() result.
+    """
     config_path = content_dir / "config.yaml"
     articles_dir = content_dir / "articles"
-    out_dir = Path(args.out_dir)
-    base_url = (args.base_url or ("https://pl.flowtaro.com" if site == "pl" else "https://flowtaro.com")).strip().rstrip("/")
-    out_path = out_dir / "sitemap.xml"
-
-    config = load_config(config_path)
+    shard_size = max(1, min(shard_size, SHARD_MAX_URLS))
+    if config is None:
+        config = load_config(config_path)
     hubs = get_hubs_list_for_site(config, site)
     category_slugs = get_category_slugs_for_site(config, site)
-    articles = get_production_articles(articles_dir, config_path)
-    if category_slugs:
-        articles = [a for a in articles if ((a[0].get("category") or a[0].get("category_slug") or "").strip() in category_slugs)]
-    articles_sorted = sorted(articles, key=lambda x: (x[0].get("slug") or x[1].stem,))
+    # Sorted by file name (date-prefixed), so new articles land in the last shard
+    if indexed is None:
+        indexed = get_indexed_articles(articles_dir)
+    articles = filter_categories(indexed, category_slugs)
+
+    hub_slugs = [hub.get("slug") or hub.get("category") or "" for hub in hubs]
+    url_map = get_url_map(site, [a["slug"] for a in articles], hub_slugs, out_dir, base_url)
+    slug_to_fs = fs_slugs(url_map)
 
     urls: list[tuple[str, str | None]] = []
-    for hub in hubs:
-        slug = hub.get("slug") or hub.get("category") or ""
+    for slug in hub_slugs:
         if slug:
-            urls.append((f"/hubs/{slug}/", None))
-    for meta, path in articles_sorted:
-        slug = meta.get("slug") or path.stem
-        slug_fs = _slug_for_path(slug, out_dir)
-        urls.append((f"/articles/{slug_fs}/", _lastmod_for_article(meta, path)))
-
-    xml_str = '<?xml version="1.0" encoding="UTF-8"?>\n' + _write_sitemap_xml(urls, base_url)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(xml_str, encoding="utf-8")
-    print(f"Sitemap written: {out_path} ({len(urls)} URLs)")
-
+            urls.append((f"{base_url}/hubs/{slug}/", None))
+    for a in articles:
+        urls.append((f"{base_url}/articles/{slug_to_fs.get(a['slug'], a['slug'])}/", a["lastmod"]))
+
+    result = write_sitemaps(urls, out_dir, base_url, site, max_urls=shard_size)
+    print(
+        f"Sitemap written: {out_dir / 'sitemap_index.xml'} ({len(urls)} URLs, {result['shards']} shard(s): "
+        f"{result['written']} written, {result['unchanged']} unchanged, {result['removed']} removed)"
+    )
+    return result
 
 if __name__ == "__main__":
     main()
@@ -3,7 +3,7 @@
 Populate content/use_cases.yaml with business problems/use cases for content generation.
 Uses existing articles (keywords/topics) and OpenAI API to suggest new, non-duplicative use cases.
 Number of use cases per run is taken only from config (use_case_batch_size); no CLI override.
-Stdlib only + OpenAI Responses API (urllib). No PyYAML; simple line-based YAML read/write.
+Stdlib only + OpenAI Responses API (shared keep-alive client, openai_client.py). No PyYAML; simple line-based YAML read/write.
 """
 
 import argparse
@@ -12,8 +12,6 @@ import os
 import random
 import re
 import sys
-import urllib.error
-import urllib.request
 from datetime import datetime
 from pathlib import Path
 
@@ -25,6 +23,8 @@ if str(_SCRIPTS_DIR) not in sys.path:
 from content_index import get_hubs_list, load_config  # noqa: E402
 from content_root import get_content_root_path  # noqa: E402
 from generate_queue import load_existing_queue  # noqa: E402
+import api_cache  # noqa: E402
+from openai_client import call_responses  # noqa: E402
 
 PROJECT_ROOT = _SCRIPTS_DIR.parent
 CONTENT_DIR = PROJECT_ROOT / "content"
@@ -417,42 +417,8 @@ def call_responses_api(
     base_url: str,
     api_key: str,
 ) -> str:
-    """POST to {base_url}/v1/responses. Return response text or raise. Same as fill_articles.call_responses_api."""
-    url = base_url.rstrip("/") + "/v1/responses"
-    payload = {
-        "model": model,
-        "instructions": instructions,
-        "input": user_message,
-    }
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
-    )
-    try:
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            out = json.loads(resp.read().decode("utf-8"))
-    except urllib.error.HTTPError as e:
-        body = e.read().decode("utf-8") if e.fp else ""
-        raise RuntimeError(f"API error {e.code}: {body}") from e
-    if isinstance(out.get("output_text"), str) and out["output_text"].strip():
-        return out["output_text"].strip()
-    for item in out.get("output") or []:
-        if item.get("type") == "message" and "content" in item:
-            c = item["content"]
-            if isinstance(c, str):
-                return c.strip()
-            if isinstance(c, list):
-                for part in c:
-                    if isinstance(part, dict) and part.get("type") == "output_text":
-                        if part.get("text"):
-                            return part["text"].strip()
-    raise RuntimeError("No output text in API response")
+    """POST to {base_url}/v1/responses over the shared keep-alive pool. Return response text or raise."""
+    return call_responses(instructions, user_message, model=model, base_url=base_url, api_key=api_key, timeout=120)
 
 
 def build_prompt(
@@ -791,7 +757,9 @@ def main() -> None:
         metavar="TYPE",
         help="Restrict content_type to one or more (repeat for multiple). Must be in config content_types_all.",
     )
+    api_cache.add_cache_arguments(parser)
     args = parser.parse_args()
+    api_cache.configure_from_args(args)
 
     content_dir = get_content_root_path(PROJECT_ROOT, args.content_root)
     config_path = content_dir / "config.yaml"
@@ -908,6 +876,7 @@ def main() -> None:
         # Parse JSON and validate (use restricted types/categories when --content-type/--category were set)
         candidates = parse_ai_use_cases(response_text, allowed_types, categories)
         if not candidates:
+            api_cache.discard_last()
             last_issues = ["API returned empty or invalid JSON array of use cases."]
             if attempt < max_attempts:
                 print(f"Attempt {attempt}/{max_attempts} failed: invalid or empty JSON. Retrying...")
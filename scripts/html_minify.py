@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+HTML minifier for rendered pages. Stdlib only, single pass over the page (no DOM).
+Collapses inter-tag whitespace, drops comments (keeps IE conditional comments) and
+leaves <pre>, <code>, <textarea>, <script> and <style> content byte-for-byte untouched.
+Used by render_site.py --minify; can also be run on an existing output tree:
+  python scripts/html_minify.py public
+"""
+
+import re
+import sys
+from pathlib import Path
+
+# Elements whose content must be copied verbatim (whitespace is significant or not HTML)
+PRESERVE_TAGS = frozenset(("pre", "code", "textarea", "script", "style"))
+# Raw-text elements: content cannot contain nested tags, so we only look for the closing tag
+_RAW_TEXT_TAGS = frozenset(("textarea", "script", "style"))
+
+# Whitespace next to these tags is not rendered, so it can be dropped instead of collapsed to one space
+BLOCK_TAGS = frozenset((
+    "html", "head", "body", "title", "meta", "link", "base", "script", "style", "noscript",
+    "div", "section", "article", "header", "footer", "nav", "main", "aside",
+    "p", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "dl", "dt", "dd",
+    "table", "thead", "tbody", "tfoot", "tr", "td", "th", "caption", "colgroup", "col",
+    "form", "fieldset", "legend", "figure", "figcaption", "blockquote", "hr", "pre",
+    "details", "summary", "address", "template", "!doctype",
+))
+
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_DECL_RE = re.compile(r"<![^>]*>")
+_TAG_RE = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9:-]*)((?:\"[^\"]*\"|'[^']*'|[^'\">])*)>")
+_WS_RE = re.compile(r"[ \t\r\n\f]+")
+
+
+def _find_preserved_end(text: str, tag: str, start: int) -> int:
+    """Return index just past the closing tag matching an opened <tag> (content starts at start)."""
+    if tag in _RAW_TEXT_TAGS:
+        close = re.compile(r"</" + tag + r"\s*>", re.IGNORECASE)
+        m = close.search(text, start)
+        return m.end() if m else len(text)
+    # pre/code may nest (e.g. <pre><code>...</code></pre>); track depth of the same tag name
+    pattern = re.compile(r"<(/?)" + tag + r"\b[^>]*>", re.IGNORECASE)
+    depth = 1
+    for m in pattern.finditer(text, start):
+        depth += -1 if m.group(1) else 1
+        if depth == 0:
+            return m.end()
+    return len(text)
+
+
+def _collapse_text(text: str, prev_tag: str | None, next_tag: str | None) -> str:
+    """Collapse whitespace runs to one space; drop it entirely at block boundaries."""
+    out = _WS_RE.sub(" ", text)
+    if prev_tag is None or prev_tag in BLOCK_TAGS:
+        out = out.lstrip(" ")
+    if next_tag is None or next_tag in BLOCK_TAGS:
+        out = out.rstrip(" ")
+    return out
+
+
+def minify_html(text: str) -> str:
+    """Return minified HTML. Safe for rendered pages: tag markup and preserved elements are copied as-is."""
+    out: list[str] = []
+    pending: list[str] = []  # text pieces since the last tag (comments between them are dropped)
+    prev_tag: str | None = None
+    pos = 0
+    n = len(text)
+
+    def flush(next_tag: str | None) -> None:
+        if pending:
+            collapsed = _collapse_text("".join(pending), prev_tag, next_tag)
+            if collapsed:
+                out.append(collapsed)
+            pending.clear()
+
+    while pos < n:
+        lt = text.find("<", pos)
+        if lt == -1:
+            pending.append(text[pos:])
+            break
+        if lt > pos:
+            pending.append(text[pos:lt])
+            pos = lt
+        if text.startswith("<!--", pos):
+            m = _COMMENT_RE.match(text, pos)
+            end = m.end() if m else n
+            if text.startswith("<!--[if", pos) or text.startswith("<!--<![endif]", pos):
+                flush(None)
+                out.append(text[pos:end])
+            pos = end
+            continue
+        if text.startswith("<!", pos):
+            m = _DECL_RE.match(text, pos)
+            end = m.end() if m else n
+            flush("!doctype")
+            out.append(text[pos:end])
+            prev_tag = "!doctype"
+            pos = end
+            continue
+        m = _TAG_RE.match(text, pos)
+        if not m:
+            # Stray "<" in text (e.g. "a < b"): keep as text
+            pending.append("<")
+            pos += 1
+            continue
+        tag = m.group(2).lower()
+        flush(tag)
+        is_close = bool(m.group(1))
+        if not is_close and tag in PRESERVE_TAGS and not m.group(3).rstrip().endswith("/"):
+            end = _find_preserved_end(text, tag, m.end())
+            out.append(text[pos:end])
+            pos = end
+        else:
+            out.append(m.group(0))
+            pos = m.end()
+        prev_tag = tag
+    flush(None)
+    return "".join(out)
+
+
+def format_bytes_saved(before: int, after: int) -> str:
+    """Human-readable 'before -> after bytes (-X.X%)' line used in minify reports."""
+    saved = before - after
+    pct = (100.0 * saved / before) if before else 0.0
+    return f"{before:,} -> {after:,} bytes (-{saved:,}, -{pct:.1f}%)"
+
+
+def print_minify_report(stats: list[tuple[str, int, int]], verbose: bool = True) -> None:
+    """Print per-page (when verbose) and total byte savings. stats = [(label, bytes_before, bytes_after), ...]."""
+    if not stats:
+        return
+    if verbose:
+        print("Minify report (per page):")
+        for label, before, after in stats:
+            print(f"  {label}: {format_bytes_saved(before, after)}")
+    total_before = sum(b for _l, b, _a in stats)
+    total_after = sum(a for _l, _b, a in stats)
+    print(f"Minify total ({len(stats)} pages): {format_bytes_saved(total_before, total_after)}")
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/html_minify.py <dir> [--dry-run]")
+        sys.exit(1)
+    root = Path(sys.argv[1])
+    dry_run = "--dry-run" in sys.argv[2:]
+    if not root.is_dir():
+        print(f"Error: {root} is not a directory.")
+        sys.exit(1)
+    stats: list[tuple[str, int, int]] = []
+    for path in sorted(root.rglob("*.html")):
+        try:
+            original = path.read_text(encoding="utf-8")
+        except OSError as e:
+            print(f"  (skip read {path}: {e})")
+            continue
+        minified = minify_html(original)
+        stats.append((str(path.relative_to(root)), len(original.encode("utf-8")), len(minified.encode("utf-8"))))
+        if not dry_run and minified != original:
+            path.write_text(minified, encoding="utf-8")
+    print_minify_report(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Load test for fill_articles.py and refresh_articles.py against the local mock API (mock_openai.py),
+so throughput, concurrency and retry behaviour can be measured without paying for real calls.
+
+Each (script, concurrency) run works in a throwaway copy of the project (scripts/, content/,
+templates/), so neither the articles nor logs/ (cost ledger, journals) are touched. Concurrency is
+fill_articles.py --workers N, or N refresh_articles.py processes over disjoint shards of the
+articles. Reported per run: articles per minute (wall clock), p50 / p95 call latency (from the
+copy's cost ledger), QA pass rate (from its run journal) and the 429 / 5xx answers the mock gave.
+The report is also saved to logs/load_test/<timestamp>.json. Stdlib only.
+
+  python scripts/load_test.py                                     # fill at 1, 4 and 8 workers
+  python scripts/load_test.py --scripts fill,refresh --levels 1,2,4 --articles 8
+  python scripts/load_test.py --latency 3 --latency-p95 8 --rate-limit-rate 0.05 --fail-rate 0.2 --stream
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from api_ledger import percentile
+from mock_openai import add_mock_arguments, config_from_args, start_server
+from refresh_articles import find_articles_older_than
+from run_journal import read_events
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+REPORT_DIR = PROJECT_ROOT / "logs" / "load_test"
+# Done statuses counted as a passing article
+PASS_STATUSES = ("wrote", "refreshed")
+_COPY_IGNORE = shutil.ignore_patterns("__pycache__", "*.pyc", "backups")
+
+
+def _make_sandbox(parent: Path) -> Path:
+    root = parent / "project"
+    for name in ("scripts", "content", "templates"):
+        if (PROJECT_ROOT / name).is_dir():
+            shutil.copytree(PROJECT_ROOT / name, root / name, ignore=_COPY_IGNORE)
+    (root / "logs").mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def _commands(script: str, level: int, root: Path, args: argparse.Namespace) -> list[list[str]]:
+    """Processes to start for one run (all at once)."""
+    scripts_dir = root / "scripts"
+    if script == "fill":
+        cmd = [
+            sys.executable, str(scripts_dir / "fill_articles.py"),
+            "--write", "--force", "--html", "--quality_gate",
+            "--quality_retries", str(args.quality_retries),
+            "--limit", str(args.articles),
+            "--workers", str(level),
+        ]
+        return [cmd + (["--stream"] if args.stream else [])]
+    paths = find_articles_older_than(root / "content" / "articles", 0, args.articles)
+    commands = []
+    for i in range(min(level, len(paths))):
+        shard = root / "logs" / f"load_test_shard_{i}.txt"
+        shard.write_text("\n".join(p.stem for p in paths[i::level]) + "\n", encoding="utf-8")
+        cmd = [
+            sys.executable, str(scripts_dir / "refresh_articles.py"),
+            "--days", "0", "--include-file", str(shard),
+            "--no-render", "--no-batch-backup",
+            "--quality_retries", str(args.quality_retries),
+        ]
+        commands.append(cmd + (["--stream"] if args.stream else []))
+    return commands
+
+
+def _run_once(script: str, level: int, server, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory(prefix="flowtaro-load-") as tmp:
+        root = _make_sandbox(Path(tmp))
+        env = dict(os.environ)
+        env.pop("CONTENT_ROOT", None)
+        env.update(
+            OPENAI_BASE_URL=server.base_url,
+            OPENAI_API_KEY="mock",
+            OPENAI_API_CACHE="0",
+            PYTHONIOENCODING="utf-8",
+        )
+        server.state.reset()
+        log_path = root / "logs" / "load_test_output.log"
+        started = time.monotonic()
+        with open(log_path, "w", encoding="utf-8") as log:
+            procs = [
+                subprocess.Popen(cmd, cwd=str(root), env=env, stdout=log, stderr=subprocess.STDOUT)
+                for cmd in _commands(script, level, root, args)
+            ]
+            codes = [p.wait() for p in procs]
+        wall = time.monotonic() - started
+
+        script_name = "fill_articles" if script == "fill" else "refresh_articles"
+        statuses: dict[str, int] = {}
+        for journal in (root / "logs" / "runs").glob("*.jsonl"):
+            for event in read_events(journal):
+                if event.get("state") == "done" and event.get("script") == script_name:
+                    statuses[event.get("status") or "?"] = statuses.get(event.get("status") or "?", 0) + 1
+        latencies, input_tokens, cached_tokens = [], 0, 0
+        for event in read_events(root / "logs" / "api_ledger.jsonl"):
+            if event.get("latency_s") is not None:
+                latencies.append(float(event["latency_s"]))
+            input_tokens += int(event.get("input_tokens") or 0)
+            cached_tokens += int(event.get("cached_tokens") or 0)
+        if args.keep:
+            kept = REPORT_DIR / f"{script}_x{level}_output.log"
+            kept.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(log_path, kept)
+
+    done = sum(statuses.values())
+    mock = server.state.stats.as_dict()
+    by_status = mock["by_status"]
+    p50, p95 = percentile(latencies, 50), percentile(latencies, 95)
+    return {
+        "script": script_name,
+        "concurrency": level,
+        "exit_codes": codes,
+        "articles": done,
+        "wall_s": round(wall, 2),
+        "articles_per_min": round(done / wall * 60, 2) if wall > 0 else 0.0,
+        "calls": len(latencies),
+        "latency_p50_s": round(p50, 3) if p50 is not None else None,
+        "latency_p95_s": round(p95, 3) if p95 is not None else None,
+        "qa_pass_rate": round(sum(statuses.get(s, 0) for s in PASS_STATUSES) / done, 3) if done else None,
+        "statuses": statuses,
+        "cached_share": round(cached_tokens / input_tokens, 3) if input_tokens else None,
+        "http_429": by_status.get("429", 0),
+        "http_5xx": sum(n for code, n in by_status.items() if code.startswith("5")),
+        "mock": mock,
+    }
+
+
+def _fmt(value, spec: str = "") -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark fill / refresh throughput against the local mock OpenAI API.")
+    parser.add_argument("--scripts", default="fill", help="Comma-separated: fill, refresh (default: fill).")
+    parser.add_argument("--levels", default="1,4,8", help="Comma-separated concurrency levels (default: 1,4,8).")
+    parser.add_argument("--articles", type=int, default=12, metavar="N", help="Articles per run (default: 12).")
+    parser.add_argument("--quality_retries", type=int, default=2, help="Quality gate retries per article (default: 2).")
+    parser.add_argument("--stream", action="store_true", help="Run fill / refresh with --stream.")
+    parser.add_argument("--keep", action="store_true", help="Keep each run's console output in logs/load_test/.")
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    scripts = [s.strip() for s in args.scripts.split(",") if s.strip()]
+    if any(s not in ("fill", "refresh") for s in scripts):
+        print("Error: --scripts takes fill and/or refresh.")
+        sys.exit(1)
+    try:
+        levels = [int(x) for x in args.levels.split(",") if x.strip()]
+    except ValueError:
+        print("Error: --levels must be comma-separated integers.")
+        sys.exit(1)
+    if not levels or min(levels) < 1 or args.articles < 1:
+        print("Error: --levels and --articles must be at least 1.")
+        sys.exit(1)
+
+    server = start_server(config_from_args(args))
+    if not server.state.articles:
+        print("Error: no filled .html articles in content/articles to serve as mock responses.")
+        sys.exit(1)
+    print(f"Mock API on {server.base_url}: latency p50 {args.latency:g}s / p95 {args.latency_p95:g}s, "
+          f"429 {args.rate_limit_rate:.0%}, 5xx {args.error_rate:.0%}, failing bodies {args.fail_rate:.0%}")
+    results = []
+    try:
+        for script in scripts:
+            for level in levels:
+                print(f"  {script} x{level}: {args.articles} article(s)...", flush=True)
+                results.append(_run_once(script, level, server, args))
+    finally:
+        server.shutdown()
+
+    print(f"\n{'script':<17} {'conc':>4} {'articles':>8} {'wall s':>7} {'art/min':>8} {'calls':>6} "
+          f"{'p50 s':>6} {'p95 s':>6} {'QA pass':>7} {'429':>4} {'5xx':>4}")
+    for r in results:
+        print(
+            f"{r['script']:<17} {r['concurrency']:>4} {r['articles']:>8} {r['wall_s']:>7.1f} {r['articles_per_min']:>8.1f} "
+            f"{r['calls']:>6} {_fmt(r['latency_p50_s'], '.2f'):>6} {_fmt(r['latency_p95_s'], '.2f'):>6} "
+            f"{_fmt(r['qa_pass_rate'], '.0%'):>7} {r['http_429']:>4} {r['http_5xx']:>4}"
+        )
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    report_path = REPORT_DIR / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    report = {"created": datetime.now().isoformat(timespec="seconds"), "argv": sys.argv[1:], "results": results}
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nReport: {report_path.relative_to(PROJECT_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Metadata index: cached frontmatter + derived fields (lastmod, lead) for every article file.
+Persisted to logs/metadata_index_<articles dir>.json and refreshed by stat (mtime, size),
+so only new or changed files are re-read. Used by generate_sitemap and generate_feeds
+instead of re-parsing the whole corpus. Stdlib only.
+"""
+
+import html
+import json
+import os
+import re
+from pathlib import Path
+
+from content_index import (
+    ARTICLES_DIR,
+    _parse_frontmatter,
+    _parse_html_frontmatter_from_comment,
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+LOGS_DIR = PROJECT_ROOT / "logs"
+INDEX_VERSION = 2
+LEAD_MAX_CHARS = 220
+
+_HTML_P_RE = re.compile(r"<p(?:\s[^>]*)?>([\s\S]*?)</p>", re.IGNORECASE)
+# Editor-only sections render_site drops before rendering (EN / PL)
+_MD_EDITOR_SECTION_RE = re.compile(
+    r"^## (?:Verification policy \(editors only\)|Polityka weryfikacji \(tylko redaktorzy\)).*?(?=^##|\Z)",
+    re.DOTALL | re.MULTILINE,
+)
+_MD_SKIP_PREFIXES = ("#", "**", "-", "*", "---", "[", "{{", ">", "|", "<", "```")
+
+
+def date_from_string(s: str) -> str | None:
+    """Return YYYY-MM-DD if s starts with a valid date, else None."""
+    if not s or len(s) < 10:
+        return None
+    s = s.strip()[:10]
+    if len(s) != 10 or s[4] != "-" or s[7] != "-":
+        return None
+    try:
+        y, m, d = int(s[:4]), int(s[5:7]), int(s[8:10])
+        if 1 <= m <= 12 and 1 <= d <= 31:
+            return f"{y:04d}-{m:02d}-{d:02d}"
+    except (ValueError, IndexError):
+        pass
+    return None
+
+
+def lastmod_for(meta: dict, stem: str) -> str | None:
+    """lastmod from frontmatter last_updated or filename date prefix."""
+    return date_from_string(meta.get("last_updated") or "") or date_from_string(stem)
+
+
+def index_path(articles_dir: Path) -> Path:
+    """logs/metadata_index_<articles dir relative to project, / -> _>.json."""
+    try:
+        label = str(articles_dir.resolve().relative_to(PROJECT_ROOT))
+    except ValueError:
+        label = str(articles_dir.resolve()).lstrip("/\\")
+    label = label.replace("\\", "_").replace("/", "_").replace(":", "") or "articles"
+    return LOGS_DIR / f"metadata_index_{label}.json"
+
+
+def _trim_lead(text: str) -> str:
+    text = " ".join(text.split())
+    return text[:LEAD_MAX_CHARS].rsplit(" ", 1)[0] if len(text) > LEAD_MAX_CHARS else text
+
+
+def _lead_from_body(content: str, is_html: bool) -> str:
+    """Plain-text lead: first <p> (HTML) or first prose paragraph (Markdown), trimmed like render_site's lead."""
+    if is_html:
+        m = _HTML_P_RE.search(content)
+        return _trim_lead(html.unescape(re.sub(r"<[^>]+>", "", m.group(1)))) if m else ""
+    if content.startswith("---"):
+        end = content.find("\n---", 3)
+        content = content[end + 4:] if end != -1 else content
+    content = _MD_EDITOR_SECTION_RE.sub("", content)
+    for block in re.split(r"\n\s*\n", content):
+        block = block.strip()
+        if block and not block.startswith(_MD_SKIP_PREFIXES):
+            return _trim_lead(re.sub(r"\[([^\]]+)\]\([^)]*\)", r"\1", block).replace("**", ""))
+    return ""
+
+
+def _read_entry(path: Path) -> tuple[dict | None, str]:
+    """(frontmatter, lead) of one article (.html comment block or .md frontmatter); meta None if unparsable."""
+    try:
+        content = path.read_text(encoding="utf-8")
+    except OSError:
+        return None, ""
+    if path.suffix == ".html":
+        meta = _parse_html_frontmatter_from_comment(content)
+        if meta:
+            meta.setdefault("slug", path.stem)
+    else:
+        meta = _parse_frontmatter(path)
+    if not meta:
+        return None, ""
+    explicit = (meta.get("lead") or meta.get("excerpt") or meta.get("summary") or "").strip()
+    return meta, _trim_lead(explicit) if explicit else _lead_from_body(content, path.suffix == ".html")
+
+
+def _load_index_file(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION or not isinstance(data.get("files"), dict):
+        return {}
+    return data["files"]
+
+
+def _save_index_file(path: Path, files: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps({"version": INDEX_VERSION, "files": files}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def load_metadata_index(articles_dir: Path | None = None) -> dict[str, dict]:
+    """
+    Return {file name: {"mtime_ns", "size", "meta", "lastmod", "lead"}} for every .md/.html file in
+    articles_dir. Files whose (mtime_ns, size) match the stored entry are not re-read; the
+    index file is rewritten only when something was added, changed or removed.
+    """
+    dir_path = articles_dir or ARTICLES_DIR
+    if not dir_path.exists():
+        return {}
+    path = index_path(dir_path)
+    old = _load_index_file(path)
+    files: dict[str, dict] = {}
+    dirty = False
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            if not entry.is_file() or not entry.name.endswith((".md", ".html")):
+                continue
+            st = entry.stat()
+            prev = old.get(entry.name)
+            if prev and prev.get("mtime_ns") == st.st_mtime_ns and prev.get("size") == st.st_size:
+                files[entry.name] = prev
+                continue
+            meta, lead = _read_entry(Path(entry.path))
+            stem = entry.name.rsplit(".", 1)[0]
+            files[entry.name] = {
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "meta": meta,
+                "lastmod": lastmod_for(meta, stem) if meta else None,
+                "lead": lead,
+            }
+            dirty = True
+    if dirty or len(files) != len(old):
+        _save_index_file(path, files)
+    return files
+
+
+def get_indexed_articles(
+    articles_dir: Path | None = None,
+    category_slugs: set[str] | None = None,
+) -> list[dict]:
+    """
+    Production articles (status "filled"; .html wins over .md for the same stem) from the
+    metadata index, sorted by file name like get_production_articles().
+    Returns [{"slug", "path", "meta", "lastmod", "lead"}, ...]; optionally filtered to category_slugs.
+    """
+    dir_path = articles_dir or ARTICLES_DIR
+    files = load_metadata_index(dir_path)
+    by_stem: dict[str, str] = {}
+    for name in files:
+        stem, _, ext = name.rpartition(".")
+        if ext == "html" or stem not in by_stem:
+            by_stem[stem] = name
+    out: list[dict] = []
+    for name in sorted(by_stem.values()):
+        entry = files[name]
+        meta = entry.get("meta")
+        if not meta or (meta.get("status") or "").strip().lower() != "filled":
+            continue
+        stem = name.rsplit(".", 1)[0]
+        out.append({
+            "slug": meta.get("slug") or stem,
+            "path": dir_path / name,
+            "meta": meta,
+            "lastmod": entry.get("lastmod"),
+            "lead": entry.get("lead") or "",
+        })
+    return filter_categories(out, category_slugs)
+
+
+def filter_categories(articles: list[dict], category_slugs: set[str] | None) -> list[dict]:
+    """Keep indexed articles whose category (or category_slug) is in category_slugs; all if empty/None."""
+    if not category_slugs:
+        return articles
+    return [a for a in articles if (a["meta"].get("category") or a["meta"].get("category_slug") or "").strip() in category_slugs]
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI endpoints the pipeline calls, for benchmarking fill_articles.py and
+refresh_articles.py without paying for real calls (see load_test.py). Stdlib only.
+
+  POST /v1/responses          (plain JSON or server-sent events with "stream": true)
+  POST /v1/chat/completions
+  POST /v1/files, POST /v1/batches, GET /v1/batches/<id>, GET /v1/files/<id>/content
+
+Article requests (an "Article title:" line in the input) are answered with a canned body: the
+filled .html article with the same primary keyword from content/articles (else one of the same
+content type), plus the HEADLINE / TOOLS_SELECTED lines the fill prompt asks for. Bodies are HTML
+(fill_articles.py --html, as refresh_articles.py runs it); markdown fills, which must echo the
+skeleton back, fail QA against the mock. With --fail-rate, a share of the bodies fails QA (a
+forbidden phrase or a missing Prompt #2 block). Other requests (Prompt #2, descriptions,
+translations) get a short canned text. Latency is lognormal (--latency median, --latency-p95);
+--error-rate and --rate-limit-rate answer that share of requests with a 5xx or a 429 with
+Retry-After. Usage reports cached input tokens for instruction prefixes (1024+ tokens) seen
+before, like OpenAI prompt caching.
+
+  python scripts/mock_openai.py --port 8765 --latency 2 --rate-limit-rate 0.05 --fail-rate 0.2
+  OPENAI_BASE_URL=http://127.0.0.1:8765 OPENAI_API_KEY=mock python scripts/fill_articles.py --write --html
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from content_root import get_content_root_path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Streamed bodies are sent in deltas of this many characters
+STREAM_CHUNK_CHARS = 200
+# Prompt caching: prefixes from 1024 tokens, in 128-token steps (about 4 characters per token)
+CACHE_MIN_CHARS = 1024 * 4
+CACHE_STEP_CHARS = 128 * 4
+# Phrase the fill QA rejects and cannot sanitize away (FORBIDDEN_PATTERNS in fill_articles.py)
+FAIL_PHRASE = "We are number one in this category."
+FREE_TEXT = (
+    "Here is an example of what the AI returns for this input:\n\n"
+    "1. A short summary of the situation and the goal.\n"
+    "2. Three concrete next steps, each with an owner and a check.\n"
+    "3. A note on what to verify before acting on the result.\n"
+)
+
+
+@dataclass
+class MockConfig:
+    latency: float = 1.0  # median seconds per response
+    latency_p95: float = 3.0
+    error_rate: float = 0.0  # share of requests answered with 500 / 503
+    rate_limit_rate: float = 0.0  # share answered with 429
+    retry_after: float = 1.0
+    fail_rate: float = 0.0  # share of article bodies that fail QA
+    batch_delay: float = 0.0  # seconds until a batch is completed
+    seed: int | None = None
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    by_status: dict[str, int] = field(default_factory=dict)
+    articles: int = 0
+    failing_bodies: int = 0
+    streams: int = 0
+    batch_lines: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "by_status": dict(self.by_status),
+            "articles": self.articles,
+            "failing_bodies": self.failing_bodies,
+            "streams": self.streams,
+            "batch_lines": self.batch_lines,
+        }
+
+
+def _parse_html_article(text: str) -> tuple[dict, str] | None:
+    """(frontmatter, body) of a filled .html article (frontmatter in a leading <!-- --> comment)."""
+    m = re.match(r"\s*<!--(.*?)-->\s*", text, re.DOTALL)
+    if not m:
+        return None
+    meta = {}
+    for line in m.group(1).splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            meta[key.strip()] = value.strip().strip('"')
+    return meta, text[m.end():]
+
+
+def load_canned_articles(articles_dir: Path) -> list[tuple[dict, str]]:
+    """Filled .html articles usable as passing responses (frontmatter, body)."""
+    out = []
+    for path in sorted(articles_dir.glob("*.html")):
+        try:
+            parsed = _parse_html_article(path.read_text(encoding="utf-8"))
+        except OSError:
+            continue
+        # Older articles without both prompt blocks in Try it yourself would fail today's quality gate
+        if parsed and parsed[0].get("status") == "filled" and parsed[1].count("<pre") >= 2 and "PROMPT2_PLACEHOLDER" not in parsed[1]:
+            parsed[0].setdefault("primary_keyword", path.stem)
+            out.append(parsed)
+    return out
+
+
+def _failing_variant(body: str, rng: random.Random) -> str:
+    """Body that fails QA: a forbidden phrase in the first paragraph (preflight QA), or Try it yourself
+    without its Prompt #2 block (quality gate)."""
+    blocks = list(re.finditer(r"<pre[^>]*>.*?</pre>", body, re.DOTALL))
+    if len(blocks) >= 2 and rng.random() < 0.5:
+        return body[: blocks[1].start()] + body[blocks[1].end():]
+    return re.sub(r"(<p[^>]*>)", r"\1" + FAIL_PHRASE + " ", body, count=1)
+
+
+class MockState:
+    """Configuration, canned bodies, counters and stored files / batches of one mock server."""
+
+    def __init__(self, config: MockConfig, articles: list[tuple[dict, str]]):
+        self.config = config
+        self.articles = articles
+        self.by_keyword = {meta.get("primary_keyword", ""): (meta, body) for meta, body in articles}
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.stats = MockStats()
+        self.cached_prefixes: set[str] = set()
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict] = {}
+        self.ids = 0
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stats = MockStats()
+            self.cached_prefixes.clear()
+
+    def new_id(self, prefix: str) -> str:
+        with self.lock:
+            self.ids += 1
+            return f"{prefix}-mock{self.ids}"
+
+    def count(self, status: int) -> None:
+        with self.lock:
+            self.stats.requests += 1
+            self.stats.by_status[str(status)] = self.stats.by_status.get(str(status), 0) + 1
+
+    def roll(self, rate: float) -> bool:
+        with self.lock:
+            return rate > 0 and self.rng.random() < rate
+
+    def latency(self) -> float:
+        median = max(0.0, self.config.latency)
+        if median == 0:
+            return 0.0
+        sigma = math.log(max(self.config.latency_p95, median) / median) / 1.645
+        with self.lock:
+            return self.rng.lognormvariate(math.log(median), sigma)
+
+    def cached_tokens(self, instructions: str) -> int:
+        """Longest previously seen instruction prefix (OpenAI-style prompt caching), in tokens."""
+        lengths = range(CACHE_MIN_CHARS, len(instructions) + 1, CACHE_STEP_CHARS)
+        digests = [(n, hashlib.sha1(instructions[:n].encode("utf-8")).hexdigest()) for n in lengths]
+        with self.lock:
+            hit = max((n for n, d in digests if d in self.cached_prefixes), default=0)
+            self.cached_prefixes.update(d for _, d in digests)
+        return hit // 4
+
+    def answer(self, instructions: str, user_message: str) -> tuple[str, dict]:
+        """Response text and usage for one request."""
+        title = re.search(r"^Article title:\s*(.+)$", user_message, re.MULTILINE)
+        if title and self.articles:
+            keyword = re.search(r"^Primary keyword:\s*(.+)$", user_message, re.MULTILINE)
+            ctype = re.search(r"^Content type:\s*(.+)$", user_message, re.MULTILINE)
+            found = self.by_keyword.get(keyword.group(1).strip() if keyword else "")
+            if found is None:
+                same_type = [a for a in self.articles if ctype and a[0].get("content_type") == ctype.group(1).strip()]
+                pool = same_type or self.articles
+                found = pool[int(hashlib.sha1(title.group(1).encode("utf-8")).hexdigest(), 16) % len(pool)]
+            meta, body = found
+            failing = self.roll(self.config.fail_rate)
+            with self.lock:
+                self.stats.articles += 1
+                self.stats.failing_bodies += int(failing)
+            if failing:
+                body = _failing_variant(body, self.rng)
+            text = f"{body.rstrip()}\n\nHEADLINE: {meta.get('title') or title.group(1).strip()}\nTOOLS_SELECTED: {meta.get('tools', '')}\n"
+        else:
+            text = FREE_TEXT
+        input_tokens = (len(instructions) + len(user_message)) // 4
+        usage = {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": min(self.cached_tokens(instructions), input_tokens)},
+            "output_tokens": len(text) // 4,
+        }
+        return text, usage
+
+
+def _response_object(state: MockState, model: str, text: str, usage: dict) -> dict:
+    return {
+        "id": state.new_id("resp"),
+        "object": "response",
+        "status": "completed",
+        "model": model,
+        "output": [{"type": "message", "role": "assistant", "content": [{"type": "output_text", "text": text}]}],
+        "usage": {**usage, "total_tokens": usage["input_tokens"] + usage["output_tokens"]},
+    }
+
+
+def _chat_object(state: MockState, model: str, text: str, usage: dict) -> dict:
+    return {
+        "id": state.new_id("chatcmpl"),
+        "object": "chat.completion",
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": usage["input_tokens"],
+            "prompt_tokens_details": {"cached_tokens": usage["input_tokens_details"]["cached_tokens"]},
+            "completion_tokens": usage["output_tokens"],
+            "total_tokens": usage["input_tokens"] + usage["output_tokens"],
+        },
+    }
+
+
+def _chat_prompt(messages: list) -> tuple[str, str]:
+    """(system text, other messages' text) of a chat request."""
+    system, rest = [], []
+    for msg in messages or []:
+        content = msg.get("content") if isinstance(msg, dict) else ""
+        if isinstance(content, list):
+            content = "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        (system if msg.get("role") in ("system", "developer") else rest).append(str(content or ""))
+    return "\n".join(system), "\n".join(rest)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, obj, headers: dict[str, str] | None = None) -> None:
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self._send_bytes(status, data, "application/json", headers)
+
+    def _send_bytes(self, status: int, data: bytes, content_type: str, headers: dict[str, str] | None = None) -> None:
+        self.server.state.count(status)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: int, message: str, headers: dict[str, str] | None = None) -> None:
+        self._send_json(status, {"error": {"message": message, "type": "mock_error", "code": status}}, headers)
+
+    def _injected_failure(self) -> bool:
+        """Answer with a configured 429 or 5xx instead of the real response; True if one was sent."""
+        state = self.server.state
+        if state.roll(state.config.rate_limit_rate):
+            self._error(429, "Rate limit reached (mock).", {"Retry-After": f"{state.config.retry_after:g}"})
+            return True
+        if state.roll(state.config.error_rate):
+            time.sleep(min(state.latency(), 1.0))
+            self._error(state.rng.choice((500, 503)), "The server had an error (mock).")
+            return True
+        return False
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/v1/files":
+            return self._upload_file(raw)
+        try:
+            payload = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            return self._error(400, "Invalid JSON body.")
+        if path == "/v1/batches":
+            return self._create_batch(payload)
+        if path not in ("/v1/responses", "/v1/chat/completions"):
+            return self._error(404, f"Unknown endpoint {path} (mock).")
+        if self._injected_failure():
+            return
+        state = self.server.state
+        model = payload.get("model") or "gpt-4o-mini"
+        if path == "/v1/responses":
+            instructions, user_message = str(payload.get("instructions") or ""), str(payload.get("input") or "")
+        else:
+            instructions, user_message = _chat_prompt(payload.get("messages"))
+        text, usage = state.answer(instructions, user_message)
+        delay = state.latency()
+        if path == "/v1/responses" and payload.get("stream"):
+            return self._stream(state, model, text, usage, delay)
+        time.sleep(delay)
+        make = _response_object if path == "/v1/responses" else _chat_object
+        self._send_json(200, make(state, model, text, usage))
+
+    def _stream(self, state: MockState, model: str, text: str, usage: dict, delay: float) -> None:
+        """Server-sent events: first delta after 10% of the latency, the rest spread over the remainder."""
+        with state.lock:
+            state.stats.streams += 1
+        state.count(200)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)] or [""]
+        step = delay * 0.9 / len(chunks)
+        time.sleep(delay * 0.1)
+        try:
+            for chunk in chunks:
+                event = {"type": "response.output_text.delta", "delta": chunk}
+                self.wfile.write(f"event: response.output_text.delta\ndata: {json.dumps(event)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(step)
+            done = {"type": "response.completed", "response": _response_object(state, model, text, usage)}
+            self.wfile.write(f"event: response.completed\ndata: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped a doomed generation
+        self.close_connection = True
+
+    def _upload_file(self, raw: bytes) -> None:
+        m = re.search(rb'name="file"[^\r\n]*\r\n(?:[^\r\n]+\r\n)*\r\n(.*?)\r\n--', raw, re.DOTALL)
+        if not m:
+            return self._error(400, "Missing file part (mock).")
+        state = self.server.state
+        file_id = state.new_id("file")
+        state.files[file_id] = m.group(1)
+        self._send_json(200, {"id": file_id, "object": "file", "bytes": len(m.group(1)), "purpose": "batch"})
+
+    def _create_batch(self, payload: dict) -> None:
+        state = self.server.state
+        data = state.files.get(payload.get("input_file_id") or "")
+        if data is None:
+            return self._error(404, "No such input file (mock).")
+        out_lines, failed = [], 0
+        for line in data.decode("utf-8", errors="replace").splitlines():
+            try:
+                req = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            body = req.get("body") or {}
+            if state.roll(state.config.error_rate):
+                failed += 1
+                out_lines.append({"custom_id": req.get("custom_id"), "response": {"status_code": 500, "body": {"error": {"message": "mock"}}}})
+                continue
+            text, usage = state.answer(str(body.get("instructions") or ""), str(body.get("input") or ""))
+            resp = _response_object(state, body.get("model") or "gpt-4o-mini", text, usage)
+            out_lines.append({"custom_id": req.get("custom_id"), "response": {"status_code": 200, "body": resp}})
+        with state.lock:
+            state.stats.batch_lines += len(out_lines)
+        output_id = state.new_id("file")
+        state.files[output_id] = "".join(json.dumps(o, ensure_ascii=False) + "\n" for o in out_lines).encode("utf-8")
+        batch_id = state.new_id("batch")
+        state.batches[batch_id] = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": payload.get("endpoint"),
+            "input_file_id": payload.get("input_file_id"),
+            "output_file_id": output_id,
+            "error_file_id": None,
+            "request_counts": {"total": len(out_lines), "completed": len(out_lines) - failed, "failed": failed},
+            "created_at": int(time.time()),
+            "ready_at": time.time() + state.config.batch_delay,
+        }
+        self._send_json(200, self._batch_view(state.batches[batch_id]))
+
+    @staticmethod
+    def _batch_view(batch: dict) -> dict:
+        view = {k: v for k, v in batch.items() if k != "ready_at"}
+        if time.time() < batch["ready_at"]:
+            view.update(status="in_progress", output_file_id=None, request_counts={**batch["request_counts"], "completed": 0, "failed": 0})
+        else:
+            view["status"] = "completed"
+        return view
+
+    def do_GET(self):
+        path = self.path.split("?")[0].rstrip("/")
+        state = self.server.state
+        m = re.fullmatch(r"/v1/batches/([^/]+)", path)
+        if m:
+            batch = state.batches.get(m.group(1))
+            return self._send_json(200, self._batch_view(batch)) if batch else self._error(404, "No such batch (mock).")
+        m = re.fullmatch(r"/v1/files/([^/]+)/content", path)
+        if m:
+            data = state.files.get(m.group(1))
+            return self._send_bytes(200, data, "application/jsonl") if data is not None else self._error(404, "No such file (mock).")
+        if path == "/mock/stats":
+            return self._send_json(200, state.stats.as_dict())
+        self._error(404, f"Unknown endpoint {path} (mock).")
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], state: MockState):
+        super().__init__(address, MockHandler)
+        self.state = state
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(config: MockConfig, *, host: str = "127.0.0.1", port: int = 0, articles_dir: Path | None = None) -> MockServer:
+    """Start a mock server in a background thread (port 0: any free port) and return it; stop with shutdown()."""
+    articles = load_canned_articles(articles_dir or get_content_root_path(PROJECT_ROOT) / "articles")
+    server = MockServer((host, port), MockState(config, articles))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Mock behaviour flags (shared with load_test.py)."""
+    parser.add_argument("--latency", type=float, default=1.0, metavar="S", help="Median response time in seconds (default: 1.0).")
+    parser.add_argument("--latency-p95", type=float, default=3.0, metavar="S", help="95th percentile response time (default: 3.0).")
+    parser.add_argument("--error-rate", type=float, default=0.0, metavar="P", help="Share of requests answered with 500/503 (default: 0).")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, metavar="P", help="Share of requests answered with 429 (default: 0).")
+    parser.add_argument("--retry-after", type=float, default=1.0, metavar="S", help="Retry-After sent with 429 (default: 1).")
+    parser.add_argument("--fail-rate", type=float, default=0.0, metavar="P", help="Share of article bodies that fail QA (default: 0).")
+    parser.add_argument("--batch-delay", type=float, default=0.0, metavar="S", help="Seconds until a batch completes (default: 0).")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for latencies, errors and failing bodies.")
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        latency_p95=args.latency_p95,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        fail_rate=args.fail_rate,
+        batch_delay=args.batch_delay,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local mock of the OpenAI Responses / Chat Completions / Batch API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    server = start_server(config_from_args(args), host=args.host, port=args.port)
+    print(f"Mock OpenAI API on {server.base_url} ({len(server.state.articles)} canned articles)")
+    print(f"  export OPENAI_BASE_URL={server.base_url} OPENAI_API_KEY=mock")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,7 @@ if str(_SCRIPTS_DIR) not in sys.path:
     sys.path.insert(0, str(_SCRIPTS_DIR))
 
 from content_index import get_production_articles, load_config, _parse_html_frontmatter_from_comment  # noqa: E402
+import api_ledger  # noqa: E402
 
 _content_root = (os.environ.get("CONTENT_ROOT") or "content").strip() or "content"
 ARTICLES_DIR = _PROJECT_ROOT / _content_root.replace("/", os.sep) / "articles"
@@ -95,17 +96,9 @@ def _load_queue_simple(path: Path) -> list[dict]:
     return items
 
 
-def _estimate_tokens(text: str) -> int:
-    return len(text) // 4
-
-
 def _load_cost_data() -> dict:
-    if not API_COSTS_PATH.exists():
-        return {}
-    try:
-        return json.loads(API_COSTS_PATH.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
-        return {}
+    """Cost summary (logs/api_costs.json) after folding in new entries from the API ledger."""
+    return api_ledger.compact()
 
 
 def _article_paths_one_per_stem(articles_dir: Path) -> list[Path]:
@@ -179,6 +172,25 @@ def collect_cost_summary(cost_data: dict, days: int, article_count: int) -> tupl
     return total_all, last_n, avg
 
 
+def collect_usage_by_model(cost_data: dict) -> list[dict]:
+    """Per model: calls, tokens, cost and p50/p95 latency (seconds, recent calls) from the compacted ledger."""
+    latencies = cost_data.get("recent_latency_s") or {}
+    rows = []
+    for model, m in sorted((cost_data.get("by_model") or {}).items()):
+        lat = latencies.get(model) or []
+        rows.append({
+            "model": model,
+            "calls": m.get("calls", 0),
+            "input_tokens": m.get("input_tokens", 0),
+            "cached_tokens": m.get("cached_tokens", 0),
+            "output_tokens": m.get("output_tokens", 0),
+            "cost": m.get("cost", 0.0),
+            "p50_s": api_ledger.percentile(lat, 50),
+            "p95_s": api_ledger.percentile(lat, 95),
+        })
+    return rows
+
+
 def get_last_run(script_stem: str) -> str | None:
     """Return last run timestamp string or None."""
     path = LOGS_DIR / f"last_run_{script_stem}.txt"
@@ -251,12 +263,15 @@ def run_dashboard(summary_only: bool, days: int, use_color: bool) -> None:
             kw = (it.get("primary_keyword") or it.get("title") or "?")[:50]
             print(f"    - {kw}")
 
-    print("\n--- API cost (estimated) ---")
+    print("\n--- API cost ---")
     print(f"  Total (all time):    ${total_cost:.4f}")
     print(f"  Last {days} days:        ${cost_last_n:.4f}")
     if art["total"]:
         print(f"  Avg per article:      ${avg_cost:.4f}")
-    print("  (Blended ~$0.30/1M tokens; token estimate: chars/4)")
+    for row in collect_usage_by_model(cost_data):
+        lat = f", latency p50 {row['p50_s']:.1f}s / p95 {row['p95_s']:.1f}s" if row["p50_s"] is not None else ""
+        print(f"  {row['model']}: {row['calls']} calls, ${row['cost']:.4f}, {row['cached_tokens']}/{row['input_tokens']} input tokens cached{lat}")
+    print("  (From reported token usage; see python scripts/api_ledger.py)")
 
     print("\n--- Last run ---")
     for stem in ("generate_articles", "fill_articles", "render_site"):
@@ -276,14 +291,13 @@ def run_dashboard(summary_only: bool, days: int, use_color: bool) -> None:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Flowtaro Monitor: pipeline health dashboard.")
     parser.add_argument("--summary", action="store_true", help="Short summary only.")
-    parser.add_argument("--reset-costs", action="store_true", help="Reset api_costs.json.")
+    parser.add_argument("--reset-costs", action="store_true", help="Reset api_costs.json and the API ledger.")
     parser.add_argument("--days", type=int, default=30, metavar="N", help="Cost window in days (default: 30).")
     args = parser.parse_args()
 
     if args.reset_costs:
         try:
-            LOGS_DIR.mkdir(parents=True, exist_ok=True)
-            API_COSTS_PATH.write_text('{"by_date": {}}\n', encoding="utf-8")
+            api_ledger.reset()
             print("Cost data reset.")
         except OSError as e:
             print(f"Error resetting costs: {e}", file=sys.stderr)
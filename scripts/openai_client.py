@@ -0,0 +1,736 @@
+#!/usr/bin/env python3
+"""
+Shared OpenAI HTTP client: one keep-alive connection pool (stdlib http.client) per process,
+reused by every script that calls the API instead of a fresh TLS handshake per urlopen().
+Connections are kept per (scheme, host, port) and are thread-safe to share (fill_articles --workers).
+Base URL comes from the caller or OPENAI_BASE_URL (default https://api.openai.com); a path
+prefix in the base URL (e.g. a proxy at https://host/openai) is kept. HTTPS_PROXY / NO_PROXY
+are honoured like urllib did. Stdlib only.
+
+Transient failures (429, 408/409, 5xx, timeouts, dropped connections) are retried with
+exponential backoff + full jitter, honouring Retry-After; other 4xx fail at once. A process-wide
+circuit breaker opens after CIRCUIT_THRESHOLD consecutive 5xx/network failures and pauses every
+caller until a probe request succeeds, giving up (CircuitOpenError) after CIRCUIT_MAX_OPEN_S.
+Every attempt first reserves capacity in the cross-process RPM/TPM limiter (api_rate_limit.py).
+With the opt-in response cache (api_cache.py) on, a repeated request is answered from disk.
+Every call that reaches the API is booked with its reported usage and latency in api_ledger.py.
+stream_responses() reads /v1/responses as server-sent events and lets a callback stop a doomed generation.
+
+  from openai_client import call_responses
+  text = call_responses(instructions, user_message, model="gpt-4o-mini", api_key=key)
+"""
+
+import http.client
+import json
+import os
+import random
+import threading
+import time
+import urllib.request
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import api_cache
+import api_ledger
+import api_rate_limit
+
+DEFAULT_BASE_URL = "https://api.openai.com"
+DEFAULT_TIMEOUT = 120
+# Idle connections kept per host; enough for fill_articles --workers plus Prompt #2 calls
+MAX_IDLE_PER_HOST = 16
+
+
+def _env_int(name: str, default: int) -> int:
+    """Integer from the environment; the default when unset or not a number."""
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+# Retry policy (OPENAI_MAX_RETRIES overrides the default; configure_retries() from a CLI flag)
+MAX_RETRIES = _env_int("OPENAI_MAX_RETRIES", 4)
+BACKOFF_BASE_S = 1.0
+BACKOFF_CAP_S = 60.0
+RETRY_AFTER_CAP_S = 120.0
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+# Circuit breaker: consecutive 5xx / network failures before pausing, first pause, longest pause, give-up
+CIRCUIT_THRESHOLD = 5
+CIRCUIT_COOLDOWN_S = 30.0
+CIRCUIT_MAX_COOLDOWN_S = 300.0
+CIRCUIT_MAX_OPEN_S = 900.0
+
+# Raised by a reused keep-alive connection the server already closed; the request is resent once
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class ApiError(RuntimeError):
+    """HTTP error response from the API (status >= 400). Message format matches the old urllib call sites."""
+
+    def __init__(self, status: int, body: str, headers: dict[str, str] | None = None):
+        super().__init__(f"API error {status}: {body}")
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+
+class CircuitOpenError(RuntimeError):
+    """The endpoint has been failing for longer than CIRCUIT_MAX_OPEN_S; calls fail fast instead of waiting."""
+
+
+def default_base_url() -> str:
+    return (os.environ.get("OPENAI_BASE_URL") or DEFAULT_BASE_URL).strip().rstrip("/")
+
+
+class ConnectionPool:
+    """Idle keep-alive connections per (scheme, host, port). Checkout/return is guarded by a lock."""
+
+    def __init__(self, max_idle_per_host: int = MAX_IDLE_PER_HOST):
+        self._idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._max_idle = max_idle_per_host
+        self.opened = 0
+        self.reused = 0
+
+    def _new_connection(self, scheme: str, host: str, port: int, timeout: float) -> http.client.HTTPConnection:
+        proxy = urllib.request.getproxies().get(scheme)
+        if proxy and not urllib.request.proxy_bypass(host):
+            p = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = cls(p.hostname, p.port or 80, timeout=timeout)
+            conn.set_tunnel(host, port)
+        elif scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def _checkout(self, key: tuple[str, str, int]) -> http.client.HTTPConnection | None:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self.reused += 1
+                return idle.pop()
+        return None
+
+    def _checkin(self, key: tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def open(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> tuple[tuple[str, str, int], http.client.HTTPConnection, http.client.HTTPResponse]:
+        """Send a request over a pooled connection and return (pool key, connection, response) with the body unread."""
+        parts = urlsplit(url)
+        scheme = parts.scheme or "https"
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        key = (scheme, host, port)
+        conn = self._checkout(key)
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn = self._new_connection(scheme, host, port, timeout)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                return key, conn, conn.getresponse()
+            except _STALE_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                conn, reused = None, False
+            except BaseException:
+                conn.close()
+                raise
+
+    def release(self, key: tuple[str, str, int], conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+        """Return the connection to the pool if its response was read to the end and the server keeps it open."""
+        if resp.isclosed() and not resp.will_close:
+            self._checkin(key, conn)
+        else:
+            conn.close()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: bytes | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Send one request over a pooled connection. Returns (status, headers, body); the body is fully read."""
+        key, conn, resp = self.open(method, url, body=body, headers=headers, timeout=timeout)
+        try:
+            data = resp.read()
+        except BaseException:
+            conn.close()
+            raise
+        self.release(key, conn, resp)
+        return resp.status, {k.lower(): v for k, v in resp.getheaders()}, data
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+_POOL = ConnectionPool()
+
+
+def get_pool() -> ConnectionPool:
+    return _POOL
+
+
+class CircuitBreaker:
+    """
+    Process-wide breaker shared by all threads. closed -> open after `threshold` consecutive
+    failures; while open every caller sleeps until the cooldown ends, then one caller probes
+    (half-open) while the others keep waiting. Probe success closes it; probe failure re-opens
+    it with a doubled cooldown. Open for longer than max_open_s in total -> CircuitOpenError.
+    """
+
+    def __init__(
+        self,
+        threshold: int = CIRCUIT_THRESHOLD,
+        cooldown_s: float = CIRCUIT_COOLDOWN_S,
+        max_cooldown_s: float = CIRCUIT_MAX_COOLDOWN_S,
+        max_open_s: float = CIRCUIT_MAX_OPEN_S,
+    ):
+        self.threshold = threshold
+        self.base_cooldown_s = cooldown_s
+        self.max_cooldown_s = max_cooldown_s
+        self.max_open_s = max_open_s
+        self.state = "closed"
+        self.failures = 0
+        self._cooldown_s = cooldown_s
+        self._opened_at = 0.0
+        self._first_opened_at = 0.0
+        self._cond = threading.Condition()
+
+    def before_request(self) -> None:
+        """Block while the breaker is open (or another thread is probing); raise CircuitOpenError when giving up."""
+        with self._cond:
+            while True:
+                if self.state == "closed":
+                    return
+                now = time.monotonic()
+                if now - self._first_opened_at > self.max_open_s:
+                    raise CircuitOpenError(
+                        f"API circuit open for {now - self._first_opened_at:.0f}s "
+                        f"({self.failures} consecutive failures); giving up"
+                    )
+                if self.state == "open":
+                    remaining = self._opened_at + self._cooldown_s - now
+                    if remaining <= 0:
+                        self.state = "half_open"
+                        return  # this caller is the probe
+                    self._cond.wait(remaining)
+                else:  # half_open: a probe is in flight
+                    self._cond.wait(self.base_cooldown_s)
+
+    def record_success(self) -> None:
+        with self._cond:
+            if self.state != "closed":
+                print("  API circuit closed: endpoint is responding again")
+            self.state = "closed"
+            self.failures = 0
+            self._cooldown_s = self.base_cooldown_s
+            self._cond.notify_all()
+
+    def record_failure(self) -> None:
+        with self._cond:
+            self.failures += 1
+            now = time.monotonic()
+            if self.state == "half_open":
+                self._cooldown_s = min(self._cooldown_s * 2, self.max_cooldown_s)
+            elif self.state == "open" or self.failures < self.threshold:
+                return
+            else:
+                self._first_opened_at = now
+            self.state = "open"
+            self._opened_at = now
+            print(f"  API circuit open after {self.failures} consecutive failures; pausing all calls for {self._cooldown_s:.0f}s")
+            self._cond.notify_all()
+
+
+_BREAKER = CircuitBreaker()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    return _BREAKER
+
+
+def configure_retries(max_retries: int) -> None:
+    """Override the retry count for this process (e.g. from a --api-retries flag)."""
+    global MAX_RETRIES
+    MAX_RETRIES = max(0, max_retries)
+
+
+def retry_after_seconds(headers: dict[str, str]) -> float | None:
+    """Retry-After (delta-seconds or HTTP date) or retry-after-ms from response headers, in seconds."""
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return max(0.0, float(ms) / 1000.0)
+        except ValueError:
+            pass
+    value = (headers.get("retry-after") or "").strip()
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    """Full-jitter exponential backoff for retry `attempt` (0-based); Retry-After, when given, is the floor."""
+    delay = random.uniform(0, min(BACKOFF_CAP_S, BACKOFF_BASE_S * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, RETRY_AFTER_CAP_S))
+    return delay
+
+
+def _is_retryable(err: ApiError) -> bool:
+    """429/408/409/5xx are transient, except a 429 for an exhausted quota (retrying cannot help)."""
+    if err.status == 429 and "insufficient_quota" in err.body:
+        return False
+    return err.status in RETRYABLE_STATUS or err.status >= 500
+
+
+def _payload_text(payload: dict) -> list[str]:
+    """Prompt texts of a Responses or Chat Completions payload, for the token estimate."""
+    texts = [str(payload.get("instructions") or "")]
+    inp = payload.get("input")
+    texts.append(inp if isinstance(inp, str) else json.dumps(inp or ""))
+    for message in payload.get("messages") or []:
+        texts.append(str(message.get("content") or "") if isinstance(message, dict) else str(message))
+    return texts
+
+
+def _usage_tokens(out: dict) -> int | None:
+    usage = out.get("usage") if isinstance(out, dict) else None
+    if not isinstance(usage, dict):
+        return None
+    total = usage.get("total_tokens")
+    if total is None:
+        parts = [usage.get(k) for k in ("input_tokens", "output_tokens", "prompt_tokens", "completion_tokens")]
+        total = sum(p for p in parts if isinstance(p, int)) or None
+    return total if isinstance(total, int) else None
+
+
+def _failure_delay(err: Exception, attempt: int, retries: int, model: str | None) -> tuple[float, str]:
+    """
+    Book a failed attempt with the breaker (and the rate limiter on 429) and return (delay, reason)
+    before the next attempt. Re-raises err when it is not retryable or retries are exhausted.
+    """
+    if isinstance(err, ApiError):
+        if err.status >= 500:
+            _BREAKER.record_failure()
+        else:
+            # The endpoint answered (4xx incl. 429): it is up, whatever the request's fate
+            _BREAKER.record_success()
+        if err.status == 429 and model is not None:
+            api_rate_limit.penalize(model)
+        if not _is_retryable(err) or attempt >= retries:
+            raise err
+        return backoff_delay(attempt, retry_after_seconds(err.headers)), f"HTTP {err.status}"
+    _BREAKER.record_failure()
+    if attempt >= retries:
+        raise err
+    return backoff_delay(attempt), f"{type(err).__name__}: {err}"
+
+
+def _send(
+    method: str,
+    url: str,
+    body: bytes | None,
+    headers: dict[str, str],
+    *,
+    timeout: float,
+    retries: int,
+    model: str | None = None,
+    reserved: int = 0,
+) -> tuple[int, dict[str, str], bytes, float]:
+    """
+    One request with the retry policy and circuit breaker. model given: the call is metered by
+    the rate limiter (reserve before each attempt, drain on 429). Returns a < 400 response with
+    the seconds its attempt took (not counting rate-limit waits, backoff or failed attempts), or raises.
+    """
+    attempt = 0
+    while True:
+        _BREAKER.before_request()
+        if model is not None:
+            api_rate_limit.acquire(model, reserved)
+        attempt_started = time.monotonic()
+        try:
+            status, resp_headers, data = _POOL.request(method, url, body=body, headers=headers, timeout=timeout)
+            if status >= 400:
+                raise ApiError(status, data.decode("utf-8", errors="replace"), resp_headers)
+        except (ApiError, OSError, http.client.HTTPException) as e:
+            delay, reason = _failure_delay(e, attempt, retries, model)
+        else:
+            _BREAKER.record_success()
+            return status, resp_headers, data, time.monotonic() - attempt_started
+        attempt += 1
+        print(f"  API retry {attempt}/{retries} in {delay:.1f}s ({reason})")
+        time.sleep(delay)
+
+
+def _url(path: str, base_url: str | None) -> str:
+    return (base_url or default_base_url()).strip().rstrip("/") + path
+
+
+def post_json(
+    path: str,
+    payload: dict,
+    *,
+    api_key: str,
+    base_url: str | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_retries: int | None = None,
+) -> dict:
+    """
+    POST payload as JSON to {base_url}{path} through the shared pool, retrying transient failures
+    (or answer it from the response cache when enabled). Returns the decoded JSON; raises ApiError
+    (non-retryable or retries exhausted), the last network error, or CircuitOpenError.
+    """
+    key = api_cache.cache_key(path, payload) if api_cache.enabled() else None
+    if key:
+        cached = api_cache.get(key)
+        if cached is not None:
+            return cached
+    model = str(payload.get("model") or "")
+    reserved = api_rate_limit.estimate_tokens(
+        *_payload_text(payload),
+        output_tokens=payload.get("max_output_tokens") or payload.get("max_tokens"),
+    )
+    started = time.monotonic()
+    _status, _headers, data, latency = _send(
+        "POST",
+        _url(path, base_url),
+        json.dumps(payload).encode("utf-8"),
+        {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+        },
+        timeout=timeout,
+        retries=MAX_RETRIES if max_retries is None else max_retries,
+        model=model,
+        reserved=reserved,
+    )
+    out = json.loads(data.decode("utf-8"))
+    api_rate_limit.settle(model, reserved, _usage_tokens(out))
+    api_ledger.record(
+        model=model, usage=out.get("usage"), latency_s=latency, wall_s=time.monotonic() - started, endpoint=path
+    )
+    if key:
+        api_cache.put(key, out)
+    return out
+
+
+def get_bytes(path: str, *, api_key: str, base_url: str | None = None, timeout: float = DEFAULT_TIMEOUT) -> bytes:
+    """GET {base_url}{path} (with retries, not rate-limited). Returns the raw body."""
+    _status, _headers, data, _latency = _send(
+        "GET", _url(path, base_url), None, {"Authorization": f"Bearer {api_key}"},
+        timeout=timeout, retries=MAX_RETRIES,
+    )
+    return data
+
+
+def get_json(path: str, *, api_key: str, base_url: str | None = None, timeout: float = DEFAULT_TIMEOUT) -> dict:
+    return json.loads(get_bytes(path, api_key=api_key, base_url=base_url, timeout=timeout).decode("utf-8"))
+
+
+def upload_file(
+    filename: str,
+    content: bytes,
+    *,
+    purpose: str,
+    api_key: str,
+    base_url: str | None = None,
+    timeout: float = 600,
+) -> dict:
+    """POST multipart/form-data to {base_url}/v1/files (e.g. purpose="batch"). Returns the file object."""
+    boundary = "----flowtaro" + os.urandom(12).hex()
+    body = b"".join([
+        f'--{boundary}\r\nContent-Disposition: form-data; name="purpose"\r\n\r\n{purpose}\r\n'.encode("utf-8"),
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'.encode("utf-8"),
+        b"Content-Type: application/jsonl\r\n\r\n",
+        content,
+        f"\r\n--{boundary}--\r\n".encode("utf-8"),
+    ])
+    _status, _headers, data, _latency = _send(
+        "POST",
+        _url("/v1/files", base_url),
+        body,
+        {
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+            "Authorization": f"Bearer {api_key}",
+        },
+        timeout=timeout,
+        retries=MAX_RETRIES,
+    )
+    return json.loads(data.decode("utf-8"))
+
+
+def create_batch(
+    input_file_id: str,
+    *,
+    endpoint: str,
+    api_key: str,
+    base_url: str | None = None,
+    completion_window: str = "24h",
+    metadata: dict[str, str] | None = None,
+) -> dict:
+    """POST /v1/batches for an uploaded JSONL file (never cached or rate-limited). Returns the batch object."""
+    payload = {"input_file_id": input_file_id, "endpoint": endpoint, "completion_window": completion_window}
+    if metadata:
+        payload["metadata"] = metadata
+    _status, _headers, data, _latency = _send(
+        "POST",
+        _url("/v1/batches", base_url),
+        json.dumps(payload).encode("utf-8"),
+        {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+        },
+        timeout=DEFAULT_TIMEOUT,
+        retries=MAX_RETRIES,
+    )
+    return json.loads(data.decode("utf-8"))
+
+
+def retrieve_batch(batch_id: str, *, api_key: str, base_url: str | None = None) -> dict:
+    return get_json(f"/v1/batches/{batch_id}", api_key=api_key, base_url=base_url)
+
+
+def file_content(file_id: str, *, api_key: str, base_url: str | None = None) -> bytes:
+    return get_bytes(f"/v1/files/{file_id}/content", api_key=api_key, base_url=base_url, timeout=600)
+
+
+def extract_output_text(out: dict) -> str:
+    """Text of a Responses API result: output_text, else the first output_text part of a message item."""
+    if isinstance(out.get("output_text"), str) and out["output_text"].strip():
+        return out["output_text"].strip()
+    for item in out.get("output") or []:
+        if item.get("type") == "message" and "content" in item:
+            c = item["content"]
+            if isinstance(c, str):
+                return c.strip()
+            if isinstance(c, list):
+                for part in c:
+                    if isinstance(part, dict) and part.get("type") == "output_text":
+                        if part.get("text"):
+                            return part["text"].strip()
+    raise RuntimeError("No output text in API response")
+
+
+def responses_cache_key(instructions: str, user_message: str, *, model: str) -> str:
+    """api_cache key of a call_responses / stream_responses request (to discard a rejected answer from another thread)."""
+    return api_cache.cache_key("/v1/responses", {"model": model, "instructions": instructions, "input": user_message})
+
+
+def call_responses(
+    instructions: str,
+    user_message: str,
+    *,
+    model: str,
+    api_key: str,
+    base_url: str | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_retries: int | None = None,
+) -> str:
+    """POST to {base_url}/v1/responses (with retries). Return extracted text or raise."""
+    payload = {
+        "model": model,
+        "instructions": instructions,
+        "input": user_message,
+    }
+    out = post_json("/v1/responses", payload, api_key=api_key, base_url=base_url, timeout=timeout, max_retries=max_retries)
+    return extract_output_text(out)
+
+
+class StreamAbort(Exception):
+    """Raised by a stream_responses on_text callback to stop a generation early; args[0] is the reason."""
+
+
+def _sse_events(resp: http.client.HTTPResponse):
+    """Yield the decoded JSON data of each server-sent event until [DONE] or end of stream."""
+    data_lines: list[str] = []
+    while True:
+        raw = resp.readline()
+        if not raw:
+            break
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+            continue
+        if line or not data_lines:
+            continue  # event:/id:/comment lines, or blank line with nothing pending
+        data, data_lines = "\n".join(data_lines), []
+        if data == "[DONE]":
+            break
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+
+def stream_responses(
+    instructions: str,
+    user_message: str,
+    *,
+    model: str,
+    api_key: str,
+    base_url: str | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_retries: int | None = None,
+    on_text=None,
+) -> str:
+    """
+    Like call_responses, but with "stream": true: text deltas are read as server-sent events and
+    on_text(text_so_far, delta) is called for each. The callback may raise StreamAbort to stop the
+    generation (the connection is dropped, so no more output tokens are paid for); StreamAbort
+    propagates to the caller. Errors before or during the stream are retried like call_responses.
+    """
+    payload = {
+        "model": model,
+        "instructions": instructions,
+        "input": user_message,
+    }
+    # Same cache entry as call_responses (the key does not include "stream")
+    key = api_cache.cache_key("/v1/responses", payload) if api_cache.enabled() else None
+    if key:
+        cached = api_cache.get(key)
+        if cached is not None:
+            text = extract_output_text(cached)
+            if on_text:
+                on_text(text, text)
+            return text
+    url = _url("/v1/responses", base_url)
+    body = json.dumps({**payload, "stream": True}).encode("utf-8")
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+        "Authorization": f"Bearer {api_key}",
+    }
+    retries = MAX_RETRIES if max_retries is None else max_retries
+    reserved = api_rate_limit.estimate_tokens(instructions, user_message)
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        _BREAKER.before_request()
+        api_rate_limit.acquire(model, reserved)
+        attempt_started = time.monotonic()
+        text = ""
+        final: dict | None = None
+        conn = None
+        try:
+            pool_key, conn, resp = _POOL.open("POST", url, body=body, headers=headers, timeout=timeout)
+            if resp.status >= 400:
+                data = resp.read()
+                _POOL.release(pool_key, conn, resp)
+                conn = None
+                raise ApiError(resp.status, data.decode("utf-8", errors="replace"), {k.lower(): v for k, v in resp.getheaders()})
+            for event in _sse_events(resp):
+                etype = event.get("type") or ""
+                if etype == "response.output_text.delta":
+                    delta = event.get("delta") or ""
+                    text += delta
+                    if on_text:
+                        on_text(text, delta)
+                elif etype == "response.completed":
+                    final = event.get("response") or {}
+                elif etype in ("response.failed", "error"):
+                    detail = event.get("response", {}).get("error") if etype == "response.failed" else event
+                    raise ApiError(500, json.dumps(detail, ensure_ascii=False))
+            resp.read()
+            _POOL.release(pool_key, conn, resp)
+            conn = None
+        except StreamAbort:
+            _BREAKER.record_success()
+            prompt_tokens = (len(instructions) + len(user_message)) // 4
+            api_rate_limit.settle(model, reserved, prompt_tokens + len(text) // 4)
+            # No usage object for a dropped stream: book the estimate
+            api_ledger.record(
+                model=model, usage=None, latency_s=time.monotonic() - attempt_started,
+                wall_s=time.monotonic() - started, endpoint="/v1/responses",
+                estimate=(prompt_tokens, len(text) // 4), note="aborted",
+            )
+            raise
+        except (ApiError, OSError, http.client.HTTPException) as e:
+            delay, reason = _failure_delay(e, attempt, retries, model)
+        else:
+            _BREAKER.record_success()
+            api_rate_limit.settle(model, reserved, _usage_tokens(final or {}))
+            api_ledger.record(
+                model=model, usage=(final or {}).get("usage"), latency_s=time.monotonic() - attempt_started,
+                wall_s=time.monotonic() - started, endpoint="/v1/responses",
+                estimate=((len(instructions) + len(user_message)) // 4, len(text) // 4),
+            )
+            out = final if final and final.get("output") else {"output_text": text, "usage": (final or {}).get("usage")}
+            try:
+                result = extract_output_text(out)
+            except RuntimeError:
+                result = text.strip()
+            if key and result:
+                api_cache.put(key, out)
+            return result
+        finally:
+            if conn is not None:
+                conn.close()
+        attempt += 1
+        print(f"  API retry {attempt}/{retries} in {delay:.1f}s ({reason})")
+        time.sleep(delay)
+
+
+def call_chat_completions(
+    messages: list,
+    *,
+    model: str,
+    api_key: str,
+    base_url: str | None = None,
+    max_tokens: int = 4000,
+    temperature: float = 0.7,
+    timeout: float = DEFAULT_TIMEOUT,
+    max_retries: int | None = None,
+) -> str:
+    """POST to {base_url}/v1/chat/completions (with retries). Return the first choice's message content or raise."""
+    payload = {
+        "model": model,
+        "messages": messages,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+    }
+    out = post_json("/v1/chat/completions", payload, api_key=api_key, base_url=base_url, timeout=timeout, max_retries=max_retries)
+    return out["choices"][0]["message"]["content"]
@@ -10,6 +10,7 @@ Odświeżanie linków (update_affiliate_links) nie zależy od kolejki ani run_to
 Uruchamiane przed dialogiem edycji w monitorze; po edycji i „Kontynuuj” monitor zapisuje run_tools ponownie.
 """
 
+import argparse
 import json
 import os
 import sys
@@ -20,6 +21,7 @@ SCRIPTS_DIR = Path(__file__).resolve().parent
 if str(SCRIPTS_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPTS_DIR))
 
+import api_cache
 from content_index import load_config
 from content_root import get_content_root_path
 from fill_articles import _load_affiliate_tools, call_responses_api, save_run_tools
@@ -129,6 +131,9 @@ def _parse_api_response(text: str) -> dict | None:
 
 
 def main() -> int:
+    parser = argparse.ArgumentParser(description="Dobierz linki (run_tools.yaml) dla kolejki przez Responses API.")
+    api_cache.add_cache_arguments(parser)
+    api_cache.configure_from_args(parser.parse_args())
     content_root = (os.environ.get("CONTENT_ROOT") or "content").strip() or "content"
     content_dir = get_content_root_path(PROJECT_ROOT, content_root)
     queue_path = content_dir / "queue.yaml"
@@ -167,6 +172,7 @@ def main() -> int:
         return 1
     run_data = _parse_api_response(response_text)
     if not run_data:
+        api_cache.discard_last()
         print("Odpowiedź API nieprawidłowa lub brak oczekiwanego JSON (affiliate, other, inne). Zapisuję pusty zestaw.", file=sys.stderr)
         run_data = {"affiliate": [], "other": [], "inne": [], "article_built_around_links": False}
     run_data["article_built_around_links"] = False
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Publish: generate_hubs -> generate_sitemap -> generate_feeds -> render_site in one process.
+Config is loaded and the articles are scanned once (metadata index) and shared by all stages,
+instead of four subprocesses each re-parsing config and re-scanning content/articles/.
+Per-stage timings are printed and written to logs/last_run_publish.json. Stdlib only.
+The stage scripts keep their own CLIs; their main() is a thin wrapper over the same functions.
+
+  python scripts/publish.py
+  python scripts/publish.py --site pl            # content/pl -> public_pl
+  python scripts/publish.py --stages sitemap,render
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from content_index import load_config
+from content_root import get_content_root_path
+from generate_feeds import generate_feeds
+from generate_hubs import generate_hubs
+from generate_sitemap import generate_sitemap
+from metadata_index import get_indexed_articles
+from render_site import render
+from url_map import default_base_url, default_out_dir
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TIMINGS_PATH = PROJECT_ROOT / "logs" / "last_run_publish.json"
+STAGES = ("hubs", "sitemap", "feeds", "render")
+
+
+def publish(
+    site: str,
+    content_dir: Path,
+    out_dir: Path,
+    base_url: str,
+    stages: tuple[str, ...] = STAGES,
+    minify: bool = False,
+) -> dict[str, float]:
+    """Run the selected stages over one shared config + article scan. Returns {stage: seconds} (incl. "scan")."""
+    timings: dict[str, float] = {}
+    t0 = time.perf_counter()
+    config = load_config(content_dir / "config.yaml")
+    indexed = get_indexed_articles(content_dir / "articles")
+    all_articles = [(a["meta"], a["path"]) for a in indexed]
+    timings["scan"] = time.perf_counter() - t0
+    print(f"Publish (site={site}): {len(indexed)} production articles scanned in {timings['scan']:.2f}s")
+
+    for stage in STAGES:
+        if stage not in stages:
+            continue
+        print(f"--- {stage} ---")
+        t0 = time.perf_counter()
+        if stage == "hubs":
+            generate_hubs(site, content_dir, config=config, all_articles=all_articles)
+        elif stage == "sitemap":
+            generate_sitemap(site, content_dir, out_dir, base_url, config=config, indexed=indexed)
+        elif stage == "feeds":
+            generate_feeds(site, content_dir, out_dir, base_url, config=config, indexed=indexed)
+        elif stage == "render":
+            render(site, content_dir, out_dir, base_url, config=config, all_articles=all_articles, minify=minify)
+        timings[stage] = time.perf_counter() - t0
+    return timings
+
+
+def print_timings(timings: dict[str, float]) -> None:
+    total = sum(timings.values())
+    print("Publish timings:")
+    for stage, seconds in timings.items():
+        share = (100.0 * seconds / total) if total else 0.0
+        print(f"  {stage:<8} {seconds:8.3f}s  {share:5.1f}%")
+    print(f"  {'total':<8} {total:8.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run hubs, sitemap, feeds and render in one process over one article scan.")
+    parser.add_argument("--content-root", default=os.environ.get("CONTENT_ROOT"), help="Content root (default: content/pl for --site pl, else content)")
+    parser.add_argument("--site", default=os.environ.get("SITE", "main"), choices=("main", "pl"), help="Site variant")
+    parser.add_argument(
+        "--out-dir",
+        default=os.environ.get("OUTPUT_DIR") or os.environ.get("OUT_DIR"),
+        help="Output directory (default: public_pl for pl, else public). Env: OUTPUT_DIR or OUT_DIR, as in render_site.py.",
+    )
+    parser.add_argument("--base-url", default=os.environ.get("BASE_URL"), help="Base URL (default: pl.flowtaro.com for pl, flowtaro.com for main)")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated subset of {','.join(STAGES)} (default: all)")
+    parser.add_argument("--minify", action="store_true", help="Pass --minify to the render stage")
+    args = parser.parse_args()
+
+    site = args.site
+    stages = tuple(s.strip() for s in args.stages.split(",") if s.strip())
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    content_dir = get_content_root_path(PROJECT_ROOT, args.content_root or ("content/pl" if site == "pl" else "content"))
+    out_dir = Path(args.out_dir) if args.out_dir else default_out_dir(site)
+    if not out_dir.is_absolute():
+        out_dir = PROJECT_ROOT / out_dir
+    base_url = (args.base_url or default_base_url(site)).strip().rstrip("/")
+
+    started = time.perf_counter()
+    timings = publish(site, content_dir, out_dir, base_url, stages=stages, minify=args.minify)
+    print_timings(timings)
+    try:
+        TIMINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
+        TIMINGS_PATH.write_text(
+            json.dumps({
+                "finished_at": datetime.now().isoformat(timespec="seconds"),
+                "site": site,
+                "wall_s": round(time.perf_counter() - started, 4),
+                "stages_s": {k: round(v, 4) for k, v in timings.items()},
+            }, indent=2),
+            encoding="utf-8",
+        )
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    main()
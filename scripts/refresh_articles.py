@@ -13,9 +13,12 @@ import re
 import shutil
 import subprocess
 import sys
+import tempfile
 from datetime import date, datetime
 from pathlib import Path
 
+from run_journal import RunJournal
+
 _SCRIPTS_DIR = Path(__file__).resolve().parent
 _PROJECT_ROOT = _SCRIPTS_DIR.parent
 _content_root = (os.environ.get("CONTENT_ROOT") or "content").strip() or "content"
@@ -26,6 +29,8 @@ ERROR_LOG = _PROJECT_ROOT / "logs" / "errors.log"
 FAILED_LIST_PATH = _PROJECT_ROOT / "logs" / "last_refresh_failed.txt"
 
 _PROMPT2_PLACEHOLDER_RE = re.compile(r'PROMPT2_PLACEHOLDER')
+# --prompt2-only passes allowed to run in the background at once; the oldest is waited for before another starts
+PROMPT2_MAX_PENDING = 3
 
 
 def _get_recent_errors_for_slug(stem: str, max_lines: int = 3) -> list[str]:
@@ -189,6 +194,25 @@ def find_articles_in_date_range(
     return paths
 
 
+def _collect_prompt2(pending: list, journal: RunJournal) -> bool:
+    """
+    Wait for the oldest background --prompt2-only pass, print its captured output and journal the
+    outcome. It leaves pending only once finished, so an interrupted wait still gets it cleaned up.
+    """
+    path, proc, out = pending[0]
+    returncode = proc.wait()
+    pending.pop(0)
+    out.seek(0)
+    sys.stdout.write(out.read())
+    out.close()
+    if returncode == 0:
+        print(f"  Prompt #2 filled: {path.name}")
+    else:
+        print(f"  Prompt #2 fill failed: {path.name} (exit code {returncode})")
+    journal.event(path.stem, "prompt2", status="filled" if returncode == 0 else "failed", exit_code=returncode)
+    return returncode == 0
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Refresh articles older than N days by re-filling with AI and updating last_updated.",
@@ -215,7 +239,7 @@ def main() -> None:
     parser.add_argument(
         "--no-render",
         action="store_true",
-        help="Skip running generate_hubs, generate_sitemap, and render_site after refresh.",
+        help="Skip running generate_hubs, generate_sitemap, generate_feeds, and render_site after refresh.",
     )
     parser.add_argument(
         "--limit",
@@ -239,6 +263,11 @@ def main() -> None:
         action="store_true",
         help="Force AI to re-select tools even if already assigned (passed to fill_articles.py).",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream responses and abort doomed generations early (passed to fill_articles.py).",
+    )
     parser.add_argument(
         "--quality_retries",
         type=int,
@@ -271,7 +300,23 @@ def main() -> None:
         default=None,
         help="Refresh articles with last_updated on or before this date. Use with --from-date.",
     )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        default=None,
+        help=(
+            "Resume an interrupted refresh from its journal (logs/runs/RUN_ID.jsonl) with the same arguments: "
+            "articles already refreshed are skipped, an article whose response had already arrived reuses it."
+        ),
+    )
     args = parser.parse_args()
+    if args.resume:
+        # Repeat the interrupted run's arguments; flags given now come after them and take precedence
+        saved_argv = RunJournal(args.resume).run_argv("refresh_articles")
+        if saved_argv is None:
+            print(f"Error: no refresh_articles run {args.resume!r} in logs/runs.")
+            sys.exit(1)
+        args = parser.parse_args(saved_argv + sys.argv[1:])
 
     if not ARTICLES_DIR.exists():
         print("Error: Articles directory not found.")
@@ -365,7 +410,9 @@ def main() -> None:
         print(f"Error: {gen_articles_script} not found (required for --re-skeleton).")
         sys.exit(1)
 
-    prompt2_pending: list[Path] = []  # articles that need --prompt2-only after refresh
+    # --prompt2-only passes for articles left with the placeholder; they run in the background while
+    # the next articles refresh: (path, process, captured output)
+    prompt2_pending: list[tuple[Path, subprocess.Popen, object]] = []
     failed_stems: list[str] = []  # for logs/last_refresh_failed.txt (Option A)
 
     # R4: clear failure-reasons file so this run's fill_articles can append
@@ -376,112 +423,145 @@ def main() -> None:
     except OSError:
         pass
 
-    print(f"FLOWTARO_PROGRESS_TOTAL: {len(to_refresh)}")
+    journal = RunJournal(args.resume)
+    finished = [p for p in to_refresh if journal.finished(p.stem, "refresh_articles")]
+    if finished:
+        print(f"Resume: {len(finished)} article(s) already finished in run {journal.run_id}; skipping them.")
+        to_refresh = [p for p in to_refresh if p not in finished]
+    journal.start(sys.argv[1:])
     for path in to_refresh:
-        stem = path.stem
-        if args.re_skeleton:
-            r_sk = subprocess.run(
-                [sys.executable, str(gen_articles_script), "--re-skeleton", str(path)],
-                cwd=str(_PROJECT_ROOT),
-            )
-            if r_sk.returncode != 0:
-                print(f"  Re-skeleton failed: {path.name} (exit code {r_sk.returncode})")
-                failed += 1
-                failed_stems.append(stem)
-                print(f"FLOWTARO_PROGRESS: {refreshed + failed}")
-                continue
-        cmd = [
-            sys.executable,
-            str(fill_script),
-            "--write",
-            "--force",
-            "--html",
-            "--slug_contains", stem,
-            "--limit", "1",
-            "--quality_gate",
-            "--quality_retries", str(args.quality_retries),
-            "--min-words-override", "500",
-        ]
-        if args.block_on_fail:
-            cmd.append("--block_on_fail")
-        if args.remap:
-            cmd.append("--remap")
-        result = subprocess.run(cmd, cwd=str(_PROJECT_ROOT))
-        if result.returncode != 0:
-            print(f"  Refresh failed: {path.name} (exit code {result.returncode})")
-            recent = _get_recent_errors_for_slug(stem, max_lines=3)
-            if recent:
-                for line in recent:
-                    # Avoid UnicodeEncodeError on Windows console (cp1250)
-                    safe = line.encode("ascii", "replace").decode("ascii")
-                    print(f"    errors.log: {safe}")
-            elif result.returncode == 2:
-                print(f"    (Exit 2 = QA/quality/API failure; check logs/errors.log or run fill_articles.py with --slug_contains {stem!r} to see details.)")
-            failed += 1
-            failed_stems.append(stem)
-            print(f"FLOWTARO_PROGRESS: {refreshed + failed}")
-            continue
-        html_path = path.with_suffix(".html")
-        if not html_path.exists():
-            print(f"  Refresh failed: {path.name} (fill completed but .html not produced - likely QA failure)")
-            for line in _get_recent_errors_for_slug(stem, max_lines=3):
-                safe = line.encode("ascii", "replace").decode("ascii")
-                print(f"    errors.log: {safe}")
-            failed += 1
-            failed_stems.append(stem)
-            print(f"FLOWTARO_PROGRESS: {refreshed + failed}")
-            continue
-        if _update_last_updated_in_file(path, today):
-            print(f"  Refreshed and updated last_updated: {path.name}")
-        else:
-            print(f"  Refreshed (last_updated unchanged): {path.name}")
-        refreshed += 1
-        print(f"FLOWTARO_PROGRESS: {refreshed + failed}")
+        journal.event(path.stem, "queued")
+    print(f"Run journal: {journal.path.relative_to(_PROJECT_ROOT)} (if interrupted: --resume {journal.run_id})")
 
-        # Check if Prompt #2 placeholder remains — schedule --prompt2-only pass
-        try:
-            html_text = html_path.read_text(encoding="utf-8")
-            if _PROMPT2_PLACEHOLDER_RE.search(html_text):
-                prompt2_pending.append(path)
-                print(f"  Note: [PROMPT2_PLACEHOLDER] detected in {html_path.name} - will run --prompt2-only")
-        except OSError:
-            pass
-
-    # --- Prompt #2 fill pass for articles that still have placeholder ---
-    if prompt2_pending:
-        print(f"\nRunning --prompt2-only for {len(prompt2_pending)} article(s)...")
-        p2_filled = 0
-        p2_failed = 0
-        for path in prompt2_pending:
+    p2_filled = 0
+    p2_failed = 0
+    try:
+        print(f"FLOWTARO_PROGRESS_TOTAL: {len(to_refresh)}")
+        for path in to_refresh:
             stem = path.stem
-            cmd_p2 = [
+            if args.re_skeleton:
+                r_sk = subprocess.run(
+                    [sys.executable, str(gen_articles_script), "--re-skeleton", str(path)],
+                    cwd=str(_PROJECT_ROOT),
+                )
+                if r_sk.returncode != 0:
+                    print(f"  Re-skeleton failed: {path.name} (exit code {r_sk.returncode})")
+                    journal.event(stem, "done", status="skip")
+                    failed += 1
+                    failed_stems.append(stem)
+                    print(f"FLOWTARO_PROGRESS: {refreshed + failed}")
+                    continue
+            cmd = [
                 sys.executable,
                 str(fill_script),
                 "--write",
-                "--prompt2-only",
+                "--force",
+                "--html",
                 "--slug_contains", stem,
                 "--limit", "1",
+                "--quality_gate",
+                "--quality_retries", str(args.quality_retries),
+                "--min-words-override", "500",
+                "--journal", journal.run_id,
             ]
-            r2 = subprocess.run(cmd_p2, cwd=str(_PROJECT_ROOT))
-            if r2.returncode == 0:
-                print(f"  Prompt #2 filled: {path.name}")
+            if args.block_on_fail:
+                cmd.append("--block_on_fail")
+            if args.remap:
+                cmd.append("--remap")
+            if args.stream:
+                cmd.append("--stream")
+            result = subprocess.run(cmd, cwd=str(_PROJECT_ROOT))
+            if result.returncode != 0:
+                print(f"  Refresh failed: {path.name} (exit code {result.returncode})")
+                recent = _get_recent_errors_for_slug(stem, max_lines=3)
+                if recent:
+                    for line in recent:
+                        # Avoid UnicodeEncodeError on Windows console (cp1250)
+                        safe = line.encode("ascii", "replace").decode("ascii")
+                        print(f"    errors.log: {safe}")
+                elif result.returncode == 2:
+                    print(f"    (Exit 2 = QA/quality/API failure; check logs/errors.log or run fill_articles.py with --slug_contains {stem!r} to see details.)")
+                # A QA / quality gate failure is final; an API failure or a crash is retried on --resume
+                fill_status = RunJournal(journal.run_id).finished(stem, "fill_articles")
+                journal.event(stem, "done", status="failed" if fill_status else "skip")
+                failed += 1
+                failed_stems.append(stem)
+                print(f"FLOWTARO_PROGRESS: {refreshed + failed}")
+                continue
+            html_path = path.with_suffix(".html")
+            if not html_path.exists():
+                print(f"  Refresh failed: {path.name} (fill completed but .html not produced - likely QA failure)")
+                for line in _get_recent_errors_for_slug(stem, max_lines=3):
+                    safe = line.encode("ascii", "replace").decode("ascii")
+                    print(f"    errors.log: {safe}")
+                journal.event(stem, "done", status="failed")
+                failed += 1
+                failed_stems.append(stem)
+                print(f"FLOWTARO_PROGRESS: {refreshed + failed}")
+                continue
+            if _update_last_updated_in_file(path, today):
+                print(f"  Refreshed and updated last_updated: {path.name}")
+            else:
+                print(f"  Refreshed (last_updated unchanged): {path.name}")
+            journal.event(stem, "done", status="refreshed")
+            refreshed += 1
+            print(f"FLOWTARO_PROGRESS: {refreshed + failed}")
+
+            # Check if Prompt #2 placeholder remains — start a --prompt2-only pass now, alongside the next article
+            try:
+                html_text = html_path.read_text(encoding="utf-8")
+                if _PROMPT2_PLACEHOLDER_RE.search(html_text):
+                    print(f"  Note: [PROMPT2_PLACEHOLDER] detected in {html_path.name} - running --prompt2-only in the background")
+                    cmd_p2 = [
+                        sys.executable,
+                        str(fill_script),
+                        "--write",
+                        "--prompt2-only",
+                        "--slug_contains", stem,
+                        "--limit", "1",
+                    ]
+                    while len(prompt2_pending) >= PROMPT2_MAX_PENDING:
+                        if _collect_prompt2(prompt2_pending, journal):
+                            p2_filled += 1
+                        else:
+                            p2_failed += 1
+                    # Output goes to a temp file (not a pipe nobody reads) and is printed when the pass is collected
+                    out = tempfile.TemporaryFile(mode="w+", encoding="utf-8", errors="replace")
+                    proc = subprocess.Popen(cmd_p2, cwd=str(_PROJECT_ROOT), stdout=out, stderr=subprocess.STDOUT)
+                    prompt2_pending.append((path, proc, out))
+            except OSError:
+                pass
+
+        # --- Prompt #2 fill passes for articles that still had the placeholder ---
+        if prompt2_pending:
+            print(f"\nWaiting for --prompt2-only on {len(prompt2_pending)} article(s)...")
+        while prompt2_pending:
+            if _collect_prompt2(prompt2_pending, journal):
                 p2_filled += 1
             else:
-                print(f"  Prompt #2 fill failed: {path.name} (exit code {r2.returncode})")
                 p2_failed += 1
-        print(f"  Prompt #2 pass: filled={p2_filled}, failed={p2_failed}")
+        if p2_filled or p2_failed:
+            print(f"  Prompt #2 pass: filled={p2_filled}, failed={p2_failed}")
+    finally:
+        # Interrupted (monitor cancel, crash, Ctrl+C): do not leave passes writing .html files behind
+        for path, proc, out in prompt2_pending:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+            out.close()
+            journal.event(path.stem, "prompt2", status="cancelled")
 
     if not args.no_render:
-        for name in ("generate_hubs.py", "generate_sitemap.py", "render_site.py"):
-            script = _SCRIPTS_DIR / name
-            if not script.exists():
-                print(f"Warning: {name} not found, skipping.")
-                continue
-            r = subprocess.run([sys.executable, str(script)], cwd=str(_PROJECT_ROOT))
-            if r.returncode != 0:
-                print(f"Warning: {name} exited with code {r.returncode}.")
-            else:
-                print(f"Ran {name}.")
+        # publish.py runs hubs, sitemap, feeds and render in one process over one article scan
+        script = _SCRIPTS_DIR / "publish.py"
+        r = subprocess.run([sys.executable, str(script)], cwd=str(_PROJECT_ROOT))
+        if r.returncode != 0:
+            print(f"Warning: publish.py exited with code {r.returncode}.")
+        else:
+            print("Ran publish.py.")
 
     total_md = len(list(ARTICLES_DIR.glob("*.md")))
     skipped_up_to_date = total_md - len(to_refresh)
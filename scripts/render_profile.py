@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing for render_site.py --profile. Stdlib only.
+Collects wall-clock time per (article, stage) and per site step (hubs, index, privacy),
+then writes a JSON report with totals, percentiles and the slowest articles.
+"""
+
+import json
+import math
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+# Article stages in pipeline order (report keeps this order)
+ARTICLE_STAGES = (
+    "parse",
+    "md_to_html",
+    "enhance",
+    "tool_linking",
+    "pl_descriptions",
+    "sanitize",
+    "read_next",
+    "template_fill",
+    "write",
+)
+SLOWEST_ARTICLES_LIMIT = 20
+_PERCENTILES = (50, 90, 95, 99)
+
+
+def _percentile(sorted_values: list[float], pct: int) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 for empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+class RenderProfiler:
+    """Accumulates stage timings. Article stages are keyed by slug; site steps (hub, index, privacy) by name."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.articles: dict[str, dict[str, float]] = {}
+        self.steps: dict[str, float] = {}
+
+    @contextmanager
+    def article_stage(self, slug: str, stage: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            stages = self.articles.setdefault(slug, {})
+            stages[stage] = stages.get(stage, 0.0) + (time.perf_counter() - t0)
+
+    @contextmanager
+    def step(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = self.steps.get(name, 0.0) + (time.perf_counter() - t0)
+
+    def report(self, site: str = "main") -> dict:
+        """Build the JSON-serialisable report dict."""
+        stage_names = list(ARTICLE_STAGES) + sorted(
+            {s for st in self.articles.values() for s in st} - set(ARTICLE_STAGES)
+        )
+        stages_out: dict[str, dict] = {}
+        for stage in stage_names:
+            values = sorted(st[stage] for st in self.articles.values() if stage in st)
+            if not values:
+                continue
+            entry = {
+                "count": len(values),
+                "total_s": round(sum(values), 4),
+                "mean_ms": _ms(sum(values) / len(values)),
+                "max_ms": _ms(values[-1]),
+            }
+            for pct in _PERCENTILES:
+                entry[f"p{pct}_ms"] = _ms(_percentile(values, pct))
+            stages_out[stage] = entry
+        per_article_totals = sorted(
+            ((sum(st.values()), slug, st) for slug, st in self.articles.items()),
+            key=lambda x: x[0],
+            reverse=True,
+        )
+        slowest = []
+        for total, slug, st in per_article_totals[:SLOWEST_ARTICLES_LIMIT]:
+            dominant = max(st.items(), key=lambda kv: kv[1]) if st else ("", 0.0)
+            slowest.append({
+                "slug": slug,
+                "total_ms": _ms(total),
+                "dominant_stage": dominant[0],
+                "dominant_ms": _ms(dominant[1]),
+                "dominant_share": round(dominant[1] / total, 3) if total else 0.0,
+                "stages_ms": {k: _ms(v) for k, v in st.items()},
+            })
+        article_totals = sorted(t for t, _s, _st in per_article_totals)
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "site": site,
+            "wall_s": round(time.perf_counter() - self.started, 4),
+            "articles": {
+                "count": len(self.articles),
+                "total_s": round(sum(article_totals), 4),
+                **{f"p{pct}_ms": _ms(_percentile(article_totals, pct)) for pct in _PERCENTILES},
+            },
+            "stages": stages_out,
+            "steps_s": {k: round(v, 4) for k, v in self.steps.items()},
+            "slowest_articles": slowest,
+        }
+
+    def write_report(self, path: Path, site: str = "main") -> dict:
+        """Write the report as JSON to path and print a short summary. Returns the report dict."""
+        data = self.report(site)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Profile: {data['articles']['count']} articles, wall {data['wall_s']:.2f}s -> {path}")
+        for stage, entry in data["stages"].items():
+            print(f"  {stage:<16} total {entry['total_s']:8.3f}s  p50 {entry['p50_ms']:8.2f}ms  p95 {entry['p95_ms']:8.2f}ms")
+        for name, seconds in data["steps_s"].items():
+            print(f"  [{name}] {seconds:.3f}s")
+        return data
+
+
+def article_stage(profiler: RenderProfiler | None, slug: str, stage: str):
+    """Context manager timing one article stage; no-op when profiling is off."""
+    return profiler.article_stage(slug, stage) if profiler is not None else nullcontext()
+
+
+def step(profiler: RenderProfiler | None, name: str):
+    """Context manager timing one site step (hub, index, privacy); no-op when profiling is off."""
+    return profiler.step(name) if profiler is not None else nullcontext()
@@ -8,6 +8,7 @@ Supports --site (main | pl), --out-dir, --base-url for subdomain build (e.g. pl.
 import argparse
 import hashlib
 import html
+import importlib.util
 import json
 import math
 import os
@@ -18,9 +19,6 @@ from datetime import date, datetime
 from html.parser import HTMLParser
 from pathlib import Path
 
-# Windows path length limit (MAX_PATH 260); keep under to avoid FileNotFoundError 206
-MAX_PATH_LEN = 250
-
 from content_index import (
     get_production_articles,
     get_hubs_list_for_site,
@@ -28,6 +26,10 @@ from content_index import (
     load_config,
 )
 from content_root import get_content_root_path
+from html_minify import minify_html, print_minify_report
+from render_profile import RenderProfiler, article_stage, step
+from search_index import headings_from_html, lead_from_html, print_search_report, search_content_html, write_search_index
+from url_map import build_url_map, fs_slugs, save_url_map
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 PUBLIC_DIR = PROJECT_ROOT / "public"
@@ -36,14 +38,11 @@ AFFILIATE_TOOLS_PATH = PROJECT_ROOT / "content" / "affiliate_tools.yaml"
 INDEX_TEMPLATE_PATH = PROJECT_ROOT / "templates" / "index.html"
 HUB_TEMPLATE_PATH = PROJECT_ROOT / "templates" / "hub.html"
 ARTICLE_TEMPLATE_PATH = PROJECT_ROOT / "templates" / "article.html"
+SEARCH_TEMPLATE_PATH = PROJECT_ROOT / "templates" / "search.html"
 PRIVACY_MD_PATH = PROJECT_ROOT / "Privacy Policy.md"
 PRIVACY_DOCX_PATH = PROJECT_ROOT / "privacy.docx"
-
-try:
-    from docx import Document as DocxDocument
-    _DOCX_AVAILABLE = True
-except ImportError:
-    _DOCX_AVAILABLE = False
+# Converted privacy.docx HTML keyed by the docx content hash (python-docx is only imported on a cache miss)
+PRIVACY_CACHE_PATH = PROJECT_ROOT / "logs" / "privacy_docx_cache.json"
 
 INLINE_LINK = re.compile(r"\[([^\]]*)\]\(([^)]*)\)")
 # Internal article link: [text](/articles/slug/) or [text](/articles/slug) or [text](/articles/slug#anchor)
@@ -71,19 +70,6 @@ def _strip_content_type_prefix_from_title(title: str) -> str:
     return t
 
 
-def _slug_for_path(slug: str, out_dir: Path) -> str:
-    """Return a filesystem-safe slug: same as slug if path fits in MAX_PATH_LEN, else shortened with hash suffix."""
-    candidate = (out_dir / "articles" / slug / "index.html").resolve()
-    if len(str(candidate)) <= MAX_PATH_LEN:
-        return slug
-    # Keep start of slug (date + start of title) and add short hash to keep unique and under limit
-    prefix_len = min(80, len(slug))
-    prefix = slug[:prefix_len].rstrip("-")
-    digest = hashlib.md5(slug.encode("utf-8")).hexdigest()[:12]
-    short = f"{prefix}-{digest}"
-    return short
-
-
 def _article_body_has_html_issues(body: str) -> bool:
     """True if article body has <pre> imbalance or orphan </ol>/</ul> in Try it yourself section."""
     if "<pre" not in body:
@@ -400,6 +386,20 @@ def _escape(s: str) -> str:
     return html.escape(s, quote=True)
 
 
+def _write_html_page(
+    html_path: Path,
+    content: str,
+    out_dir: Path,
+    minify_stats: list[tuple[str, int, int]] | None = None,
+) -> None:
+    """Write a rendered page. When minify_stats is a list, minify first and append (label, bytes_before, bytes_after)."""
+    if minify_stats is not None:
+        before = len(content.encode("utf-8"))
+        content = minify_html(content)
+        minify_stats.append((str(html_path.relative_to(out_dir)), before, len(content.encode("utf-8"))))
+    html_path.write_text(content, encoding="utf-8")
+
+
 def _build_nav_html(
     hubs: list[dict],
     site: str = "main",
@@ -959,10 +959,17 @@ def _md_to_html(
     return body_html
 
 
+def _docx_available() -> bool:
+    """True if python-docx is installed (checked without importing it)."""
+    return importlib.util.find_spec("docx") is not None
+
+
 def _docx_to_html(path: Path) -> str:
-    """Convert .docx paragraphs to HTML (h1/h2/h3/p). Requires python-docx."""
-    if not _DOCX_AVAILABLE:
+    """Convert .docx paragraphs to HTML (h1/h2/h3/p). Requires python-docx (imported lazily)."""
+    if not _docx_available():
         return ""
+    from docx import Document as DocxDocument
+
     doc = DocxDocument(path)
     out: list[str] = []
     for para in doc.paragraphs:
@@ -982,6 +989,32 @@ def _docx_to_html(path: Path) -> str:
     return "\n".join(out)
 
 
+def _privacy_html_from_docx(path: Path, cache_path: Path = PRIVACY_CACHE_PATH) -> str | None:
+    """
+    Return privacy HTML converted from path, reusing cache_path when the docx content hash is unchanged.
+    Returns None when the docx cannot be read, or python-docx is missing and there is no cached conversion.
+    """
+    try:
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if isinstance(cached, dict) and cached.get("sha256") == digest and isinstance(cached.get("html"), str):
+            return cached["html"]
+    except (OSError, json.JSONDecodeError):
+        pass
+    if not _docx_available():
+        return None
+    privacy_html = _docx_to_html(path)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps({"sha256": digest, "html": privacy_html}, ensure_ascii=False), encoding="utf-8")
+    except OSError:
+        pass
+    return privacy_html
+
+
 def _footer_html() -> str:
     return (
         '<footer class="text-center">\n'
@@ -1097,10 +1130,15 @@ def _render_article(
     articles_dir: Path | None = None,
     config_path: Path | None = None,
     lang_switcher_html: str = "",
+    minify_stats: list[tuple[str, int, int]] | None = None,
+    profiler: RenderProfiler | None = None,
+    search_docs: list[dict] | None = None,
 ) -> None:
+    key = path.stem  # profiler key (slug is only known after parsing)
     is_html = path.suffix.lower() == ".html"
     if is_html:
-        parsed = _parse_html_article(path)
+        with article_stage(profiler, key, "parse"):
+            parsed = _parse_html_article(path)
         if not parsed:
             print(f"  Skip {path.name}: invalid HTML frontmatter")
             return
@@ -1111,31 +1149,37 @@ def _render_article(
         words = _word_count_html(body_html)
         reading_min = _reading_time_min(words)
     else:
-        meta, body = _parse_md_file(path)
+        with article_stage(profiler, key, "parse"):
+            meta, body = _parse_md_file(path)
         slug = meta.get("slug") or path.stem
         title = (meta.get("title") or slug).strip()
         updated_iso = _updated_date_iso(meta, path)
-        body_html = _md_to_html(body, existing_slugs, slug_to_fs, page_lang=page_lang)
-        body_html = enhance_article(body_html)
-        tool_list = _load_affiliate_tools(AFFILIATE_TOOLS_PATH)
-        body_html = replace_tool_names_with_links(body_html, tool_list)
+        with article_stage(profiler, key, "md_to_html"):
+            body_html = _md_to_html(body, existing_slugs, slug_to_fs, page_lang=page_lang)
+        with article_stage(profiler, key, "enhance"):
+            body_html = enhance_article(body_html)
+        with article_stage(profiler, key, "tool_linking"):
+            tool_list = _load_affiliate_tools(AFFILIATE_TOOLS_PATH)
+            body_html = replace_tool_names_with_links(body_html, tool_list)
         words = _word_count_md(body)
         reading_min = _reading_time_min(words)
 
     if (page_lang or "").strip().lower() == "pl":
-        body_html = _replace_tools_section_descriptions_with_pl(body_html, AFFILIATE_TOOLS_PATH)
-
-    # Last-line defense: fix Try it yourself <pre> closing and orphan list tags if inconsistencies detected
-    if _article_body_has_html_issues(body_html):
-        body_html = _sanitize_article_html_body(body_html)
-    # Remove any Disclosure section from body; the script adds it in a yellow box at the end.
-    body_html = _strip_disclosure_from_html(body_html)
-    # Remove leading <h1> from body so we show one title from frontmatter above meta (avoids duplicate for .md)
-    body_html = _strip_leading_h1(body_html)
-    # Insert Prompt Generator CTA block above "When NOT to use this" when that section exists
-    body_html = _inject_prompt_generator_cta(body_html)
-    # Normalize body tag classes so EN and PL (and any AI output) render identically
-    body_html = _normalize_article_body_styles(body_html)
+        with article_stage(profiler, key, "pl_descriptions"):
+            body_html = _replace_tools_section_descriptions_with_pl(body_html, AFFILIATE_TOOLS_PATH)
+
+    with article_stage(profiler, key, "sanitize"):
+        # Last-line defense: fix Try it yourself <pre> closing and orphan list tags if inconsistencies detected
+        if _article_body_has_html_issues(body_html):
+            body_html = _sanitize_article_html_body(body_html)
+        # Remove any Disclosure section from body; the script adds it in a yellow box at the end.
+        body_html = _strip_disclosure_from_html(body_html)
+        # Remove leading <h1> from body so we show one title from frontmatter above meta (avoids duplicate for .md)
+        body_html = _strip_leading_h1(body_html)
+        # Insert Prompt Generator CTA block above "When NOT to use this" when that section exists
+        body_html = _inject_prompt_generator_cta(body_html)
+        # Normalize body tag classes so EN and PL (and any AI output) render identically
+        body_html = _normalize_article_body_styles(body_html)
 
     slug_fs = (slug_to_fs or {}).get(slug, slug)
     html_path = out_dir / "articles" / slug_fs / "index.html"
@@ -1158,22 +1202,23 @@ def _render_article(
     read_next_html = ""
     _articles_dir = articles_dir or (PROJECT_ROOT / "content" / "articles")
     _config_path = config_path or (PROJECT_ROOT / "content" / "config.yaml")
-    try:
-        all_articles = get_production_articles(_articles_dir, _config_path)
-        other_articles = [a for a in all_articles if (a[0].get("slug") or a[1].stem) != slug]
-        selected = random.sample(other_articles, min(3, len(other_articles)))
-        if selected:
-            read_next_html = '<section class="bg-gray-50 p-6 rounded-lg mt-8">'
-            read_next_html += f'<h3 class="font-bold text-gray-900 mb-3">{_escape(loc["read_next_heading"])}</h3>'
-            read_next_html += '<ul class="space-y-2">'
-            for art_meta, art_path in selected:
-                art_title = _escape(art_meta.get("title") or "Untitled")
-                art_slug = art_meta.get("slug") or art_path.stem
-                article_slug = _escape((slug_to_fs or {}).get(art_slug, art_slug))
-                read_next_html += f'<li><a href="/articles/{article_slug}/" class="text-indigo-600 hover:text-indigo-800 hover:underline transition-colors">{art_title}</a></li>'
-            read_next_html += "</ul></section>"
-    except Exception as e:
-        print(f"Warning: Could not generate Read Next section: {e}")
+    with article_stage(profiler, key, "read_next"):
+        try:
+            all_articles = site_articles if site_articles is not None else get_production_articles(_articles_dir, _config_path)
+            other_articles = [a for a in all_articles if (a[0].get("slug") or a[1].stem) != slug]
+            selected = random.sample(other_articles, min(3, len(other_articles)))
+            if selected:
+                read_next_html = '<section class="bg-gray-50 p-6 rounded-lg mt-8">'
+                read_next_html += f'<h3 class="font-bold text-gray-900 mb-3">{_escape(loc["read_next_heading"])}</h3>'
+                read_next_html += '<ul class="space-y-2">'
+                for art_meta, art_path in selected:
+                    art_title = _escape(art_meta.get("title") or "Untitled")
+                    art_slug = art_meta.get("slug") or art_path.stem
+                    article_slug = _escape((slug_to_fs or {}).get(art_slug, art_slug))
+                    read_next_html += f'<li><a href="/articles/{article_slug}/" class="text-indigo-600 hover:text-indigo-800 hover:underline transition-colors">{art_title}</a></li>'
+                read_next_html += "</ul></section>"
+        except Exception as e:
+            print(f"Warning: Could not generate Read Next section: {e}")
 
     full_body_html += read_next_html
 
@@ -1187,25 +1232,36 @@ def _render_article(
     article_body_html = f"<article class=\"article-body\">{full_body_html}</article>"
     article_content = article_body_html
 
-    if ARTICLE_TEMPLATE_PATH.exists():
-        content = ARTICLE_TEMPLATE_PATH.read_text(encoding="utf-8")
-        content = content.replace("{{TITLE}}", _escape(title_display), 1)
-        content = content.replace("{{HREFLANG_LINKS}}", _hreflang_links(page_lang), 1)
-        content = content.replace("{{STYLESHEET_HREF}}", "../../assets/styles.css", 1)
-        content = content.replace("<!-- ARTICLE_CONTENT -->", article_content, 1)
-        content = content.replace("<!-- NAV -->", nav_html, 1)
-        content = content.replace("{{LANG_SWITCHER}}", lang_switcher_html, 1)
-        content = content.replace("{{LOGO_HREF}}", logo_href, 1)
-        content = content.replace("{{PRIVACY_LABEL}}", _escape(loc.get("footer_privacy", "Privacy Policy")), 1)
-        content = content.replace("{{PROMPT_GENERATOR_LABEL}}", _escape(loc.get("footer_prompt_generator", "Prompt Generator")), 1)
-    else:
-        content = _wrap_page(title, body_html, updated_iso)
-    if page_lang != "en":
-        content = re.sub(r'<html\s+lang="en"\s*>', f'<html lang="{page_lang}">', content, count=1)
-    html_path.write_text(content, encoding="utf-8")
+    with article_stage(profiler, key, "template_fill"):
+        if ARTICLE_TEMPLATE_PATH.exists():
+            content = ARTICLE_TEMPLATE_PATH.read_text(encoding="utf-8")
+            content = content.replace("{{TITLE}}", _escape(title_display), 1)
+            content = content.replace("{{HREFLANG_LINKS}}", _hreflang_links(page_lang), 1)
+            content = content.replace("{{STYLESHEET_HREF}}", "../../assets/styles.css", 1)
+            content = content.replace("<!-- ARTICLE_CONTENT -->", article_content, 1)
+            content = content.replace("<!-- NAV -->", nav_html, 1)
+            content = content.replace("{{LANG_SWITCHER}}", lang_switcher_html, 1)
+            content = content.replace("{{LOGO_HREF}}", logo_href, 1)
+            content = content.replace("{{PRIVACY_LABEL}}", _escape(loc.get("footer_privacy", "Privacy Policy")), 1)
+            content = content.replace("{{PROMPT_GENERATOR_LABEL}}", _escape(loc.get("footer_prompt_generator", "Prompt Generator")), 1)
+        else:
+            content = _wrap_page(title, body_html, updated_iso)
+        if page_lang != "en":
+            content = re.sub(r'<html\s+lang="en"\s*>', f'<html lang="{page_lang}">', content, count=1)
+    with article_stage(profiler, key, "write"):
+        _write_html_page(html_path, content, out_dir, minify_stats)
+        # Mark source .md as filled so fill_articles skips it next time
+        _set_source_status_filled(path)
+    if search_docs is not None:
+        search_docs.append({
+            "slug": slug,
+            "url": f"/articles/{slug_fs}/",
+            "title": title_display,
+            "lead": html.unescape(lead) or lead_from_html(body_html),
+            "tools": meta.get("tools") or "",
+            "headings": headings_from_html(body_html),
+        })
     print(f"  {html_path.relative_to(out_dir)}")
-    # Mark source .md as filled so fill_articles skips it next time
-    _set_source_status_filled(path)
 
 
 def _parse_hub_body(body: str) -> tuple[str, list[tuple[str, list[tuple[str, str]]]]]:
@@ -1292,6 +1348,7 @@ def _render_hub(
     page_lang: str = "en",
     logo_href: str = "/",
     lang_switcher_html: str = "",
+    minify_stats: list[tuple[str, int, int]] | None = None,
 ) -> None:
     meta, body = _parse_md_file(path)
     slug = (output_slug or meta.get("slug") or path.stem).strip()
@@ -1358,7 +1415,7 @@ def _render_hub(
         )
     if page_lang != "en":
         content = re.sub(r'<html\s+lang="en"\s*>', f'<html lang="{page_lang}">', content, count=1)
-    html_path.write_text(content, encoding="utf-8")
+    _write_html_page(html_path, content, out_dir, minify_stats)
     print(f"  {html_path.relative_to(out_dir)}")
 
 
@@ -1371,6 +1428,7 @@ def _update_index(
     page_lang: str = "en",
     logo_href: str = "/",
     lang_switcher_html: str = "",
+    minify_stats: list[tuple[str, int, int]] | None = None,
 ) -> None:
     slug_to_fs = slug_to_fs or {}
     index_locale = _INDEX_LOCALE.get((page_lang or "en").strip().lower()) or _INDEX_LOCALE["en"]
@@ -1467,19 +1525,26 @@ def _update_index(
         )
     if page_lang != "en":
         content = re.sub(r'<html\s+lang="en"\s*>', f'<html lang="{page_lang}">', content, count=1)
-    index_path.write_text(content, encoding="utf-8")
+    _write_html_page(index_path, content, out_dir, minify_stats)
     print(f"  {index_path.relative_to(out_dir)} (updated)")
 
 
-def _write_privacy_page(out_dir: Path, nav_html: str = "", page_lang: str = "en", logo_href: str = "/", lang_switcher_html: str = "") -> None:
+def _write_privacy_page(
+    out_dir: Path,
+    nav_html: str = "",
+    page_lang: str = "en",
+    logo_href: str = "/",
+    lang_switcher_html: str = "",
+    minify_stats: list[tuple[str, int, int]] | None = None,
+) -> None:
     """Generate public/privacy.html from privacy.docx or Privacy Policy.md (or placeholder if both missing)."""
     privacy_body: str
-    if PRIVACY_DOCX_PATH.exists() and _DOCX_AVAILABLE:
-        privacy_html = _docx_to_html(PRIVACY_DOCX_PATH)
-        privacy_html = re.sub(r"__([^_]+)__", r"<strong>\1</strong>", privacy_html)
+    docx_html = _privacy_html_from_docx(PRIVACY_DOCX_PATH) if PRIVACY_DOCX_PATH.exists() else None
+    if docx_html is not None:
+        privacy_html = re.sub(r"__([^_]+)__", r"<strong>\1</strong>", docx_html)
         privacy_body = f'<div class="article-body">\n{privacy_html}\n</div>'
     else:
-        if PRIVACY_DOCX_PATH.exists() and not _DOCX_AVAILABLE:
+        if PRIVACY_DOCX_PATH.exists() and not _docx_available():
             print("  (privacy.docx found but python-docx not installed; run: pip install python-docx)")
         if PRIVACY_MD_PATH.exists():
             body = PRIVACY_MD_PATH.read_text(encoding="utf-8")
@@ -1511,10 +1576,32 @@ def _write_privacy_page(out_dir: Path, nav_html: str = "", page_lang: str = "en"
     if page_lang != "en":
         content = re.sub(r'<html\s+lang="en"\s*>', f'<html lang="{page_lang}">', content, count=1)
     privacy_path = out_dir / "privacy.html"
-    privacy_path.write_text(content, encoding="utf-8")
+    _write_html_page(privacy_path, content, out_dir, minify_stats)
     print(f"  {privacy_path.relative_to(out_dir)} (updated)")
 
 
+def _write_search_page(
+    out_dir: Path,
+    nav_html: str = "",
+    page_lang: str = "en",
+    minify_stats: list[tuple[str, int, int]] | None = None,
+) -> None:
+    """Generate public/search/index.html from templates/search.html; results come from the search/ index shards."""
+    if not SEARCH_TEMPLATE_PATH.exists():
+        print(f"  (no {SEARCH_TEMPLATE_PATH.name})")
+        return
+    content = SEARCH_TEMPLATE_PATH.read_text(encoding="utf-8")
+    content = content.replace("{{STYLESHEET_HREF}}", "../assets/styles.css", 1)
+    content = content.replace("<!-- NAV -->", nav_html, 1)
+    content = content.replace("<!-- SEARCH_CONTENT -->", search_content_html(page_lang), 1)
+    if page_lang != "en":
+        content = re.sub(r'<html\s+lang="en"\s*>', f'<html lang="{page_lang}">', content, count=1)
+    search_path = out_dir / "search" / "index.html"
+    search_path.parent.mkdir(parents=True, exist_ok=True)
+    _write_html_page(search_path, content, out_dir, minify_stats)
+    print(f"  {search_path.relative_to(out_dir)} (updated)")
+
+
 def _ensure_images(out_dir: Path) -> None:
     """Ensure project images/ exists; copy avatar and logo to public/images/ if present."""
     images_root = PROJECT_ROOT / "images"
@@ -1583,6 +1670,21 @@ def main() -> None:
         help="Output directory. Default: public_pl for --site pl, else public. Env: OUTPUT_DIR or OUT_DIR.",
     )
     parser.add_argument("--base-url", default=None, help="Base URL for absolute links (e.g. https://flowtaro.com). Overridden by env BASE_URL.")
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Minify written HTML (collapse inter-tag whitespace, drop comments; <pre>/<code> untouched) and report bytes saved. Env: MINIFY=1.",
+    )
+    parser.add_argument("--minify-report", choices=("pages", "total"), default="pages", help="With --minify: print per-page savings (pages, default) or only the total.")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=str(PROJECT_ROOT / "logs" / "render_profile.json"),
+        default=None,
+        metavar="PATH",
+        help="Time each render stage per article plus hub/index/privacy steps; write JSON report (default: logs/render_profile.json).",
+    )
+    parser.add_argument("--no-search", action="store_true", help="Skip the search page and the search/ index shards.")
     args = parser.parse_args()
 
     site = (args.site or os.environ.get("SITE") or "main").strip().lower()
@@ -1593,9 +1695,6 @@ def main() -> None:
     if not content_root:
         content_root = "content/pl" if site == "pl" else "content"
     content_dir = get_content_root_path(PROJECT_ROOT, content_root)
-    config_path = content_dir / "config.yaml"
-    articles_dir = content_dir / "articles"
-    hubs_dir = content_dir / "hubs"
     default_out = "public_pl" if site == "pl" else "public"
     # OUTPUT_DIR and OUT_DIR allow CI (e.g. Cloudflare) to force output dir; default follows --site pl → public_pl
     out_dir_raw = (
@@ -1613,23 +1712,61 @@ def main() -> None:
         out_label = str(public)
     print(f"Output directory: {out_label}")
     base_url = (args.base_url or os.environ.get("BASE_URL") or ("https://pl.flowtaro.com" if site == "pl" else "https://flowtaro.com")).strip().rstrip("/")
+    minify = args.minify or (os.environ.get("MINIFY") or "").strip().lower() in ("1", "true", "yes")
+    profile_path: Path | None = None
+    if args.profile:
+        profile_path = Path(args.profile)
+        if not profile_path.is_absolute():
+            profile_path = PROJECT_ROOT / profile_path
+    render(
+        site, content_dir, public, base_url,
+        minify=minify, minify_report=args.minify_report, profile_path=profile_path, search=not args.no_search,
+    )
 
-    config = load_config(config_path)
+
+def render(
+    site: str,
+    content_dir: Path,
+    public: Path,
+    base_url: str,
+    config: dict | None = None,
+    all_articles: list[tuple[dict, Path]] | None = None,
+    minify: bool = False,
+    minify_report: str = "pages",
+    profile_path: Path | None = None,
+    search: bool = True,
+) -> None:
+    """
+    Render one site into public. config and all_articles (every production article, unfiltered)
+    may be passed in by publish.py to reuse one scan; otherwise they are loaded here.
+    """
+    config_path = content_dir / "config.yaml"
+    articles_dir = content_dir / "articles"
+    hubs_dir = content_dir / "hubs"
+    if config is None:
+        config = load_config(config_path)
     hubs = get_hubs_list_for_site(config, site)
     category_slugs = get_category_slugs_for_site(config, site)
     nav_html, lang_switcher_html = _build_nav_html(hubs, site=site, base_url_pl="https://pl.flowtaro.com", base_url_main="https://flowtaro.com")
     logo_href = "https://flowtaro.com/"
     first_hub_category = hubs[0]["category"] if hubs else None
     public.mkdir(parents=True, exist_ok=True)
+    minify_stats: list[tuple[str, int, int]] | None = [] if minify else None
+    profiler = RenderProfiler() if profile_path is not None else None
+    search_docs: list[dict] | None = [] if search else None
 
     print(f"Rendering production articles (site={site})...")
-    all_articles = get_production_articles(articles_dir, config_path)
+    if all_articles is None:
+        all_articles = get_production_articles(articles_dir, config_path)
     articles = [(meta, path) for meta, path in all_articles if (meta.get("category") or meta.get("category_slug") or "").strip() in category_slugs]
     existing_slugs = {meta.get("slug") or path.stem for meta, path in articles}
-    slug_to_fs = {meta.get("slug") or path.stem: _slug_for_path(meta.get("slug") or path.stem, public) for meta, path in articles}
+    # URL map (logical slug -> fs slug, URL, output path) is written once here and reused by sitemap, hubs and audits
+    url_map = build_url_map(sorted(existing_slugs), [h["slug"] for h in hubs], public, base_url, site)
+    save_url_map(url_map, site)
+    slug_to_fs = fs_slugs(url_map)
     page_lang = "pl" if site == "pl" else "en"
     for meta, path in articles:
-        _render_article(path, public, existing_slugs, slug_to_fs, nav_html, page_lang=page_lang, logo_href=logo_href, articles_dir=articles_dir, config_path=config_path, lang_switcher_html=lang_switcher_html)
+        _render_article(path, public, existing_slugs, slug_to_fs, nav_html, page_lang=page_lang, logo_href=logo_href, articles_dir=articles_dir, config_path=config_path, lang_switcher_html=lang_switcher_html, minify_stats=minify_stats, profiler=profiler, search_docs=search_docs, site_articles=all_articles)
 
     print("Rendering hubs...")
     for hub in hubs:
@@ -1637,20 +1774,34 @@ def main() -> None:
         category = hub["category"]
         hub_path = hubs_dir / f"{slug}.md"
         if hub_path.exists():
-            hub_articles = _articles_for_hub(articles, category, first_hub_category)
-            _render_hub(hub_path, public, hub_articles, existing_slugs, slug_to_fs, output_slug=slug, nav_html=nav_html, page_lang=page_lang, logo_href=logo_href, lang_switcher_html=lang_switcher_html)
+            with step(profiler, f"hub:{slug}"):
+                hub_articles = _articles_for_hub(articles, category, first_hub_category)
+                _render_hub(hub_path, public, hub_articles, existing_slugs, slug_to_fs, output_slug=slug, nav_html=nav_html, page_lang=page_lang, logo_href=logo_href, lang_switcher_html=lang_switcher_html, minify_stats=minify_stats)
         else:
             print(f"  (no {hub_path.name})")
 
     print("Updating index.html...")
-    _update_index(public, hubs, articles, nav_html, slug_to_fs, page_lang=page_lang, logo_href=logo_href, lang_switcher_html=lang_switcher_html)
+    with step(profiler, "index"):
+        _update_index(public, hubs, articles, nav_html, slug_to_fs, page_lang=page_lang, logo_href=logo_href, lang_switcher_html=lang_switcher_html, minify_stats=minify_stats)
 
     print("Writing privacy page...")
-    _write_privacy_page(public, nav_html, page_lang=page_lang, logo_href=logo_href, lang_switcher_html=lang_switcher_html)
+    with step(profiler, "privacy"):
+        _write_privacy_page(public, nav_html, page_lang=page_lang, logo_href=logo_href, lang_switcher_html=lang_switcher_html, minify_stats=minify_stats)
+
+    if search_docs is not None:
+        print("Writing search index...")
+        with step(profiler, "search"):
+            _write_search_page(public, nav_html, page_lang=page_lang, minify_stats=minify_stats)
+            print_search_report(write_search_index(search_docs, public, site))
 
     _ensure_images(public)
     _ensure_assets(public)
 
+    if minify_stats is not None:
+        print_minify_report(minify_stats, verbose=minify_report == "pages")
+    if profiler is not None:
+        profiler.write_report(profile_path, site=site)
+
     print("Done.")
 
     try:
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Per-run journal for fill_articles.py and refresh_articles.py (logs/runs/<run id>.jsonl): one JSON
+line per article state change, so an interrupted run (laptop sleep, monitor cancel, crash) shows
+which articles finished and can be resumed without paying for them again.
+
+States: queued -> requested -> response -> qa -> done (with the article's status). A response's
+raw text is saved next to the journal (logs/runs/<run id>/<slug>.txt) and referenced from its line.
+The first line of a run records the script and its arguments, so --resume <run id> can repeat
+them. refresh_articles.py and the fill_articles.py processes it starts write the same journal;
+appends go through api_rate_limit.file_lock. Stdlib only.
+
+  python scripts/run_journal.py              # recent runs with article counts per state
+  python scripts/run_journal.py <run id>     # last state of each article in one run
+"""
+
+import argparse
+import json
+import os
+import secrets
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from api_rate_limit import file_lock
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RUNS_DIR = PROJECT_ROOT / "logs" / "runs"
+# "done" statuses that produced nothing, so --resume tries the article again
+RETRY_STATUSES = ("api_fail", "skip")
+
+SCRIPT = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "python"
+
+
+def new_run_id() -> str:
+    return datetime.now().strftime("%Y%m%d-%H%M%S") + "-" + secrets.token_hex(2)
+
+
+def read_events(path: Path) -> list[dict]:
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    events = []
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # a line cut short by the crash being recovered from
+        if isinstance(event, dict):
+            events.append(event)
+    return events
+
+
+class RunJournal:
+    """Append-only journal of one run; state from earlier sessions of the same run is loaded on open."""
+
+    def __init__(self, run_id: str | None = None):
+        self.run_id = run_id or new_run_id()
+        self.path = RUNS_DIR / f"{self.run_id}.jsonl"
+        self.lock_path = RUNS_DIR / f"{self.run_id}.lock"
+        self.responses_dir = RUNS_DIR / self.run_id
+        self.events = read_events(self.path)
+
+    def exists(self) -> bool:
+        return bool(self.events)
+
+    def start(self, argv: list[str]) -> None:
+        """Write the run header (script and arguments) unless the run already has one from this script."""
+        if self.run_argv(SCRIPT) is None:
+            self._append({"event": "run", "argv": list(argv), "cwd": os.getcwd()})
+
+    def run_argv(self, script: str) -> list[str] | None:
+        """Arguments the run was started with by script (for --resume)."""
+        for event in self.events:
+            if event.get("event") == "run" and event.get("script") == script:
+                return list(event.get("argv") or [])
+        return None
+
+    def event(self, slug: str, state: str, **fields) -> None:
+        """Record a state change; fields set to None are left out."""
+        self._append({"slug": slug, "state": state, **{k: v for k, v in fields.items() if v is not None}})
+
+    def save_response(self, slug: str, text: str, **fields) -> None:
+        """Keep the raw model response (the article's latest) and record a 'response' line referencing it."""
+        self.responses_dir.mkdir(parents=True, exist_ok=True)
+        target = self.responses_dir / f"{slug}.txt"
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, target)
+        except OSError:
+            return
+        self.event(slug, "response", ref=str(target.relative_to(PROJECT_ROOT)), chars=len(text), **fields)
+
+    def finished(self, slug: str, script: str | None = None) -> str | None:
+        """Status the article finished with in an earlier session; None if it is still to do."""
+        for event in reversed(self.events):
+            if event.get("slug") != slug or (script is not None and event.get("script") != script):
+                continue
+            if event.get("state") == "done":
+                status = event.get("status") or ""
+                return None if status in RETRY_STATUSES else status
+        return None
+
+    def saved_response(self, slug: str, script: str = "fill_articles") -> str | None:
+        """
+        Raw response of an article interrupted after it arrived (no 'done' from script, the one that
+        saves responses, after it), else None. A 'done' from another script (refresh_articles marking
+        a crashed fill as skipped) does not hide the response.
+        """
+        for event in reversed(self.events):
+            if event.get("slug") != slug:
+                continue
+            if event.get("state") == "done":
+                if event.get("script") != script:
+                    continue
+                return None
+            if event.get("state") == "response" and event.get("ref"):
+                try:
+                    return (PROJECT_ROOT / event["ref"]).read_text(encoding="utf-8")
+                except OSError:
+                    return None
+        return None
+
+    def _append(self, entry: dict) -> None:
+        entry = {"ts": datetime.now().isoformat(timespec="seconds"), "script": SCRIPT, **entry}
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        try:
+            with file_lock(self.lock_path):
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError:
+            return
+        self.events.append(entry)
+
+
+def summarize(events: list[dict]) -> dict[str, dict]:
+    """slug -> last event per article."""
+    last: dict[str, dict] = {}
+    for event in events:
+        if event.get("slug"):
+            last[event["slug"]] = event
+    return last
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="List fill/refresh run journals (logs/runs) or show one run.")
+    parser.add_argument("run_id", nargs="?", help="Run to show (default: list recent runs).")
+    parser.add_argument("--limit", type=int, default=10, help="Runs to list (default: 10).")
+    args = parser.parse_args()
+    if args.run_id:
+        journal = RunJournal(args.run_id)
+        if not journal.exists():
+            print(f"No journal for run {args.run_id} in {RUNS_DIR}.")
+            sys.exit(1)
+        for slug, event in sorted(summarize(journal.events).items()):
+            detail = event.get("status") or ("passed" if event.get("passed") else ", ".join(event.get("reasons") or []))
+            print(f"  {event['state']:<9} {detail[:60]:<60}  {slug}")
+        return
+    runs = sorted(RUNS_DIR.glob("*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True)[: max(0, args.limit)]
+    if not runs:
+        print("No run journals yet.")
+        return
+    for path in runs:
+        events = read_events(path)
+        states: dict[str, int] = {}
+        for event in summarize(events).values():
+            key = event.get("status") if event["state"] == "done" else event["state"]
+            states[key] = states.get(key, 0) + 1
+        scripts = sorted({e.get("script") for e in events if e.get("event") == "run"})
+        print(f"{path.stem}  {'+'.join(scripts) or '?'}  " + ", ".join(f"{k}: {v}" for k, v in sorted(states.items())))
+
+
+if __name__ == "__main__":
+    main()
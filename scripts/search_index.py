@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Static search index for render_site.py. Stdlib only.
+Builds an inverted index over article titles, leads, tools and headings and writes it as
+small JSON shards that templates/search.html loads lazily:
+  search/index.json       manifest (term-shard prefixes, doc shard size)
+  search/t/<prefix>.json  {term: [[doc_id, score], ...]} for terms starting with <prefix>
+  search/d/<n>.json       [[url, title, lead], ...] for doc ids n*DOCS_PER_SHARD ...
+Per-document terms are kept in logs/search_index_<site>.json, so when one article changes
+only the term shards of its added/removed/re-scored terms and its doc shard are rewritten.
+"""
+
+import html
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+LOGS_DIR = PROJECT_ROOT / "logs"
+INDEX_VERSION = 1
+
+PREFIX_LEN = 2
+DOCS_PER_SHARD = 200
+DOC_LEAD_CHARS = 140
+MIN_TERM_LEN = 2
+# Score per field a term appears in (counted once per field, so repetition does not inflate it)
+FIELD_WEIGHTS = {"title": 5, "tools": 3, "headings": 2, "lead": 1}
+
+STOPWORDS = frozenset((
+    # en
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from", "how", "in", "into",
+    "is", "it", "its", "of", "on", "or", "that", "the", "this", "to", "vs", "what", "when", "which",
+    "with", "you", "your",
+    # pl
+    "i", "w", "z", "na", "do", "od", "po", "za", "ze", "się", "sie", "jak", "czy", "co", "to", "nie",
+    "dla", "oraz", "lub", "jest", "są", "sa", "o", "u", "a",
+))
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_TAG_RE = re.compile(r"<[^>]+>")
+_HEADING_RE = re.compile(r"<h[23][^>]*>([\s\S]*?)</h[23]>", re.IGNORECASE)
+_PARAGRAPH_RE = re.compile(r"<p(?:\s[^>]*)?>([\s\S]*?)</p>", re.IGNORECASE)
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip diacritics (ł -> l) so queries typed without Polish letters still match."""
+    text = unicodedata.normalize("NFKD", text.lower().replace("ł", "l"))
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    """Normalized index terms of text (stopwords, 1-char and digit-only tokens dropped)."""
+    return [
+        t for t in _TOKEN_RE.findall(normalize(text))
+        if len(t) >= MIN_TERM_LEN and not t.isdigit() and t not in STOPWORDS
+    ]
+
+
+def shard_key(term: str) -> str:
+    """File-safe shard name for a term's prefix (non [a-z0-9] chars as _<hex>); mirrored in the page script."""
+    return "".join(c if ("a" <= c <= "z" or "0" <= c <= "9") else f"_{ord(c):x}" for c in term[:PREFIX_LEN])
+
+
+def headings_from_html(body_html: str) -> list[str]:
+    """Plain text of h2/h3 headings in a rendered article body."""
+    return [" ".join(_TAG_RE.sub("", m).split()) for m in _HEADING_RE.findall(body_html)]
+
+
+def lead_from_html(body_html: str) -> str:
+    """Plain text of the first paragraph (fallback when the article has no explicit lead)."""
+    m = _PARAGRAPH_RE.search(body_html)
+    return html.unescape(" ".join(_TAG_RE.sub("", m.group(1)).split())) if m else ""
+
+
+def doc_terms(doc: dict) -> dict[str, int]:
+    """{term: score} for one document dict with title, lead, tools, headings."""
+    scores: dict[str, int] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = doc.get(field) or ""
+        if isinstance(value, list):
+            value = " ".join(value)
+        for term in set(tokenize(value)):
+            scores[term] = scores.get(term, 0) + weight
+    return scores
+
+
+def state_path(site: str) -> Path:
+    return LOGS_DIR / f"search_index_{'pl' if site == 'pl' else 'main'}.json"
+
+
+def _load_state(site: str, out_dir: Path) -> dict:
+    try:
+        data = json.loads(state_path(site).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != INDEX_VERSION or data.get("out_dir") != str(out_dir.resolve()):
+        return {}
+    return data
+
+
+def _save_state(site: str, out_dir: Path, ids: dict[str, int], docs: dict[str, dict]) -> None:
+    path = state_path(site)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({"version": INDEX_VERSION, "out_dir": str(out_dir.resolve()), "ids": ids, "docs": docs}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+    except OSError:
+        pass
+
+
+def _write_json(path: Path, data) -> int:
+    """Write compact JSON; returns bytes written."""
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(raw)
+    return len(raw)
+
+
+def _assign_ids(slugs: list[str], old_ids: dict[str, int]) -> dict[str, int]:
+    """Keep ids of existing slugs; reuse freed ids (lowest first) for new slugs, then append."""
+    ids = {s: old_ids[s] for s in slugs if s in old_ids}
+    used = set(ids.values())
+    free = sorted(set(range(max(used, default=-1) + 1)) - used)
+    next_id = max(used, default=-1) + 1
+    for slug in slugs:
+        if slug in ids:
+            continue
+        if free:
+            ids[slug] = free.pop(0)
+        else:
+            ids[slug] = next_id
+            next_id += 1
+    return ids
+
+
+def write_search_index(docs: list[dict], out_dir: Path, site: str = "main") -> dict:
+    """
+    Write search/ shards under out_dir for docs = [{"slug", "url", "title", "lead", "tools", "headings"}, ...].
+    Only shards touched by changed documents are rewritten. Returns a size report dict.
+    """
+    search_dir = out_dir / "search"
+    state = _load_state(site, out_dir)
+    manifest_path = search_dir / "index.json"
+    full = not state or not manifest_path.is_file()
+    old_docs: dict[str, dict] = {} if full else state.get("docs", {})
+    old_ids: dict[str, int] = {} if full else state.get("ids", {})
+
+    new_docs: dict[str, dict] = {}
+    for d in docs:
+        lead = " ".join((d.get("lead") or "").split())
+        if len(lead) > DOC_LEAD_CHARS:
+            lead = lead[:DOC_LEAD_CHARS].rsplit(" ", 1)[0] + "…"
+        new_docs[d["slug"]] = {"doc": [d["url"], d.get("title") or d["slug"], lead], "terms": doc_terms(d)}
+    ids = _assign_ids(sorted(new_docs), old_ids)
+
+    dirty_prefixes: set[str] = set()
+    dirty_doc_shards: set[int] = set()
+    for slug in set(old_docs) | set(new_docs):
+        old, new = old_docs.get(slug), new_docs.get(slug)
+        if old == new and (slug not in old_ids or old_ids[slug] == ids.get(slug)):
+            continue
+        old_terms, new_terms = (old or {}).get("terms", {}), (new or {}).get("terms", {})
+        changed_terms = {t for t in set(old_terms) | set(new_terms) if old_terms.get(t) != new_terms.get(t)}
+        if old_ids.get(slug) != ids.get(slug):
+            changed_terms |= set(old_terms) | set(new_terms)
+        dirty_prefixes |= {shard_key(t) for t in changed_terms}
+        for doc_id in (old_ids.get(slug), ids.get(slug)):
+            if doc_id is not None:
+                dirty_doc_shards.add(doc_id // DOCS_PER_SHARD)
+
+    all_prefixes = {shard_key(t) for entry in new_docs.values() for t in entry["terms"]}
+    doc_shard_count = (max(ids.values()) // DOCS_PER_SHARD + 1) if ids else 0
+    if full:
+        dirty_prefixes = set(all_prefixes)
+        dirty_doc_shards = set(range(doc_shard_count))
+        for stale in list((search_dir / "t").glob("*.json")) + list((search_dir / "d").glob("*.json")):
+            stale.unlink()
+
+    # Term shards: rebuild postings only for dirty prefixes
+    postings: dict[str, dict[str, list[list[int]]]] = {p: {} for p in dirty_prefixes}
+    for slug, entry in new_docs.items():
+        for term, score in entry["terms"].items():
+            p = shard_key(term)
+            if p in postings:
+                postings[p].setdefault(term, []).append([ids[slug], score])
+    written = 0
+    for p, terms in postings.items():
+        path = search_dir / "t" / f"{p}.json"
+        if not terms:
+            if path.exists():
+                path.unlink()
+            continue
+        for plist in terms.values():
+            plist.sort(key=lambda x: (-x[1], x[0]))
+        _write_json(path, dict(sorted(terms.items())))
+        written += 1
+
+    # Doc shards: list indexed by id % DOCS_PER_SHARD; null for freed ids
+    by_id = {doc_id: new_docs[slug]["doc"] for slug, doc_id in ids.items()}
+    for n in sorted(dirty_doc_shards):
+        path = search_dir / "d" / f"{n}.json"
+        if n >= doc_shard_count:
+            if path.exists():
+                path.unlink()
+            continue
+        _write_json(path, [by_id.get(n * DOCS_PER_SHARD + i) for i in range(DOCS_PER_SHARD)])
+        written += 1
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "prefix_len": PREFIX_LEN,
+        "docs_per_shard": DOCS_PER_SHARD,
+        "doc_count": len(new_docs),
+        "prefixes": sorted(all_prefixes),
+    }
+    manifest_raw = json.dumps(manifest, separators=(",", ":"))
+    try:
+        unchanged = manifest_path.read_text(encoding="utf-8") == manifest_raw
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        _write_json(manifest_path, manifest)
+        written += 1
+    _save_state(site, out_dir, ids, new_docs)
+
+    term_sizes = [p.stat().st_size for p in (search_dir / "t").glob("*.json")]
+    doc_sizes = [p.stat().st_size for p in (search_dir / "d").glob("*.json")]
+    return {
+        "docs": len(new_docs),
+        "terms": len({t for entry in new_docs.values() for t in entry["terms"]}),
+        "term_shards": len(term_sizes),
+        "term_bytes": sum(term_sizes),
+        "term_shard_max": max(term_sizes, default=0),
+        "doc_shards": len(doc_sizes),
+        "doc_bytes": sum(doc_sizes),
+        "manifest_bytes": manifest_path.stat().st_size if manifest_path.exists() else 0,
+        "written": written,
+        "full_rebuild": full,
+    }
+
+
+def print_search_report(report: dict) -> None:
+    """Print the size report returned by write_search_index."""
+    avg = report["term_bytes"] // report["term_shards"] if report["term_shards"] else 0
+    print(
+        f"Search index: {report['docs']} docs, {report['terms']} terms; "
+        f"{report['term_shards']} term shards ({report['term_bytes']:,} bytes, avg {avg:,}, max {report['term_shard_max']:,}), "
+        f"{report['doc_shards']} doc shards ({report['doc_bytes']:,} bytes), manifest {report['manifest_bytes']:,} bytes; "
+        f"{report['written']} file(s) written{' (full rebuild)' if report['full_rebuild'] else ''}"
+    )
+
+
+# Search page body for the <!-- SEARCH_CONTENT --> slot: loads search/index.json, then only the
+# term shards for the typed prefixes and the doc shards of the top hits.
+_SEARCH_SCRIPT = """<script>
+(function () {
+  var root = "/search/", manifest = null, shards = {}, docShards = {};
+  var input = document.getElementById("search-q"), out = document.getElementById("search-results");
+  var MIN = %(min_len)d, LIMIT = 20, STOP = %(stopwords)s;
+  function norm(s) { return s.toLowerCase().replace(/ł/g, "l").normalize("NFKD").replace(/[\\u0300-\\u036f]/g, ""); }
+  function tokens(s) { return (norm(s).match(/[\\p{L}\\p{N}]+/gu) || []).filter(function (t) { return t.length >= MIN && !/^\\d+$/.test(t) && !STOP[t]; }); }
+  function key(t) { return Array.from(t.slice(0, manifest.prefix_len)).map(function (c) { return /[a-z0-9]/.test(c) ? c : "_" + c.codePointAt(0).toString(16); }).join(""); }
+  function getJSON(url, cache, k) {
+    if (!cache[k]) { cache[k] = fetch(url).then(function (r) { return r.ok ? r.json() : null; }).catch(function () { return null; }); }
+    return cache[k];
+  }
+  function esc(s) { return String(s).replace(/[&<>"]/g, function (c) { return {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c]; }); }
+  function search(q) {
+    var toks = tokens(q);
+    if (!toks.length) { out.innerHTML = ""; return; }
+    var prefixes = manifest.prefixes;
+    Promise.all(toks.map(function (t) {
+      var k = key(t);
+      return prefixes.indexOf(k) < 0 ? Promise.resolve(null) : getJSON(root + "t/" + k + ".json", shards, k);
+    })).then(function (parts) {
+      var scores = null;
+      toks.forEach(function (t, i) {
+        var hit = {}, shard = parts[i] || {};
+        Object.keys(shard).forEach(function (term) {
+          if (term.indexOf(t) !== 0) return;
+          shard[term].forEach(function (p) { hit[p[0]] = Math.max(hit[p[0]] || 0, term === t ? p[1] * 2 : p[1]); });
+        });
+        if (scores === null) { scores = hit; return; }
+        Object.keys(scores).forEach(function (id) { if (!(id in hit)) delete scores[id]; else scores[id] += hit[id]; });
+      });
+      var ids = Object.keys(scores || {}).sort(function (a, b) { return scores[b] - scores[a] || a - b; }).slice(0, LIMIT);
+      var need = {};
+      ids.forEach(function (id) { need[Math.floor(id / manifest.docs_per_shard)] = 1; });
+      return Promise.all(Object.keys(need).map(function (n) { return getJSON(root + "d/" + n + ".json", docShards, n); })).then(function () { return ids; });
+    }).then(function (ids) {
+      if (!ids.length) { out.innerHTML = '<p class="text-gray-600">%(no_results)s</p>'; return; }
+      Promise.all(ids.map(function (id) { return docShards[Math.floor(id / manifest.docs_per_shard)]; })).then(function (shardList) {
+        out.innerHTML = ids.map(function (id, i) {
+          var d = shardList[i] && shardList[i][id %% manifest.docs_per_shard];
+          if (!d) return "";
+          return '<div class="py-4 border-b border-gray-100"><a class="text-lg font-semibold text-indigo-700 hover:underline" href="' + esc(d[0]) + '">' + esc(d[1]) + '</a><p class="text-gray-600 text-sm">' + esc(d[2]) + "</p></div>";
+        }).join("");
+      });
+    });
+  }
+  var timer = null;
+  function onInput() { clearTimeout(timer); timer = setTimeout(function () { if (manifest) search(input.value); }, 150); }
+  input.addEventListener("input", onInput);
+  getJSON(root + "index.json", {}, "m").then(function (m) {
+    manifest = m || {prefix_len: %(prefix_len)d, docs_per_shard: %(docs_per_shard)d, prefixes: []};
+    var q = new URLSearchParams(location.search).get("q");
+    if (q) { input.value = q; }
+    if (input.value) search(input.value);
+  });
+})();
+</script>"""
+
+
+def search_content_html(page_lang: str = "en") -> str:
+    """Markup + script for the search page slot (labels in EN or PL)."""
+    pl = (page_lang or "").strip().lower() == "pl"
+    heading = "Szukaj" if pl else "Search"
+    placeholder = "Szukaj artykułów…" if pl else "Search articles…"
+    no_results = "Brak wyników." if pl else "No results."
+    script = _SEARCH_SCRIPT % {
+        "min_len": MIN_TERM_LEN,
+        "stopwords": json.dumps({w: 1 for w in sorted(STOPWORDS)}, ensure_ascii=False),
+        "no_results": no_results,
+        "prefix_len": PREFIX_LEN,
+        "docs_per_shard": DOCS_PER_SHARD,
+    }
+    return (
+        '  <div class="flowtaro-container">\n'
+        f'    <h1 class="text-3xl font-bold mb-6">{heading}</h1>\n'
+        f'    <input id="search-q" type="search" autocomplete="off" placeholder="{placeholder}" '
+        'class="w-full border border-gray-300 rounded-lg px-4 py-3 text-lg mb-6">\n'
+        '    <div id="search-results"></div>\n'
+        "  </div>\n"
+        f"{script}\n"
+    )
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+URL map: logical article slug -> filesystem slug, canonical URL and output path.
+Written once per build (render_site.py) to logs/url_map_<site>.json and loaded by
+generate_sitemap, generate_hubs, audit_links and clean_non_live_articles, so the
+Windows path-length shortening is computed in one place. Stdlib only.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+LOGS_DIR = PROJECT_ROOT / "logs"
+
+# Windows path length limit (MAX_PATH 260); keep under to avoid FileNotFoundError 206
+MAX_PATH_LEN = 250
+_INDEX_SUFFIX_LEN = len("/index.html")
+
+BASE_URL_MAIN = "https://flowtaro.com"
+BASE_URL_PL = "https://pl.flowtaro.com"
+
+
+def default_out_dir(site: str) -> Path:
+    """Default output directory for site: public_pl for pl, else public."""
+    return PROJECT_ROOT / ("public_pl" if site == "pl" else "public")
+
+
+def default_base_url(site: str) -> str:
+    return BASE_URL_PL if site == "pl" else BASE_URL_MAIN
+
+
+def url_map_path(site: str) -> Path:
+    """logs/url_map_main.json or logs/url_map_pl.json."""
+    return LOGS_DIR / f"url_map_{'pl' if site == 'pl' else 'main'}.json"
+
+
+def slug_for_path(slug: str, articles_root_len: int) -> str:
+    """
+    Return a filesystem-safe slug: same as slug if <articles_root>/<slug>/index.html fits in
+    MAX_PATH_LEN, else shortened with hash suffix. articles_root_len = len(str((out_dir / "articles").resolve())),
+    computed once per build instead of resolving every article path.
+    """
+    if articles_root_len + 1 + len(slug) + _INDEX_SUFFIX_LEN <= MAX_PATH_LEN:
+        return slug
+    # Keep start of slug (date + start of title) and add short hash to keep unique and under limit
+    prefix_len = min(80, len(slug))
+    prefix = slug[:prefix_len].rstrip("-")
+    digest = hashlib.md5(slug.encode("utf-8")).hexdigest()[:12]
+    return f"{prefix}-{digest}"
+
+
+def _out_dir_label(out_dir: Path) -> str:
+    try:
+        return str(out_dir.resolve().relative_to(PROJECT_ROOT)).replace("\\", "/")
+    except ValueError:
+        return str(out_dir.resolve())
+
+
+def build_url_map(
+    article_slugs: list[str],
+    hub_slugs: list[str],
+    out_dir: Path,
+    base_url: str,
+    site: str = "main",
+) -> dict:
+    """Build the URL map dict for the given logical article slugs and hub slugs."""
+    base = base_url.strip().rstrip("/")
+    articles_root_len = len(str((out_dir / "articles").resolve()))
+    articles: dict[str, dict[str, str]] = {}
+    for slug in sorted(set(article_slugs)):
+        fs = slug_for_path(slug, articles_root_len)
+        articles[slug] = {
+            "fs_slug": fs,
+            "url": f"{base}/articles/{fs}/",
+            "path": f"articles/{fs}/index.html",
+        }
+    hubs: dict[str, dict[str, str]] = {}
+    for slug in hub_slugs:
+        if slug:
+            hubs[slug] = {"url": f"{base}/hubs/{slug}/", "path": f"hubs/{slug}/index.html"}
+    return {
+        "site": site,
+        "base_url": base,
+        "out_dir": _out_dir_label(out_dir),
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "articles": articles,
+        "hubs": hubs,
+    }
+
+
+def save_url_map(data: dict, site: str | None = None) -> Path | None:
+    """Write the URL map to logs/url_map_<site>.json. Returns the path, or None on write error."""
+    path = url_map_path(site or data.get("site") or "main")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    except OSError:
+        return None
+    return path
+
+
+def load_url_map(site: str) -> dict | None:
+    """Load logs/url_map_<site>.json; None if missing or invalid."""
+    path = url_map_path(site)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("articles"), dict):
+        return None
+    data.setdefault("hubs", {})
+    return data
+
+
+def get_url_map(
+    site: str,
+    article_slugs: list[str],
+    hub_slugs: list[str],
+    out_dir: Path | None = None,
+    base_url: str | None = None,
+    save: bool = True,
+) -> dict:
+    """
+    Return the persisted URL map when it matches this build (same out_dir, base_url and a
+    superset of the given slugs); otherwise build it, save it (unless save=False) and return it.
+    Read-only callers that do not know every hub slug pass save=False, so a map without hubs
+    never replaces the one the build saved.
+    """
+    out_dir = out_dir or default_out_dir(site)
+    base = (base_url or default_base_url(site)).strip().rstrip("/")
+    data = load_url_map(site)
+    if (
+        data is not None
+        and data.get("out_dir") == _out_dir_label(out_dir)
+        and data.get("base_url") == base
+        and set(article_slugs) <= set(data["articles"])
+        and set(h for h in hub_slugs if h) <= set(data["hubs"])
+    ):
+        return data
+    data = build_url_map(article_slugs, hub_slugs, out_dir, base, site)
+    if save:
+        save_url_map(data, site)
+    return data
+
+
+def fs_slugs(url_map: dict) -> dict[str, str]:
+    """Return {logical_slug: fs_slug} from a URL map."""
+    return {slug: entry.get("fs_slug") or slug for slug, entry in (url_map.get("articles") or {}).items()}